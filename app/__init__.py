@@ -1,29 +1,49 @@
+import importlib
 import os
-from flask import Flask, render_template, request, session, redirect
-from flask_cors import CORS
-from flask_migrate import Migrate
-from flask_wtf.csrf import CSRFProtect, generate_csrf
-from flask_login import LoginManager
-from .models import db, User
-from .api.user_routes import user_routes
-from .api.auth_routes import auth_routes
-from .api.posts_routes import posts_routes
-from .api.platforms_routes import platforms_routes
-from .api.user_platforms_routes import user_platforms_routes
-from .api.post_platforms_routes import post_platforms_routes
-from .api.media_routes import media_routes
-from .api.post_media_routes import post_media_routes
-from .api.health_routes import health_bp
-from .api.admin_jobs_routes import admin_jobs_routes
-from .seeds import seed_commands
-from .config import Config
-from .extensions.queue import init_redis
 
-#! //// ///////////////////////////////////////////////////////////////////////////
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
+#! Profiles ///////////////////////////////////////////////////////////////////////////
+# create_app(profile) builds only what the process needs:
+#   web     the API (gunicorn app:app, flask run) + all CLI commands
+#   cli     CLI commands and migrations, no blueprints or request hooks (APP_PROFILE=cli flask seed all)
+#   worker  config, database, Redis and the task modules (worker.py)
+# Importing the package builds nothing; `app.app` is created on first access (see __getattr__).
+PROFILES = ("web", "cli", "worker")
+
+#! Blueprints ///////////////////////////////////////////////////////////////////////////
+# (module, blueprint, url_prefix); imported by the web profile only
+BLUEPRINTS = (
+    ("app.api.user_routes", "user_routes", "/api/users"),
+    ("app.api.auth_routes", "auth_routes", "/api/auth"),
+    ("app.api.posts_routes", "posts_routes", "/api/posts"),
+    ("app.api.platforms_routes", "platforms_routes", "/api/platforms"),
+    ("app.api.user_platforms_routes", "user_platforms_routes", "/api/user-platforms"),
+    ("app.api.post_platforms_routes", "post_platforms_routes", "/api"),
+    ("app.api.media_routes", "media_routes", "/api/media"),
+    ("app.api.post_media_routes", "post_media_routes", "/api"),
+    ("app.api.health_routes", "health_bp", None),
+    ("app.api.admin_jobs_routes", "admin_jobs_routes", None),
+    ("app.api.sync_routes", "sync_routes", "/api/sync"),
+    ("app.api.imports_routes", "imports_routes", "/api/imports"),
+    ("app.api.metrics_routes", "metrics_bp", None),
+)
+
+#! CLI Commands ///////////////////////////////////////////////////////////////////////////
+CLI_COMMANDS = (
+    ("app.seeds", "seed_commands"),
+    ("app.services.sync", "sync_commands"),
+    ("app.services.scheduler_slo", "slo_commands"),
+    ("app.services.publish_forecast", "forecast_commands"),
+    ("app.extensions.job_profiler", "profile_commands"),
+    ("app.utils.static_assets", "static_commands"),
+    ("app.utils.bench", "bench_commands"),
+)
+
 
-@event.listens_for(Engine, "connect")
+def _load(module: str, name: str):
+    return getattr(importlib.import_module(module), name)
+
+
+#! //// ///////////////////////////////////////////////////////////////////////////
 def set_sqlite_pragma(dbapi_conn, conn_record):
     try:
         cursor = dbapi_conn.cursor()
@@ -32,100 +52,175 @@ def set_sqlite_pragma(dbapi_conn, conn_record):
     except Exception:
         pass
 
+
+#! create_app ///////////////////////////////////////////////////////////////////////////
+def create_app(profile: str = "web"):
+    if profile not in PROFILES:
+        raise ValueError(f"unknown app profile {profile!r}; expected one of {', '.join(PROFILES)}")
+
+    from flask import Flask
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from .config import Config
+    from .models import db
+    from .extensions.queue import init_redis
+    from .extensions.db_pool import engine_options, init_db_pool
+
+    if not event.contains(Engine, "connect", set_sqlite_pragma):
+        event.listen(Engine, "connect", set_sqlite_pragma)
+
+    app = Flask(__name__, static_folder='../react-app/build', static_url_path='/')
+    app.config.from_object(Config)
+    app.config["APP_PROFILE"] = profile
+    # pool size / overflow / recycle / pre-ping per role, or NullPool behind PgBouncer (DB_POOL_MODE)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS",
+                          engine_options(profile, app.config["SQLALCHEMY_DATABASE_URI"]))
+    replica_url = app.config.get("REPLICA_DATABASE_URL")
+    if replica_url:
+        app.config.setdefault("SQLALCHEMY_BINDS", {}).setdefault(
+            "replica", {"url": replica_url, **engine_options(profile, replica_url)})
+    db.init_app(app)
+    init_db_pool(app, db)
+
+    # Add Redis + Queue ///////////////////////////////////////////////////////////////////////////
+    #! This set up Avoids crashes when config isn’t loaded the way you expect (tests, scripts, different envs).
+    app.config.setdefault("REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+    redis_url = app.config.get("REDIS_URL")
+    if not redis_url:
+        raise RuntimeError("REDIS_URL not configured")
+    init_redis(redis_url)
+
+    if profile == "worker":
+        from .extensions import tracing
+        # job spans only; request spans belong to the web profile
+        tracing.configure(app.config.get("TRACING_EXPORTER", "none"),
+                          file_path=app.config.get("TRACING_FILE", "instance/traces.jsonl"),
+                          service_name=app.config.get("OTEL_SERVICE_NAME", "poststride"))
+        # registers the task functions and the session hooks they rely on
+        importlib.import_module("app.tasks")
+        return app
+
+    from flask_migrate import Migrate
+    Migrate(app, db)
+
+    #! Seed Commands ///////////////////////////////////////////////////////////////////////////
+    # Tell flask about our seed commands
+    for module, name in CLI_COMMANDS:
+        app.cli.add_command(_load(module, name))
+
+    if profile == "web":
+        _init_web(app)
+    return app
+
+
+#! Web ///////////////////////////////////////////////////////////////////////////
+def _init_web(app) -> None:
+    from flask import request, redirect, session
+    from flask_cors import CORS
+    from flask_login import LoginManager
+    from .services.user_cache import user_cache, parse_session_id
+    from .utils.compression import init_compression
+    from .utils.static_assets import send_static_asset
+    from .utils.csrf import inject_csrf_token
+    from .extensions.metrics import init_http_metrics
+    from .extensions.sql_profiler import init_sql_profiler
+    from .extensions.tracing import init_tracing
+
+    #! Setup login manager ///////////////////////////////////////////////////////////////////////////
+    login = LoginManager(app)
+    login.login_view = 'auth.unauthorized'
+
+    #! User Loader ///////////////////////////////////////////////////////////////////////////
+    @login.user_loader
+    def load_user(id):
+        # "<id>:<session_version>" from User.get_id; served from app/services/user_cache.py
+        try:
+            user_id, session_version = parse_session_id(id)
+        except ValueError:
+            return None
+        user = user_cache.load(user_id, session_version)
+        if user is not None and session_version is None:
+            session['_user_id'] = user.get_id()  # cookie from before versioning: reissue as "<id>:<version>"
+        return user
+
+    #1-Blueprints ///////////////////////////////////////////////////////////////////////////
+    for module, name, url_prefix in BLUEPRINTS:
+        if url_prefix:
+            app.register_blueprint(_load(module, name), url_prefix=url_prefix)
+        else:
+            app.register_blueprint(_load(module, name))
+
+    # Application Security ///////////////////////////////////////////////////////////////////////////
+    CORS(app)
+
+    #! Metrics ///////////////////////////////////////////////////////////////////////////
+    # per-endpoint latency histograms; scraped at GET /metrics
+    init_http_metrics(app)
+    # query count / DB time per request: Server-Timing header + sampled slow/N+1 log
+    init_sql_profiler(app)
+    # request span + traceparent propagation into RQ jobs (exporter: TRACING_EXPORTER)
+    init_tracing(app)
+
+    #! Compression + static files ///////////////////////////////////////////////////////////////////////////
+    # gzip/brotli for JSON bodies over COMPRESS_MIN_SIZE; the build is served pre-compressed
+    init_compression(app)
+    app.view_functions['static'] = send_static_asset
+
+    # Since we are deploying with Docker and Flask,
+    # we won't be using a buildpack when we deploy to Heroku.
+    # Therefore, we need to make sure that in production any
+    # request made over http is redirected to https.
+    # Well.........
+    #! HTTPS Redirect ///////////////////////////////////////////////////////////////////////////
+    @app.before_request
+    def https_redirect():
+        if os.environ.get('FLASK_ENV') == 'production':
+            if request.headers.get('X-Forwarded-Proto') == 'http':
+                url = request.url.replace('http://', 'https://', 1)
+                code = 301
+                return redirect(url, code=code)
+
+    #! CSRF Token ///////////////////////////////////////////////////////////////////////////
+    # issued once per session, rotated every 30 min; skipped for /api/health/* and static files
+    app.after_request(inject_csrf_token)
+
+    #! API Documentation ///////////////////////////////////////////////////////////////////////////
+    @app.route("/api/docs")
+    def api_help():
+        """
+        Returns all API routes and their doc strings
+        """
+        acceptable_methods = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+        route_list = { rule.rule: [[ method for method in rule.methods if method in acceptable_methods ],
+                        app.view_functions[rule.endpoint].__doc__ ]
+                        for rule in app.url_map.iter_rules() if rule.endpoint != 'static' }
+        return route_list
+
+    #! React Root ///////////////////////////////////////////////////////////////////////////
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def react_root(path):
+        """
+        This route will direct to the public directory in our
+        react builds in the production environment for favicon
+        or index.html requests
+        """
+        if path == 'favicon.ico':
+            return send_static_asset('favicon.ico')
+        return send_static_asset('index.html')
+
+    #! Error Handler ///////////////////////////////////////////////////////////////////////////
+    @app.errorhandler(404)
+    def not_found(e):
+        return send_static_asset('index.html')
+
+
 #! Flask App ///////////////////////////////////////////////////////////////////////////
-app = Flask(__name__, static_folder='../react-app/build', static_url_path='/')
-
-#! Setup login manager ///////////////////////////////////////////////////////////////////////////
-login = LoginManager(app)
-login.login_view = 'auth.unauthorized'
-
-#! User Loader ///////////////////////////////////////////////////////////////////////////
-@login.user_loader
-def load_user(id):
-    return User.query.get(int(id))
-
-#! Seed Commands ///////////////////////////////////////////////////////////////////////////
-# Tell flask about our seed commands
-app.cli.add_command(seed_commands)
-#1-Blueprints ///////////////////////////////////////////////////////////////////////////
-app.config.from_object(Config)
-app.register_blueprint(user_routes, url_prefix='/api/users')
-app.register_blueprint(auth_routes, url_prefix='/api/auth')
-app.register_blueprint(posts_routes, url_prefix='/api/posts')
-app.register_blueprint(platforms_routes, url_prefix='/api/platforms')
-app.register_blueprint(user_platforms_routes, url_prefix='/api/user-platforms')
-app.register_blueprint(post_platforms_routes, url_prefix='/api')
-app.register_blueprint(media_routes, url_prefix='/api/media')
-app.register_blueprint(post_media_routes, url_prefix='/api')
-app.register_blueprint(health_bp)
-app.register_blueprint(admin_jobs_routes)
-db.init_app(app)
-Migrate(app, db)
-
-# Add Redis + Queue ///////////////////////////////////////////////////////////////////////////
-#! This set up Avoids crashes when config isn’t loaded the way you expect (tests, scripts, different envs). 
-app.config.setdefault("REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
-
-redis_url = app.config.get("REDIS_URL")
-if not redis_url:
-    raise RuntimeError("REDIS_URL not configured")
-init_redis(redis_url)
-
-# Application Security ///////////////////////////////////////////////////////////////////////////
-CORS(app)
-
-# Since we are deploying with Docker and Flask,
-# we won't be using a buildpack when we deploy to Heroku.
-# Therefore, we need to make sure that in production any
-# request made over http is redirected to https.
-# Well.........
-#! HTTPS Redirect ///////////////////////////////////////////////////////////////////////////
-@app.before_request
-def https_redirect():
-    if os.environ.get('FLASK_ENV') == 'production':
-        if request.headers.get('X-Forwarded-Proto') == 'http':
-            url = request.url.replace('http://', 'https://', 1)
-            code = 301
-            return redirect(url, code=code)
-
-#! CSRF Token ///////////////////////////////////////////////////////////////////////////
-@app.after_request
-def inject_csrf_token(response):
-    response.set_cookie(
-        'csrf_token',
-        generate_csrf(),
-        secure=True if os.environ.get('FLASK_ENV') == 'production' else False,
-        samesite='Strict' if os.environ.get(
-            'FLASK_ENV') == 'production' else None,
-        httponly=True)
-    return response
-
-#! API Documentation ///////////////////////////////////////////////////////////////////////////
-@app.route("/api/docs")
-def api_help():
-    """
-    Returns all API routes and their doc strings
-    """
-    acceptable_methods = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
-    route_list = { rule.rule: [[ method for method in rule.methods if method in acceptable_methods ],
-                    app.view_functions[rule.endpoint].__doc__ ]
-                    for rule in app.url_map.iter_rules() if rule.endpoint != 'static' }
-    return route_list
-
-#! React Root ///////////////////////////////////////////////////////////////////////////
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def react_root(path):
-    """
-    This route will direct to the public directory in our
-    react builds in the production environment for favicon
-    or index.html requests
-    """
-    if path == 'favicon.ico':
-        return app.send_from_directory('public', 'favicon.ico')
-    return app.send_static_file('index.html')
-
-#! Error Handler ///////////////////////////////////////////////////////////////////////////
-@app.errorhandler(404)
-def not_found(e):
-    return app.send_static_file('index.html')
\ No newline at end of file
+def __getattr__(name):
+    # `app` for gunicorn app:app, FLASK_APP=app and `from app import app`; built once, on first access
+    if name == "app":
+        global app
+        app = create_app(os.environ.get("APP_PROFILE", "web"))
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,9 +2,11 @@
 from flask import Blueprint, request, jsonify, current_app
 from rq.job import Job
 from rq.registry import ScheduledJobRegistry
-from app.extensions.queue import redis_conn, get_queue
+from app.extensions import queue as queue_ext
+from app.extensions.queue import get_queue
 from app.models import Post, PostPlatform  # adjust if needed
-from rq_scheduler import Scheduler
+from app.services.platform_cache import platform_cache
+from app.utils.etag import load_post_version, post_etag, is_not_modified, not_modified_response
 
 admin_jobs_routes = Blueprint("admin_jobs", __name__, url_prefix="/api")
 
@@ -15,8 +17,8 @@ def _get_redis_connection():
     Prefer the explicitly-initialized redis_conn; otherwise, obtain it from the active RQ queue.
     Raises RuntimeError with a clear message if neither is available.
     """
-    if redis_conn:
-        return redis_conn
+    if queue_ext.redis_conn:  # read at call time; a name imported at module load stays None
+        return queue_ext.redis_conn
     q = get_queue() if 'get_queue' in globals() else None
     if q and getattr(q, "connection", None):
         return q.connection
@@ -46,38 +48,130 @@ def inspect_job():
         return jsonify({"error": str(e)}), 404
 
 #! List scheduled jobs /////////////////////////////////////////////////////////////////////////// ok
+def _parse_time_arg(name):
+    """Optional ISO-8601 query arg -> datetime (naive = UTC); ValueError names the arg."""
+    from dateutil.parser import isoparse
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return isoparse(value)
+    except (ValueError, OverflowError):
+        raise ValueError(f"invalid {name}; use ISO 8601, e.g. 2025-11-10T14:30:00Z")
+
+
 @admin_jobs_routes.route("/jobs/scheduled", methods=["GET"])
 def list_scheduled_jobs():
+    """
+    GET /api/jobs/scheduled?from=&to=&post_id=&platform_id=&queue=&limit=100&cursor=
+    One page of rq-scheduler jobs in run-time order (ZRANGEBYSCORE window; summaries
+    from the job hashes without unpickling payloads). Pass next_cursor to continue.
+    """
+    from app.services.scheduled_listing import DEFAULT_LIMIT, list_scheduled, parse_cursor
+    try:
+        start, end = _parse_time_arg("from"), _parse_time_arg("to")
+        parse_cursor(request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     try:
         q = get_queue()
-        if not q:
-            raise RuntimeError("Queue is not configured.")
+        page = list_scheduled(
+            start=start, end=end,
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", DEFAULT_LIMIT, type=int),
+            post_id=request.args.get("post_id", type=int),
+            platform_id=request.args.get("platform_id", type=int),
+            queue=request.args.get("queue"),
+        )
+        return jsonify({"queue": q.name, **page}), 200
+    except Exception as e:
+        current_app.logger.exception("[admin.jobs.scheduled] error")
+        return jsonify({"error": str(e)}), 500
 
-        # ✅ This replaces reg = ScheduledJobRegistry(queue=q)
-        reg = Scheduler(queue=q, connection=q.connection)
 
-        jobs = reg.get_jobs()  # like reg.get_job_ids(), but returns Job objects
-        job_list = [
-            {"id": j.id, "func": j.func_name, "meta": j.meta or {}}
-            for j in jobs
-        ]
+@admin_jobs_routes.route("/jobs/scheduled/counts", methods=["GET"])
+def scheduled_job_counts():
+    """
+    GET /api/jobs/scheduled/counts?from=&to=&bucket=3600
+    Scheduled jobs per time bucket (default: the next 24h by hour), one Redis pipeline.
+    """
+    from datetime import datetime, timedelta, timezone
+    from app.services.scheduled_listing import bucket_counts
+    try:
+        start = _parse_time_arg("from") or datetime.now(timezone.utc)
+        end = _parse_time_arg("to") or start + timedelta(days=1)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    bucket = request.args.get("bucket", 3600, type=int)
+    if bucket <= 0:
+        return jsonify({"error": "bucket must be a positive number of seconds"}), 400
+    try:
+        return jsonify(bucket_counts(start, end, bucket)), 200
+    except Exception as e:
+        current_app.logger.exception("[admin.jobs.scheduled.counts] error")
+        return jsonify({"error": str(e)}), 500
 
-        return jsonify({"queue": q.name, "scheduled_jobs": job_list}), 200
+#! Scheduler SLO report ///////////////////////////////////////////////////////////////////////////
+@admin_jobs_routes.route("/jobs/slo", methods=["GET"])
+def scheduler_slo():
+    """
+    GET /api/jobs/slo?window=1h&window=24h&platform_id=2&queue=poststride-tasks
+    Fire/delivery lag p50/p95/p99 per sliding window (from scheduler_lag_rollups),
+    broken down by platform and queue, with SLO breaches flagged.
+    """
+    from app.services.scheduler_slo import DEFAULT_WINDOWS, parse_window, report
+    windows = request.args.getlist("window") or list(DEFAULT_WINDOWS)
+    try:
+        for window in windows:
+            parse_window(window)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    platform_id = request.args.get("platform_id", type=int)
+    try:
+        return jsonify(report(windows, platform_id=platform_id, queue_name=request.args.get("queue"))), 200
     except Exception as e:
-        current_app.logger.exception("[admin.jobs.scheduled] error")
+        current_app.logger.exception("[admin.jobs.slo] error")
+        return jsonify({"error": str(e)}), 500
+
+#! Publish forecast ///////////////////////////////////////////////////////////////////////////
+@admin_jobs_routes.route("/jobs/forecast", methods=["GET"])
+def publish_forecast():
+    """
+    GET /api/jobs/forecast?horizon=24h&resolution=1m&platform_id=2
+    Upcoming publishes per bucket and platform (Redis minute counters, no table scan),
+    with the workers needed for the peak minute given measured per-platform latency.
+    """
+    from app.services.publish_forecast import forecast
+    from app.services.scheduler_slo import parse_window
+    try:
+        horizon = parse_window(request.args.get("horizon", "24h"))
+        resolution = parse_window(request.args.get("resolution", "1m"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        return jsonify(forecast(horizon, resolution, platform_id=request.args.get("platform_id", type=int))), 200
+    except Exception as e:
+        current_app.logger.exception("[admin.jobs.forecast] error")
         return jsonify({"error": str(e)}), 500
 
 #! Get post status ///////////////////////////////////////////////////////////////////////////
 @admin_jobs_routes.route("/posts/<int:post_id>/status", methods=["GET"])
 def post_status(post_id):
-    post = Post.query.get(post_id)
-    if not post:
+    # One indexed lookup decides between 304 and a full read
+    version_row = load_post_version(post_id)
+    if not version_row:
         return jsonify({"error": "Post not found"}), 404
 
+    etag = post_etag(version_row)
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
+    post = Post.query.get(post_id)
+
     platforms = []
     for pp in PostPlatform.query.filter_by(post_id=post_id).all():
-        # pp.platform is likely a relationship; serialize a simple string to avoid JSON errors
-        platform_name = getattr(pp.platform, "name", None) or str(pp.platform)
+        # platform names come from the in-process cache (no lazy load per row)
+        platform_name = platform_cache.name(pp.platform_id) or str(pp.platform_id)
         platforms.append({
             "platform": platform_name,
             "status": pp.status,
@@ -85,9 +179,11 @@ def post_status(post_id):
             "published_at": pp.published_at.isoformat() + "Z" if pp.published_at else None
         })
 
-    return jsonify({
+    response = jsonify({
         "post_id": post.id,
         "status": post.status,
         "scheduled_time_utc": post.scheduled_time.isoformat() + "Z" if post.scheduled_time else None,
         "platforms": platforms
-    }), 200
+    })
+    response.set_etag(etag)
+    return response, 200
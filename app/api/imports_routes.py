@@ -0,0 +1,110 @@
+"""
+imports_routes.py (imports)
+
+POST /api/imports – upload a CSV/XLSX campaign file (multipart field "file"); processed by an RQ job.
+
+GET /api/imports – list the user's imports, newest first.
+
+GET /api/imports/:id – import status: progress, created/error counts, rows/sec.
+
+GET /api/imports/:id/errors – download the CSV report of rejected rows.
+
+"""
+
+import os
+from flask import Blueprint, request, jsonify, send_file, current_app
+from flask_login import login_required, current_user
+from app.models import db, ImportJob
+from app.extensions.queue import get_queue
+from app.services.imports import detect_format, store_upload, IMPORT_FORMATS, IMPORT_JOB_TIMEOUT, MAX_IMPORT_BYTES
+
+imports_routes = Blueprint('imports', __name__)
+
+#! Upload an import file ///////////////////////////////////////////////////////////////////////////
+@imports_routes.route('', methods=['POST'])
+@login_required
+def create_import():
+    """
+    POST /api/imports – multipart upload, field "file" (.csv or .xlsx)
+    Columns: caption, scheduled_time, status, platforms, platform_caption, media
+    Returns 202 with the import job; poll GET /api/imports/:id for progress.
+    """
+    from app.tasks import process_import
+
+    max_bytes = current_app.config.get('MAX_IMPORT_BYTES', MAX_IMPORT_BYTES)
+    if request.content_length and request.content_length > max_bytes:
+        return jsonify({'error': f'File too large (max {max_bytes // (1024 * 1024)} MB)'}), 413
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'file is required'}), 400
+    file_format = detect_format(upload.filename)
+    if not file_format:
+        return jsonify({'error': f'Unsupported file type. Must be one of: {", ".join(IMPORT_FORMATS)}'}), 400
+
+    try:
+        import_job = ImportJob(
+            user_id=current_user.id,
+            filename=upload.filename[:255],
+            file_format=file_format,
+            storage_path=store_upload(upload, file_format),
+            status='queued'
+        )
+        db.session.add(import_job)
+        db.session.commit()
+
+        job = get_queue().enqueue(process_import, import_job.id, job_timeout=IMPORT_JOB_TIMEOUT)
+        import_job.rq_job_id = job.id
+        db.session.commit()
+
+        return jsonify({'import': import_job.to_dict()}), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+#! List imports ///////////////////////////////////////////////////////////////////////////
+@imports_routes.route('', methods=['GET'])
+@login_required
+def list_imports():
+    """
+    GET /api/imports – the user's imports, newest first (?limit=, default 20)
+    """
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    imports = (
+        ImportJob.query
+        .filter_by(user_id=current_user.id)
+        .order_by(ImportJob.created_at.desc(), ImportJob.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return jsonify({'imports': [import_job.to_dict() for import_job in imports]}), 200
+
+#! Import status ///////////////////////////////////////////////////////////////////////////
+@imports_routes.route('/<int:import_id>', methods=['GET'])
+@login_required
+def get_import(import_id):
+    """
+    GET /api/imports/:id – status, progress (0..1), created/error counts, rows_per_second
+    """
+    import_job = ImportJob.query.filter_by(id=import_id, user_id=current_user.id).first()
+    if not import_job:
+        return jsonify({'error': 'Import not found'}), 404
+    return jsonify({'import': import_job.to_dict()}), 200
+
+#! Error report ///////////////////////////////////////////////////////////////////////////
+@imports_routes.route('/<int:import_id>/errors', methods=['GET'])
+@login_required
+def download_import_errors(import_id):
+    """
+    GET /api/imports/:id/errors – CSV of rejected rows (row number, errors, original columns)
+    """
+    import_job = ImportJob.query.filter_by(id=import_id, user_id=current_user.id).first()
+    if not import_job:
+        return jsonify({'error': 'Import not found'}), 404
+    if not import_job.error_count or not import_job.error_report_path or not os.path.exists(import_job.error_report_path):
+        return jsonify({'error': 'No error report for this import'}), 404
+
+    base = os.path.splitext(import_job.filename)[0] or 'import'
+    return send_file(import_job.error_report_path, mimetype='text/csv', as_attachment=True,
+                     download_name=f'{base}-errors.csv')
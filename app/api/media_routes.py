@@ -17,6 +17,7 @@ POST /api/media/bulk-delete – delete many by IDs. ok
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from app.models import db, Media, PostMedia
+from app.extensions.db_routing import read_only
 from datetime import datetime
 import re
 
@@ -46,6 +47,7 @@ def parse_iso_datetime(datetime_str):
 #! List Media ///////////////////////////////////////////////////////////////////////////
 @media_routes.route('/', methods=['GET'])
 @login_required
+@read_only
 def get_media():
     """
     GET /api/media – list media with filters
@@ -0,0 +1,26 @@
+"""
+GET /metrics – Prometheus scrape endpoint (see app/extensions/metrics.py).
+
+"""
+
+import hmac
+import os
+
+from flask import Blueprint, Response, request
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.extensions.metrics import build_registry
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    GET /metrics – request/task histograms, status counters, queue and registry gauges.
+    Set METRICS_TOKEN to require "Authorization: Bearer <token>".
+    """
+    token = os.environ.get("METRICS_TOKEN")
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+    return Response(generate_latest(build_registry(include_queue=True)), mimetype=CONTENT_TYPE_LATEST)
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from app.models import db, SocialPlatform
+from app.services.platform_cache import platform_cache
 from datetime import datetime
 
 platforms_routes = Blueprint('platforms', __name__)
@@ -27,24 +28,21 @@ def get_platforms():
         q = request.args.get('q')  # search by name
         sort_by = request.args.get('sort', 'name')  # default sort by name
         
-        # Start with base query
-        query = SocialPlatform.query
+        # Reference data: served from the in-process cache, filtered and sorted in memory
+        platforms = platform_cache.all()
         
-        # Apply search filter
+        # Apply search filter (case-insensitive, like ILIKE '%q%')
         if q:
-            query = query.filter(SocialPlatform.name.ilike(f'%{q}%'))
+            platforms = [platform for platform in platforms if q.lower() in platform.name.lower()]
         
         # Apply sorting
         if sort_by == 'name':
-            query = query.order_by(SocialPlatform.name.asc())
+            platforms.sort(key=lambda platform: platform.name)
         elif sort_by == 'created_at':
-            query = query.order_by(SocialPlatform.created_at.desc())
+            platforms.sort(key=lambda platform: platform.created_at or datetime.min, reverse=True)
         else:
             return jsonify({'error': 'Invalid sort parameter. Use: name or created_at.'}), 400
         
-        # Execute query
-        platforms = query.all()
-        
         # Convert to dictionary format
         platforms_data = [platform.to_dict() for platform in platforms]
         
@@ -63,7 +61,7 @@ def get_platform(platform_id):
     """
     try:
         # Find platform
-        platform = SocialPlatform.query.get(platform_id)
+        platform = platform_cache.get(platform_id)
         
         if not platform:
             return jsonify({'error': 'Platform not found'}), 404
@@ -110,7 +108,7 @@ def create_platform():
         )
         
         db.session.add(new_platform)
-        db.session.commit()
+        db.session.commit()  # the commit also invalidates platform_cache in every process
         
         return jsonify({'platform': new_platform.to_dict()}), 201
         
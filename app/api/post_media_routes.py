@@ -12,11 +12,16 @@ PATCH /api/posts/:post_id/media/:media_id – update sort_order. ok
 DELETE /api/posts/:post_id/media/:media_id – detach. ok
 
 POST /api/posts/:post_id/media/reorder – bulk reorder [{"media_id","sort_order"}...]. ok
+
+sort_order in requests and responses is the position (0-based). Stored sort_order values are
+gapped keys (see app/services/media_order.py); responses carry them as sort_key.
 """
 
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
 from app.models import db, Post, PostMedia, Media
+from app.services.media_order import attach_media, reorder_media
+from app.utils.etag import load_post_version, post_etag, is_not_modified, not_modified_response
 from datetime import datetime
 
 post_media_routes = Blueprint('post_media', __name__)
@@ -27,34 +32,43 @@ post_media_routes = Blueprint('post_media', __name__)
 def get_post_media(post_id):
     """
     GET /api/posts/:post_id/media – list media attached to a post (ordered by sort_order)
+    Supports If-None-Match (ETag follows the post version).
     """
-    # Verify post exists and belongs to current user
-    post = Post.query.filter_by(id=post_id, user_id=current_user.id).first()
-    if not post:
+    # Verify post exists and belongs to current user (also gives us the version for the ETag)
+    version_row = load_post_version(post_id, current_user.id)
+    if not version_row:
         return jsonify({'error': 'Post not found'}), 404
 
+    etag = post_etag(version_row)
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
     # Get post media with media details, ordered by sort_order
     post_media_list = db.session.query(PostMedia, Media).join(
         Media, PostMedia.media_id == Media.id
     ).filter(
         PostMedia.post_id == post_id
     ).order_by(
+        PostMedia.sort_order.is_(None),  # NULLS LAST on every backend
         PostMedia.sort_order.asc(),
         PostMedia.added_at.asc()
     ).all()
 
     # Format response with media details
     media_list = []
-    for post_media, media in post_media_list:
+    for position, (post_media, media) in enumerate(post_media_list):
         media_dict = media.to_dict()
-        media_dict['sort_order'] = post_media.sort_order
+        media_dict['sort_order'] = position
+        media_dict['sort_key'] = post_media.sort_order
         media_dict['added_at'] = post_media.added_at.isoformat() if post_media.added_at else None
         media_list.append(media_dict)
 
-    return jsonify({
+    response = jsonify({
         'media': media_list,
         'total': len(media_list)
     })
+    response.set_etag(etag)
+    return response
 
 #! Attach Media to Post ///////////////////////////////////////////////////////////////////////////
 @post_media_routes.route('/posts/<int:post_id>/media', methods=['POST'])
@@ -93,7 +107,10 @@ def attach_media_to_post(post_id):
             return jsonify({'error': 'media_id and sort_order must be valid integers'}), 400
 
     # Extract media IDs and verify they belong to current user
-    media_ids = [item['media_id'] for item in media_attachments]
+    media_ids = [int(item['media_id']) for item in media_attachments]
+    if len(set(media_ids)) != len(media_ids):
+        return jsonify({'error': 'Each media_id can only be listed once'}), 400
+
     media_list = Media.query.filter(
         Media.id.in_(media_ids),
         Media.user_id == current_user.id
@@ -102,82 +119,39 @@ def attach_media_to_post(post_id):
     if len(media_list) != len(media_ids):
         return jsonify({'error': 'Some media not found or not owned by user'}), 404
 
-    created_attachments = []
-    errors = []
-
-    # First pass: validate all attachments and collect sort_orders
-    attachments_to_create = []
-    for item in media_attachments:
-        media_id = item['media_id']
-        sort_order = item.get('sort_order')
-        
-        try:
-            # Check if attachment already exists
-            existing = PostMedia.query.filter_by(
-                post_id=post_id, 
-                media_id=media_id
-            ).first()
-            
-            if existing:
-                errors.append(f'Media {media_id} is already attached to this post')
-                continue
-
-            attachments_to_create.append({
-                'media_id': media_id,
-                'sort_order': sort_order
-            })
-
-        except Exception as e:
-            errors.append(f'Error validating media {media_id}: {str(e)}')
+    # Already attached: one query for the whole payload
+    attached_ids = {row.media_id for row in db.session.query(PostMedia.media_id).filter(
+        PostMedia.post_id == post_id,
+        PostMedia.media_id.in_(media_ids)
+    )}
+    errors = [f'Media {media_id} is already attached to this post' for media_id in media_ids if media_id in attached_ids]
+    attachments_to_create = [
+        (int(item['media_id']), int(item['sort_order']) if item.get('sort_order') is not None else None)
+        for item in media_attachments if int(item['media_id']) not in attached_ids
+    ]
 
     if errors and not attachments_to_create:
         return jsonify({'error': 'Failed to attach media', 'details': errors}), 400
 
     try:
-        # Second pass: handle atomic shifting for each attachment
-        for attachment_data in attachments_to_create:
-            media_id = attachment_data['media_id']
-            sort_order = attachment_data['sort_order']
-            
-            # If sort_order is specified and not None, shift existing items
-            if sort_order is not None:
-                # Check if any existing media has this sort_order
-                existing_with_order = PostMedia.query.filter_by(
-                    post_id=post_id,
-                    sort_order=sort_order
-                ).first()
-                
-                if existing_with_order:
-                    # Shift all items with sort_order >= new_sort_order by +1
-                    PostMedia.query.filter(
-                        PostMedia.post_id == post_id,
-                        PostMedia.sort_order >= sort_order
-                    ).update({PostMedia.sort_order: PostMedia.sort_order + 1})
-
-            # Create post media attachment
-            post_media = PostMedia(
-                post_id=post_id,
-                media_id=media_id,
-                sort_order=sort_order
-            )
-
-            db.session.add(post_media)
-            created_attachments.append(post_media)
+        media_dicts = {media.id: media.to_dict() for media in media_list}  # before the engine expires them
 
+        # sort_order is the target position; the engine shifts nothing, it fills gaps
+        plan = attach_media(post_id, current_user.id, attachments_to_create)
         db.session.commit()
-        
-        # Fetch the complete media objects with their details
+
+        position = {media_id: index for index, media_id in enumerate(plan['order'])}
+        now = datetime.utcnow()
         attached_media = []
-        for attachment in created_attachments:
-            media = Media.query.get(attachment.media_id)
-            if media:
-                media_dict = media.to_dict()
-                media_dict['sort_order'] = attachment.sort_order
-                media_dict['added_at'] = attachment.added_at.isoformat() if attachment.added_at else None
-                attached_media.append(media_dict)
-        
+        for media_id, _ in attachments_to_create:
+            media_dict = media_dicts[media_id]
+            media_dict['sort_order'] = position[media_id]
+            media_dict['sort_key'] = plan['keys'][media_id]
+            media_dict['added_at'] = now.isoformat()
+            attached_media.append(media_dict)
+
         return jsonify({
-            'message': f'Successfully attached {len(created_attachments)} media items',
+            'message': f'Successfully attached {len(attached_media)} media items',
             'media': attached_media,
             'errors': errors if errors else None
         }), 201
@@ -219,44 +193,28 @@ def update_media_sort_order(post_id, media_id):
     if not isinstance(new_sort_order, int) and new_sort_order is not None:
         return jsonify({'error': 'sort_order must be an integer or null'}), 400
 
-    old_sort_order = post_media.sort_order
-
-    # If sort_order hasn't changed, no need to do anything
-    if old_sort_order == new_sort_order:
-        return jsonify({
-            'message': 'Sort order unchanged',
-            'post_media': post_media.to_dict()
-        })
-
     try:
-        # Atomic shifting logic to maintain clean indices
-        if new_sort_order is not None and old_sort_order is not None:
-            if new_sort_order < old_sort_order:
-                # Moving to earlier position: increment items in [new_sort_order, old_sort_order-1]
-                PostMedia.query.filter(
-                    PostMedia.post_id == post_id,
-                    PostMedia.media_id != media_id,  # Exclude the item being moved
-                    PostMedia.sort_order >= new_sort_order,
-                    PostMedia.sort_order < old_sort_order
-                ).update({PostMedia.sort_order: PostMedia.sort_order + 1})
-                
-            elif new_sort_order > old_sort_order:
-                # Moving to later position: decrement items in [old_sort_order+1, new_sort_order]
-                PostMedia.query.filter(
-                    PostMedia.post_id == post_id,
-                    PostMedia.media_id != media_id,  # Exclude the item being moved
-                    PostMedia.sort_order > old_sort_order,
-                    PostMedia.sort_order <= new_sort_order
-                ).update({PostMedia.sort_order: PostMedia.sort_order - 1})
-
-        # Set the new sort_order for the moved item
-        post_media.sort_order = new_sort_order
-        
+        added_at = post_media.added_at
+        # sort_order is the target position (null = last); only the moved row is rewritten
+        plan = reorder_media(post_id, current_user.id, [(media_id, new_sort_order)])
         db.session.commit()
 
+        post_media_dict = {
+            'post_id': post_id,
+            'media_id': media_id,
+            'sort_order': plan['order'].index(media_id),
+            'sort_key': plan['keys'][media_id],
+            'added_at': added_at.isoformat() if added_at else None
+        }
+        if plan['order'] == plan['previous']:
+            return jsonify({
+                'message': 'Sort order unchanged',
+                'post_media': post_media_dict
+            })
         return jsonify({
-            'message': 'Sort order updated successfully with atomic shifting',
-            'post_media': post_media.to_dict()
+            'message': 'Sort order updated successfully',
+            'post_media': post_media_dict,
+            'rows_updated': plan['written']
         })
     except Exception as e:
         db.session.rollback()
@@ -356,69 +314,26 @@ def reorder_post_media(post_id):
         return jsonify({'error': f'Media {list(missing_ids)} are not attached to this post'}), 404
 
     try:
-        # First, get all current sort_orders to track changes
-        current_media_orders = {}
-        for pm in existing_attachments:
-            current_media_orders[pm.media_id] = pm.sort_order
-        
-        # Create a mapping of media_id to new sort_order
-        new_orders = {item['media_id']: item['sort_order'] for item in media_orders}
-        
-        # Identify which items are actually changing position
-        changes = []
-        for media_id, new_order in new_orders.items():
-            old_order = current_media_orders.get(media_id)
-            if old_order != new_order:
-                changes.append({
-                    'media_id': media_id,
-                    'old_order': old_order,
-                    'new_order': new_order
-                })
-        
-        # Sort changes by new_order to process them in order
-        changes.sort(key=lambda x: x['new_order'] if x['new_order'] is not None else float('inf'))
-        
-        # Process each change with atomic shifting
-        for change in changes:
-            media_id = change['media_id']
-            old_order = change['old_order']
-            new_order = change['new_order']
-            
-            if old_order is not None and new_order is not None:
-                if new_order < old_order:
-                    # Moving to earlier position: increment items in [new_order, old_order-1]
-                    PostMedia.query.filter(
-                        PostMedia.post_id == post_id,
-                        PostMedia.media_id != media_id,  # Exclude the item being moved
-                        PostMedia.sort_order >= new_order,
-                        PostMedia.sort_order < old_order
-                    ).update({PostMedia.sort_order: PostMedia.sort_order + 1})
-                    
-                elif new_order > old_order:
-                    # Moving to later position: decrement items in [old_order+1, new_order]
-                    PostMedia.query.filter(
-                        PostMedia.post_id == post_id,
-                        PostMedia.media_id != media_id,  # Exclude the item being moved
-                        PostMedia.sort_order > old_order,
-                        PostMedia.sort_order <= new_order
-                    ).update({PostMedia.sort_order: PostMedia.sort_order - 1})
-            
-            # Set the new sort_order for the moved item
-            post_media = PostMedia.query.filter_by(
-                post_id=post_id,
-                media_id=media_id
-            ).first()
-            
-            if post_media:
-                post_media.sort_order = new_order
-
+        # sort_order is the target position; unlisted media keep their relative order
+        plan = reorder_media(post_id, current_user.id, [
+            (int(item['media_id']), int(item['sort_order']) if item['sort_order'] is not None else None)
+            for item in media_orders
+        ])
         db.session.commit()
 
+        old_position = {media_id: index for index, media_id in enumerate(plan['previous'])}
+        changes = [
+            {'media_id': media_id, 'old_order': old_position[media_id], 'new_order': index}
+            for index, media_id in enumerate(plan['order'])
+            if old_position[media_id] != index
+        ]
+
         return jsonify({
-            'message': f'Successfully reordered {len(changes)} media items with atomic shifting',
+            'message': f'Successfully reordered {len(changes)} media items',
             'updated_count': len(changes),
+            'rows_updated': plan['written'],
             'changes': changes
         })
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': 'Failed to reorder media'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to reorder media'}), 500
@@ -5,6 +5,8 @@ GET /api/posts/:post_id/platforms – list per-platform rows (filter status=pend
 
 POST /api/posts/:post_id/platforms – bulk attach platforms (create rows; allow per-platform caption/media). ok
 
+POST /api/posts/platforms/attach – attach the same platforms to many posts ("apply to selection").
+
 GET /api/posts/:post_id/platforms/:platform_id – fetch one row.  ok
 
 PATCH /api/posts/:post_id/platforms/:platform_id – update platform_caption, media_urls, or status. ok
@@ -23,7 +25,12 @@ POST /api/posts/:post_id/platforms/:platform_id/cancel – set status=skipped ca
 
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from app.models import db, Post, PostPlatform, SocialPlatform
+from app.models import db, Post, PostPlatform
+from app.utils.etag import load_post_version, post_etag, is_not_modified, not_modified_response
+from app.utils.ids import parse_ids
+from app.extensions.db_routing import read_only
+from app.services.platform_attach import attach_platforms, AttachError, MAX_ATTACH_ROWS
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 post_platforms_routes = Blueprint('post_platforms', __name__)
@@ -35,12 +42,17 @@ def get_post_platforms(post_id):
     """
     GET /api/posts/:post_id/platforms – list per-platform rows
     Filter by status: pending|queued|publishing|published|failed|skipped
+    Supports If-None-Match (ETag follows the post version).
     """
-    # Verify post exists and belongs to current user
-    post = Post.query.filter_by(id=post_id, user_id=current_user.id).first()
-    if not post:
+    # Verify post exists and belongs to current user (also gives us the version for the ETag)
+    version_row = load_post_version(post_id, current_user.id)
+    if not version_row:
         return jsonify({'error': 'Post not found'}), 404
 
+    etag = post_etag(version_row, request.query_string.decode())
+    if is_not_modified(etag):
+        return not_modified_response(etag)
+
     # Get query parameters
     status = request.args.get('status')
     
@@ -55,10 +67,12 @@ def get_post_platforms(post_id):
     
     post_platforms = query.all()
     
-    return jsonify({
+    response = jsonify({
         'post_platforms': [pp.to_dict() for pp in post_platforms],
         'total': len(post_platforms)
     })
+    response.set_etag(etag)
+    return response
 
 #! Bulk Attach Platforms ///////////////////////////////////////////////////////////////////////////
 @post_platforms_routes.route('/posts/<int:post_id>/platforms', methods=['POST'])
@@ -68,73 +82,75 @@ def bulk_attach_platforms(post_id):
     POST /api/posts/:post_id/platforms – bulk attach platforms
     Allow per-platform caption/media customization
     """
-    # Verify post exists and belongs to current user
-    post = Post.query.filter_by(id=post_id, user_id=current_user.id).first()
-    if not post:
-        return jsonify({'error': 'Post not found'}), 404
-
     data = request.get_json()
     if not data or 'platforms' not in data:
         return jsonify({'error': 'Platforms data is required'}), 400
 
-    platforms_data = data['platforms']
-    if not isinstance(platforms_data, list):
-        return jsonify({'error': 'Platforms must be an array'}), 400
+    try:
+        result = attach_platforms(current_user.id, [post_id], data['platforms'], skip_existing=False)
+        created_platforms = [pp.to_dict() for pp in result['created']]  # before commit expires them
+        db.session.commit()
+    except AttachError as e:
+        db.session.rollback()
+        if e.status_code == 404:
+            return jsonify({'error': 'Post not found'}), 404
+        return jsonify({'error': 'Failed to create some platform connections', 'details': e.details}), 400
+    except IntegrityError:
+        db.session.rollback()  # concurrent attach of the same pair
+        return jsonify({'error': 'Post already connected to one of these platforms'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to save platform connections'}), 500
+
+    return jsonify({
+        'message': f'Successfully attached {len(created_platforms)} platforms',
+        'post_platforms': created_platforms
+    }), 201
 
-    created_platforms = []
-    errors = []
+#! Attach Platforms To Many Posts ///////////////////////////////////////////////////////////////////////////
+@post_platforms_routes.route('/posts/platforms/attach', methods=['POST'])
+@login_required
+def attach_platforms_to_posts():
+    """
+    POST /api/posts/platforms/attach – apply the same platform set to a selection of posts
+    body: {"post_ids": [1, 2, 3], "platforms": [{"platform_id": 1, "platform_caption": "..."}, 2],
+           "skip_existing": true}
+    skip_existing defaults to true here: pairs that already exist are skipped (reported in
+    "skipped"); with false they fail the request, like POST /api/posts/:post_id/platforms.
+    """
+    data = request.get_json()
+    if not data or 'platforms' not in data or 'post_ids' not in data:
+        return jsonify({'error': 'post_ids and platforms are required'}), 400
 
-    for platform_data in platforms_data:
-        try:
-            platform_id = platform_data.get('platform_id')
-            if not platform_id:
-                errors.append('platform_id is required for each platform')
-                continue
-
-            # Verify platform exists
-            platform = SocialPlatform.query.get(platform_id)
-            if not platform:
-                errors.append(f'Platform with id {platform_id} not found')
-                continue
-
-            # Check if post-platform combination already exists
-            existing = PostPlatform.query.filter_by(
-                post_id=post_id, 
-                platform_id=platform_id
-            ).first()
-            
-            if existing:
-                errors.append(f'Post already connected to platform {platform.name}')
-                continue
-
-            # Create post platform
-            post_platform = PostPlatform(
-                post_id=post_id,
-                platform_id=platform_id,
-                platform_caption=platform_data.get('platform_caption', post.caption),
-                media_urls=platform_data.get('media_urls'),
-                status='pending'
-            )
-
-            db.session.add(post_platform)
-            created_platforms.append(post_platform)
-
-        except Exception as e:
-            errors.append(f'Error creating platform connection: {str(e)}')
-
-    if errors:
-        db.session.rollback()
-        return jsonify({'error': 'Failed to create some platform connections', 'details': errors}), 400
+    try:
+        post_ids = parse_ids(data['post_ids'], MAX_ATTACH_ROWS, field='post_ids')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not post_ids:
+        return jsonify({'error': 'post_ids must be a non-empty array'}), 400
+    skip_existing = data.get('skip_existing', True)
+    if not isinstance(skip_existing, bool):
+        return jsonify({'error': 'skip_existing must be a boolean'}), 400
 
     try:
+        result = attach_platforms(current_user.id, post_ids, data['platforms'], skip_existing=skip_existing)
+        created_platforms = [pp.to_dict() for pp in result['created']]  # before commit expires them
         db.session.commit()
-        return jsonify({
-            'message': f'Successfully attached {len(created_platforms)} platforms',
-            'post_platforms': [pp.to_dict() for pp in created_platforms]
-        }), 201
+    except AttachError as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to attach platforms', 'details': e.details}), e.status_code
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Some posts were connected to these platforms concurrently, retry'}), 409
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': 'Failed to save platform connections'}), 500
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'message': f'Successfully attached {len(created_platforms)} platforms',
+        'post_platforms': created_platforms,
+        'skipped': result['skipped']
+    }), 201
 
 #! Get Single Post Platform ///////////////////////////////////////////////////////////////////////////
 @post_platforms_routes.route('/posts/<int:post_id>/platforms/<int:platform_id>', methods=['GET'])
@@ -371,6 +387,7 @@ def cancel_post_platform(post_id, platform_id):
 #! Cross-Post View ///////////////////////////////////////////////////////////////////////////
 @post_platforms_routes.route('/', methods=['GET'])
 @login_required
+@read_only
 def get_cross_post_view():
     """
     GET /api/post-platforms – cross-post view
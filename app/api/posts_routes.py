@@ -1,16 +1,25 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
-from app.models import db, Post, PostPlatform, PostMedia, Media, SocialPlatform
+from app.models import db, Post, PostPlatform, PostMedia, Media
 from datetime import datetime, timezone
+import csv
+import io
+import json
 import re
+from sqlalchemy.orm import selectinload
 from rq import Retry
 from app.extensions.queue import get_queue
+from app.services.media_order import in_display_order
+from app.services.platform_cache import platform_cache
 from app.utils.timezone_helpers import (
     parse_iso_to_utc,
     format_dual_time,
     format_utc_with_z,
     to_utc_naive
 )
+from app.utils.ids import parse_ids
+from app.utils.etag import load_post_version, post_etag, is_not_modified, not_modified_response
+from app.extensions.db_routing import read_only
 
 # from app.scheduler import schedule_post_at
 
@@ -18,16 +27,105 @@ posts_routes = Blueprint('posts', __name__)
 
 # Note: All old timezone helpers removed - now using app.utils.timezone_helpers
 
+#! Serialize a post with platforms + media ///////////////////////////////////////////////////////////////////////////
+def _serialize_post_detail(post, user_tz):
+    """
+    Full post shape used by GET /api/posts/:id (post + per-platform rows + media).
+    Expects post_platforms / post_media to be loaded already when called in a loop.
+    """
+    post_data = post.to_dict()
+
+    # Add dual time format for scheduled_time
+    if post.scheduled_time:
+        post_data['scheduled_time_detail'] = format_dual_time(post.scheduled_time, user_tz)
+
+    # Add detailed platform information /////////////////////////////////////
+    post_data['platforms'] = []
+    for post_platform in post.post_platforms:
+        platform_data = {
+            'id': post_platform.id,
+            'platform_id': post_platform.platform_id,
+            'platform_name': platform_cache.name(post_platform.platform_id),
+            'platform_caption': post_platform.platform_caption,
+            'media_urls': post_platform.media_urls,
+            'platform_post_id': post_platform.platform_post_id,
+            'status': post_platform.status,
+            'published_at': format_utc_with_z(post_platform.published_at)
+        }
+        # Add dual time for published_at
+        if post_platform.published_at:
+            platform_data['published_at_detail'] = format_dual_time(post_platform.published_at, user_tz)
+        post_data['platforms'].append(platform_data)
+
+    # Add detailed media information /////////////////////////////////////
+    post_data['media'] = []
+    for position, post_media in in_display_order(post.post_media):
+        media_data = {
+            'media_id': post_media.media_id,
+            'media_type': post_media.media.media_type,
+            'url': post_media.media.url,
+            'sort_order': position,
+            'sort_key': post_media.sort_order,
+            'added_at': post_media.added_at.isoformat() if post_media.added_at else None
+        }
+        post_data['media'].append(media_data)
+
+    return post_data
+
+#! Eager-load options for the detail shape ///////////////////////////////////////////////////////////////////////////
+def _post_detail_options():
+    """
+    Loader options for _serialize_post_detail: one IN query per child collection
+    for the whole result set instead of lazy loads per post.
+    """
+    return (
+        selectinload(Post.post_platforms),  # platform names come from platform_cache
+        selectinload(Post.post_media).joinedload(PostMedia.media),
+    )
+
+#! Batch get helpers ///////////////////////////////////////////////////////////////////////////
+MAX_BATCH_GET_IDS = 200
+
+def _batch_get_response(raw_ids):
+    """
+    Resolve ownership and load the full graph for many posts in a constant number
+    of queries (posts + post_platforms + post_media). Same shape as GET /api/posts/:id.
+    """
+    try:
+        post_ids = parse_ids(raw_ids, MAX_BATCH_GET_IDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not post_ids:
+        return jsonify({'error': 'ids cannot be empty'}), 400
+
+    posts = (
+        Post.query
+        .filter(Post.id.in_(post_ids), Post.user_id == current_user.id)
+        .options(*_post_detail_options())
+        .all()
+    )
+    by_id = {post.id: post for post in posts}
+
+    return jsonify({
+        'posts': [_serialize_post_detail(by_id[pid], current_user.timezone) for pid in post_ids if pid in by_id],
+        'missing': [pid for pid in post_ids if pid not in by_id]  # not found or not owned
+    }), 200
+
 #! Get all posts ///////////////////////////////////////////////////////////////////////////
 
 @posts_routes.route('', methods=['GET'])
 @login_required
+@read_only
 def get_posts():
     """
     GET /api/posts – list posts with filters and sorting
+    GET /api/posts?ids=1,2,3 – batch get specific posts (same shape as GET /api/posts/:id)
     """
 
     # return jsonify({'message': 'Hello, World!'}), 200
+    if request.args.get('ids') is not None:
+        return _batch_get_response(request.args.get('ids'))
+
     try:
         # Get query parameters /////////////////////////////////////
         status = request.args.get('status')
@@ -85,8 +183,8 @@ def get_posts():
         else:
             return jsonify({'error': 'Invalid sort parameter. Use: scheduled_time, created_at, or status.'}), 400
         
-        # Execute query /////////////////////////////////////
-        posts = query.all()
+        # Execute query (children in one IN query each, not per post) /////////////////////////////////////
+        posts = query.options(*_post_detail_options()).all()
         
         # Convert to dictionary format /////////////////////////////////////
         posts_data = []
@@ -102,7 +200,7 @@ def get_posts():
             for post_platform in post.post_platforms:
                 platform_data = {
                     'platform_id': post_platform.platform_id,
-                    'platform_name': post_platform.platform.name,
+                    'platform_name': platform_cache.name(post_platform.platform_id),
                     'status': post_platform.status,
                     'published_at': format_utc_with_z(post_platform.published_at)
                 }
@@ -113,12 +211,13 @@ def get_posts():
             
             # Add media information /////////////////////////////////////
             post_data['media'] = []
-            for post_media in post.post_media:
+            for position, post_media in in_display_order(post.post_media):
                 media_data = {
                     'media_id': post_media.media_id,
                     'media_type': post_media.media.media_type,
                     'url': post_media.media.url,
-                    'sort_order': post_media.sort_order
+                    'sort_order': position,
+                    'sort_key': post_media.sort_order
                 }
                 post_data['media'].append(media_data)
             
@@ -129,6 +228,174 @@ def get_posts():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+#! Bulk create posts ///////////////////////////////////////////////////////////////////////////
+
+@posts_routes.route('/bulk', methods=['POST'])
+@login_required
+def bulk_create():
+    """
+    POST /api/posts/bulk – create many posts with platforms, media and optional schedule
+    body: {"posts": [{"caption": "...", "scheduled_time": "...", "platforms": [1, {"platform_id": 2, "platform_caption": "..."}],
+                      "media": [5, {"media_id": 6, "sort_order": 1}]}, ...],
+           "all_or_nothing": false}
+    Returns per-item results in request order.
+    """
+    from app.services.posts_bulk import bulk_create_posts, BulkSchedulingError, MAX_BULK_POSTS
+    try:
+        data = request.get_json() or {}
+        items = data.get('posts')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'posts must be a non-empty array'}), 400
+        if len(items) > MAX_BULK_POSTS:
+            return jsonify({'error': f'At most {MAX_BULK_POSTS} posts per request'}), 400
+
+        result = bulk_create_posts(current_user, items, all_or_nothing=bool(data.get('all_or_nothing')))
+        return jsonify(result), 201 if result['created'] else 400
+
+    except BulkSchedulingError as e:
+        return jsonify({'error': f'Scheduler unavailable, nothing was created: {e}'}), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+#! Bulk duplicate posts ///////////////////////////////////////////////////////////////////////////
+
+@posts_routes.route('/bulk-duplicate', methods=['POST'])
+@login_required
+def bulk_duplicate():
+    """
+    POST /api/posts/bulk-duplicate – clone many posts, optionally shifted in time and scheduled
+    body: {"post_ids": [1, 2, 3], "offset": {"days": 30}, "schedule": true}
+    Platforms are copied with status pending (platform ids cleared); media links keep their order.
+    """
+    from app.services.posts_duplicate import bulk_duplicate_posts, parse_offset, MAX_DUPLICATE_POSTS
+    from app.services.posts_bulk import BulkSchedulingError
+    try:
+        data = request.get_json() or {}
+        try:
+            post_ids = parse_ids(data.get('post_ids'), MAX_DUPLICATE_POSTS, field='post_ids')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not post_ids:
+            return jsonify({'error': 'post_ids cannot be empty'}), 400
+        try:
+            offset = parse_offset(data.get('offset'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        result = bulk_duplicate_posts(current_user, post_ids, offset=offset, schedule=bool(data.get('schedule')))
+        return jsonify(result), 201 if result['created'] else 404
+
+    except BulkSchedulingError as e:
+        return jsonify({'error': f'Scheduler unavailable, nothing was duplicated: {e}'}), 503
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+#! Batch get posts ///////////////////////////////////////////////////////////////////////////
+
+@posts_routes.route('/batch-get', methods=['POST'])
+@login_required
+def batch_get_posts():
+    """
+    POST /api/posts/batch-get – body {"ids": [1, 2, 3]}; same as GET /api/posts?ids=1,2,3
+    """
+    try:
+        data = request.get_json() or {}
+        if 'ids' not in data:
+            return jsonify({'error': 'ids is required'}), 400
+        return _batch_get_response(data['ids'])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+#! Export posts (streaming) ///////////////////////////////////////////////////////////////////////////
+
+EXPORT_BATCH_SIZE = 500  # rows pulled per server-side cursor fetch
+EXPORT_CSV_FIELDS = ['id', 'caption', 'status', 'scheduled_time', 'created_at', 'updated_at', 'platforms', 'media']
+
+@posts_routes.route('/export', methods=['GET'])
+@login_required
+def export_posts():
+    """
+    GET /api/posts/export?format=ndjson|csv – stream every post of the user with platforms and media
+
+    - ndjson: one JSON object per line, same shape as GET /api/posts/:id
+    - csv: one row per post; platforms as "name:status|...", media urls as "url|..." (by sort_order)
+    Rows are read with a server-side cursor (yield_per) and written as they are fetched,
+    so memory stays flat no matter how many posts the user has.
+    """
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Invalid format. Use: ndjson or csv.'}), 400
+
+    user_id = current_user.id
+    user_tz = current_user.timezone
+
+    # selectinload runs one IN query per fetched batch for each child collection (no N+1)
+    query = (
+        Post.query
+        .filter_by(user_id=user_id)
+        .options(*_post_detail_options())
+        .order_by(Post.id.asc())
+        .yield_per(EXPORT_BATCH_SIZE)
+    )
+
+    def generate_ndjson():
+        for post in query:
+            yield json.dumps(_serialize_post_detail(post, user_tz)) + '\n'
+            db.session.expunge(post)  # keep the identity map from growing with the export
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_FIELDS)
+        for post in query:
+            media = sorted(post.post_media, key=lambda pm: (pm.sort_order is None, pm.sort_order or 0))
+            writer.writerow([
+                post.id,
+                post.caption,
+                post.status,
+                format_utc_with_z(post.scheduled_time),
+                format_utc_with_z(post.created_at),
+                format_utc_with_z(post.updated_at),
+                '|'.join(f'{platform_cache.name(pp.platform_id)}:{pp.status}' for pp in post.post_platforms),
+                '|'.join(pm.media.url for pm in media),
+            ])
+            db.session.expunge(post)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if export_format == 'csv':
+        generator, mimetype = generate_csv(), 'text/csv'
+    else:
+        generator, mimetype = generate_ndjson(), 'application/x-ndjson'
+
+    response = Response(stream_with_context(generator), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=posts-export.{export_format}'
+    return response
+
+#! Live status stream (SSE) ///////////////////////////////////////////////////////////////////////////
+
+@posts_routes.route('/stream', methods=['GET'])
+@login_required
+def stream_post_status():
+    """
+    GET /api/posts/stream – Server-Sent Events with post / post_platform status changes of the current user
+
+    Events: "post" {post_id, status} and "post_platform" {post_id, platform_id, status, ...}.
+    Replaces polling GET /api/posts/:id/status while a post is publishing. Run the web
+    workers with gevent (gunicorn.conf.py) so idle streams cost a greenlet, not a thread.
+    """
+    from app.services.post_events import stream_post_events
+
+    # No stream_with_context on purpose: the app context (and its DB session) is torn
+    # down when this view returns, so an open stream holds no DB connection.
+    response = Response(stream_post_events(current_user.id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: flush each event immediately
+    return response
+
 #! Create a post ///////////////////////////////////////////////////////////////////////////
 
 @posts_routes.route('', methods=['POST'])
@@ -186,56 +453,49 @@ def create_post():
 def get_post(post_id):
     """
     GET /api/posts/:id – fetch one post with media and platform details
+    Supports If-None-Match: unchanged posts return 304 after a single posts lookup.
     """
     try:
-        # Find post belonging to current user /////////////////////////////////////
-        post = Post.query.filter_by(id=post_id, user_id=current_user.id).first()
-        
-        if not post:
+        # Ownership + version in one indexed lookup /////////////////////////////////////
+        version_row = load_post_version(post_id, current_user.id)
+        if not version_row:
             return jsonify({'error': 'Post not found'}), 404
+
+        etag = post_etag(version_row, current_user.timezone)
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+
+        post = Post.query.get(post_id)
+        post_data = _serialize_post_detail(post, current_user.timezone)
         
-        # Get post data /////////////////////////////////////
-        post_data = post.to_dict()
-        
-        # Add dual time format for scheduled_time
-        if post.scheduled_time:
-            post_data['scheduled_time_detail'] = format_dual_time(post.scheduled_time, current_user.timezone)
-        
-        # Add detailed platform information /////////////////////////////////////
-        post_data['platforms'] = []
-        for post_platform in post.post_platforms:
-            platform_data = {
-                'id': post_platform.id,
-                'platform_id': post_platform.platform_id,
-                'platform_name': post_platform.platform.name,
-                'platform_caption': post_platform.platform_caption,
-                'media_urls': post_platform.media_urls,
-                'platform_post_id': post_platform.platform_post_id,
-                'status': post_platform.status,
-                'published_at': format_utc_with_z(post_platform.published_at)
-            }
-            # Add dual time for published_at
-            if post_platform.published_at:
-                platform_data['published_at_detail'] = format_dual_time(post_platform.published_at, current_user.timezone)
-            post_data['platforms'].append(platform_data)
-        
-        # Add detailed media information /////////////////////////////////////
-        post_data['media'] = []
-        for post_media in post.post_media:
-            media_data = {
-                'media_id': post_media.media_id,
-                'media_type': post_media.media.media_type,
-                'url': post_media.media.url,
-                'sort_order': post_media.sort_order,
-                'added_at': post_media.added_at.isoformat()
-            }
-            post_data['media'].append(media_data)
-        
-        return jsonify({'post': post_data}), 200
+        response = jsonify({'post': post_data})
+        response.set_etag(etag)
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+#! Post timeline ///////////////////////////////////////////////////////////////////////////
+
+@posts_routes.route('/<int:post_id>/timeline', methods=['GET'])
+@login_required
+@read_only
+def get_post_timeline(post_id):
+    """
+    GET /api/posts/:id/timeline – schedule -> enqueue -> worker -> publish timestamps,
+    fire lag / queue wait / run time per job, and the trace ids to look up in tracing
+    """
+    from app.services.timeline import build_post_timeline
+    try:
+        post = Post.query.filter_by(id=post_id, user_id=current_user.id).first()
+        if not post:
+            return jsonify({'error': 'Post not found'}), 404
+
+        return jsonify({'timeline': build_post_timeline(post)}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 #! Update a post ///////////////////////////////////////////////////////////////////////////
 
 @posts_routes.route('/<int:post_id>', methods=['PATCH'])
@@ -407,7 +667,7 @@ def schedule_post(post_id):
             })
 
         time_detail = format_dual_time(when_utc_naive, current_user.timezone)
-        platforms = [{"id": pp.platform_id, "name": pp.platform.name} for pp in pps]
+        platforms = [{"id": pp.platform_id, "name": platform_cache.name(pp.platform_id)} for pp in pps]
 
         return jsonify({
             "message": "post scheduled",
@@ -509,7 +769,7 @@ def duplicate_post(post_id):
             platform_data = {
                 'id': post_platform.id,
                 'platform_id': post_platform.platform_id,
-                'platform_name': post_platform.platform.name,
+                'platform_name': platform_cache.name(post_platform.platform_id),
                 'platform_caption': post_platform.platform_caption,
                 'media_urls': post_platform.media_urls,
                 'platform_post_id': post_platform.platform_post_id,
@@ -523,12 +783,13 @@ def duplicate_post(post_id):
         
         # Add media information
         post_data['media'] = []
-        for post_media in new_post.post_media:
+        for position, post_media in in_display_order(new_post.post_media):
             media_data = {
                 'media_id': post_media.media_id,
                 'media_type': post_media.media.media_type,
                 'url': post_media.media.url,
-                'sort_order': post_media.sort_order,
+                'sort_order': position,
+                'sort_key': post_media.sort_order,
                 'added_at': post_media.added_at.isoformat()
             }
             post_data['media'].append(media_data)
@@ -558,6 +819,16 @@ POST /api/posts/:id/cancel – set status=canceled. ok
 
 POST /api/posts/:id/duplicate – clone post (clear per-platform ids/statuses). ok
 
+POST /api/posts/bulk – create many posts (+ platforms, media, schedule) in one transaction.
+
+POST /api/posts/bulk-duplicate – clone many posts (INSERT ... SELECT children), optional offset + schedule.
+
+GET /api/posts?ids=1,2,3 | POST /api/posts/batch-get – batch get by id, constant query count.
+
+GET /api/posts/export – stream all posts + platforms + media; format=ndjson|csv.
+
+GET /api/posts/stream – SSE of post / post_platform status changes (replaces status polling).
+
 """
 
 #! Cancel the whole post’s future publishing  ///////////////////////////////////////////////////////////////////////////
@@ -580,6 +851,7 @@ def cancel_post_future(post_id):
 
     # Proceed to cancel all future jobs for this post
     result = cancel_entire_post_future(post_id, as_status="canceled")
+    db.session.commit()  # persists platform/post status (and sends their live events)
     return jsonify({"ok": True, **result}), 200
 
     
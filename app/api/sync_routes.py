@@ -0,0 +1,45 @@
+"""
+sync_routes.py (delta sync)
+
+GET /api/sync?since=<cursor>&limit=<n> – rows created/updated since the cursor + tombstones for deletes.
+
+"""
+
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from app.services.sync import changes_since, current_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+sync_routes = Blueprint('sync', __name__)
+
+#! Delta sync ///////////////////////////////////////////////////////////////////////////
+@sync_routes.route('', methods=['GET'])
+@login_required
+def delta_sync():
+    """
+    GET /api/sync?since=<cursor> – posts, post_platforms, post_media and media changed since the cursor
+
+    - No `since`: returns {"reset": true, "cursor": <current>}; load the full collections once,
+      then keep calling with the returned cursor.
+    - `reset: true` also comes back when the cursor is older than the compacted tombstone log.
+    - Keep calling while `has_more` is true.
+    """
+    since = request.args.get('since')
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    try:
+        if since is None:
+            return jsonify({'cursor': current_cursor(current_user.id), 'has_more': False, 'reset': True,
+                            'changes': {}, 'deleted': {}}), 200
+        try:
+            cursor = int(since)
+        except ValueError:
+            return jsonify({'error': 'since must be an integer cursor'}), 400
+        if cursor < 0:
+            return jsonify({'error': 'since must be an integer cursor'}), 400
+
+        return jsonify(changes_since(current_user.id, cursor, limit)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -3,7 +3,8 @@
 
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from app.models import db, UserPlatform, SocialPlatform
+from app.models import db, UserPlatform
+from app.services.platform_cache import platform_cache
 from app.utils.encryption import mask_token
 from datetime import datetime, timezone
 import re
@@ -96,7 +97,7 @@ def get_user_platforms():
             platform_data = user_platform.to_dict(include_tokens=False)  # Use masked tokens
             
             # Add platform information
-            platform_data['platform_name'] = user_platform.platform.name
+            platform_data['platform_name'] = platform_cache.name(user_platform.platform_id)
             
             # Add token status
             platform_data['token_status'] = get_token_status(user_platform.token_expiry)
@@ -130,7 +131,11 @@ def create_user_platform():
         token_expiry = data.get('token_expiry')
         
         # Validate platform exists
-        platform = SocialPlatform.query.get(platform_id)
+        try:
+            platform_id = int(platform_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'platform_id must be a valid integer'}), 400
+        platform = platform_cache.get(platform_id)
         if not platform:
             return jsonify({'error': 'Platform not found'}), 404
         
@@ -166,7 +171,7 @@ def create_user_platform():
         
         # Return created connection with platform info
         platform_data = new_user_platform.to_dict(include_tokens=False)  # Use masked tokens
-        platform_data['platform_name'] = new_user_platform.platform.name
+        platform_data['platform_name'] = platform_cache.name(new_user_platform.platform_id)
         platform_data['token_status'] = get_token_status(new_user_platform.token_expiry)
         
         return jsonify({'user_platform': platform_data}), 201
@@ -195,7 +200,7 @@ def get_user_platform(user_platform_id):
         
         # Return platform data with additional info
         platform_data = user_platform.to_dict(include_tokens=False)  # Use masked tokens
-        platform_data['platform_name'] = user_platform.platform.name
+        platform_data['platform_name'] = platform_cache.name(user_platform.platform_id)
         platform_data['token_status'] = get_token_status(user_platform.token_expiry)
         
         return jsonify({'user_platform': platform_data}), 200
@@ -254,7 +259,7 @@ def update_user_platform(user_platform_id):
         
         # Return updated platform data
         platform_data = user_platform.to_dict(include_tokens=False)  # Use masked tokens
-        platform_data['platform_name'] = user_platform.platform.name
+        platform_data['platform_name'] = platform_cache.name(user_platform.platform_id)
         platform_data['token_status'] = get_token_status(user_platform.token_expiry)
         
         return jsonify({'user_platform': platform_data}), 200
@@ -340,7 +345,7 @@ def refresh_user_platform_token(user_platform_id):
         
         # Return updated platform data
         platform_data = user_platform.to_dict(include_tokens=False)  # Use masked tokens
-        platform_data['platform_name'] = user_platform.platform.name
+        platform_data['platform_name'] = platform_cache.name(user_platform.platform_id)
         platform_data['token_status'] = get_token_status(user_platform.token_expiry)
         
         return jsonify({'user_platform': platform_data}), 200
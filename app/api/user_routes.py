@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from flask_login import login_required, current_user
+from flask_login import login_required, current_user, login_user
 from app.models import db, User
 
 
@@ -90,9 +90,12 @@ def update_user(user_id):
             if len(new_password) < 6:
                 return jsonify({'error': 'Password must be at least 6 characters long'}), 400
             
-            user.password = new_password
+            user.password = new_password  # bumps session_version: other sessions are signed out
         
-        db.session.commit()
+        db.session.commit()  # the commit also invalidates user_cache in every process
+        
+        if 'password' in data:
+            login_user(user)  # re-issue this session with the new session_version
         
         return jsonify({'user': user.to_dict()}), 200
         
@@ -10,5 +10,25 @@ class Config:
     # so the connection uri must be updated here (for production)
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         'DATABASE_URL').replace('postgres://', 'postgresql://')
-    SQLALCHEMY_ECHO = True
-    REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
\ No newline at end of file
+    # Statement logging is for local debugging only; per-request counts come from app/extensions/sql_profiler.py
+    SQLALCHEMY_ECHO = os.environ.get("SQLALCHEMY_ECHO", "0") == "1"
+    SQL_SLOW_REQUEST_MS = int(os.environ.get("SQL_SLOW_REQUEST_MS", "500"))
+    SQL_PROFILE_SAMPLE_RATE = float(os.environ.get("SQL_PROFILE_SAMPLE_RATE", "0.1"))
+    # Tracing (app/extensions/tracing.py): none | console | file | otlp
+    TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "none")
+    TRACING_FILE = os.environ.get("TRACING_FILE", "instance/traces.jsonl")
+    OTEL_SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "poststride")
+    # Scheduler SLO (app/services/scheduler_slo.py): share of posts out within N seconds
+    SCHEDULER_SLO_SECONDS = int(os.environ.get("SCHEDULER_SLO_SECONDS", "60"))
+    SCHEDULER_SLO_TARGET = float(os.environ.get("SCHEDULER_SLO_TARGET", "0.99"))
+    # Read replica for @read_only views (app/extensions/db_routing.py); unset = everything on the primary
+    REPLICA_DATABASE_URL = (os.environ.get("REPLICA_DATABASE_URL") or "").replace('postgres://', 'postgresql://') or None
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+    REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    # Delta sync (app/services/sync.py): changes younger than this never advance a client's cursor
+    SYNC_VISIBILITY_LAG_SECONDS = int(os.environ.get("SYNC_VISIBILITY_LAG_SECONDS", "30"))
+    # Authenticated-user cache (app/services/user_cache.py)
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "30"))
+    USER_CACHE_REDIS = os.environ.get("USER_CACHE_REDIS", "0") == "1"
+    # Static files: let the front server stream files (nginx X-Accel / Apache X-Sendfile)
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "0") == "1"
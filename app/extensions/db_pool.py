@@ -0,0 +1,119 @@
+#! Database connection pooling per process role
+"""
+SQLALCHEMY_ENGINE_OPTIONS built by create_app(profile) from the environment.
+
+Two modes (DB_POOL_MODE):
+  queue      (default) a pool per process; size, overflow, timeout, recycle
+             and pre-ping default per role (ROLE_DEFAULTS) and can be set with
+             DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE /
+             DB_POOL_PRE_PING, or per role with a suffix (DB_POOL_SIZE_WORKER=1).
+  pgbouncer  for PgBouncer in transaction pooling mode: no client-side pool
+             (NullPool), every session borrows a server connection from
+             PgBouncer only for the length of its transaction. Session state
+             (SET, advisory locks, LISTEN, server-side prepared statements)
+             does not survive between transactions in this mode.
+
+Checkout wait (time to get a connection from the pool, or to connect in
+pgbouncer mode) is observed in poststride_db_pool_wait_seconds{role};
+checkouts that give up after pool_timeout count in
+poststride_db_pool_timeouts_total{role}.
+
+Fork safety: a forked child (RQ work horse, gunicorn --preload worker) must
+not reuse the parent's sockets. init_db_pool registers an os.register_at_fork
+hook that swaps in a fresh pool in the child without closing the parent's
+connections (engine.dispose(close=False)); MetricsWorker closes the horse's
+own connections before the horse exits.
+
+SQLite (local dev) keeps SQLAlchemy's defaults.
+"""
+import os
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.extensions.metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT_SECONDS
+
+ROLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    # gunicorn worker: concurrent requests share the pool
+    "web": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 10},
+    # one job per work horse, one session at a time
+    "worker": {"pool_size": 1, "max_overflow": 2, "pool_timeout": 30},
+    "cli": {"pool_size": 1, "max_overflow": 2, "pool_timeout": 30},
+}
+DEFAULT_RECYCLE = 1800  # below typical server / load balancer idle timeouts
+_engines: List[Any] = []
+
+
+#! Timed pools ///////////////////////////////////////////////////////////////////////////
+class _TimedCheckout:
+    """Observes how long each checkout waited (queue) or took to connect (null pool)."""
+
+    role = "web"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.role).inc()
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(self.role).observe(time.perf_counter() - started)
+
+
+def _timed_pool(base, role: str):
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"role": role})
+
+
+#! engine_options ///////////////////////////////////////////////////////////////////////////
+def _setting(environ, name: str, role: str, default, cast):
+    raw = environ.get(f"{name}_{role.upper()}", environ.get(name))
+    if raw is None or raw == "":
+        return default
+    if cast is bool:
+        return raw.lower() in ("1", "true", "yes", "on")
+    return cast(raw)
+
+
+def engine_options(role: str, database_uri: str, environ=os.environ) -> Dict[str, Any]:
+    """create_engine() options for this process role (web / worker / cli)."""
+    if not database_uri or database_uri.startswith("sqlite"):
+        return {}
+    mode = _setting(environ, "DB_POOL_MODE", role, "queue", str).lower()
+    if mode == "pgbouncer":
+        return {"poolclass": _timed_pool(NullPool, role)}
+    if mode != "queue":
+        raise ValueError(f"DB_POOL_MODE must be 'queue' or 'pgbouncer', not {mode!r}")
+
+    defaults = ROLE_DEFAULTS.get(role, ROLE_DEFAULTS["web"])
+    return {
+        "poolclass": _timed_pool(QueuePool, role),
+        "pool_size": _setting(environ, "DB_POOL_SIZE", role, defaults["pool_size"], int),
+        "max_overflow": _setting(environ, "DB_MAX_OVERFLOW", role, defaults["max_overflow"], int),
+        "pool_timeout": _setting(environ, "DB_POOL_TIMEOUT", role, defaults["pool_timeout"], float),
+        "pool_recycle": _setting(environ, "DB_POOL_RECYCLE", role, DEFAULT_RECYCLE, int),
+        "pool_pre_ping": _setting(environ, "DB_POOL_PRE_PING", role, True, bool),
+    }
+
+
+#! init_db_pool ///////////////////////////////////////////////////////////////////////////
+def _reset_after_fork() -> None:
+    for engine in _engines:
+        engine.dispose(close=False)  # the parent still owns those sockets
+
+
+def dispose_engines() -> None:
+    """Close this process's connections (work horse, right before os._exit)."""
+    for engine in _engines:
+        engine.dispose()
+
+
+def init_db_pool(app, db) -> None:
+    """Call after db.init_app(app): tracks the app's engines for the fork hooks."""
+    with app.app_context():
+        engines = list(db.engines.values())
+    if not _engines:
+        os.register_at_fork(after_in_child=_reset_after_fork)
+    _engines.extend(engine for engine in engines if engine not in _engines)
@@ -0,0 +1,92 @@
+#! Read-replica routing for the Flask-SQLAlchemy session
+"""
+With REPLICA_DATABASE_URL set, create_app adds a "replica" bind, and views
+decorated with @read_only run their queries on it (flushes and anything
+after a write in the same transaction still go to the primary). Without a
+replica every query goes to the primary, so the decorator is always safe.
+
+Read-your-writes: a commit that wrote anything during a request marks the
+client's session cookie primary-only for REPLICA_STICKY_SECONDS (default 5),
+longer than the replica normally lags, and switches the rest of that request
+to the primary. @read_only goes under @login_required, so the user loader
+still reads the primary.
+
+Local check with two SQLite files (or two Postgres URLs):
+  DATABASE_URL=sqlite:///dev.db REPLICA_DATABASE_URL=sqlite:///replica.db flask run
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, has_request_context, session as cookie_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = "replica"
+STICKY_KEY = "_primary_until"
+DEFAULT_STICKY_SECONDS = 5
+_WROTE_KEY = "routing_wrote"
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+
+#! RoutingSession ///////////////////////////////////////////////////////////////////////////
+class RoutingSession(Session):
+    """Session whose reads go to the replica inside read_only()/replica_reads(), when one is configured."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing and not self.info.get(_WROTE_KEY):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_configured() -> bool:
+    return REPLICA_BIND in current_app.config.get("SQLALCHEMY_BINDS", {})
+
+
+def _sticky() -> bool:
+    return has_request_context() and cookie_session.get(STICKY_KEY, 0) > time.time()
+
+
+#! read_only ///////////////////////////////////////////////////////////////////////////
+@contextmanager
+def replica_reads():
+    """Route this block's reads to the replica, unless the client wrote in the last few seconds."""
+    token = _use_replica.set(replica_configured() and not _sticky())
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def read_only(view):
+    """View decorator (below @login_required): list / report endpoints that tolerate replica lag."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+#! stickiness ///////////////////////////////////////////////////////////////////////////
+@event.listens_for(RoutingSession, "after_flush")
+def _note_write(session, flush_context):
+    session.info[_WROTE_KEY] = True  # later reads in this transaction must see the flushed rows
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_to_primary(session):
+    if not session.info.pop(_WROTE_KEY, False) or not has_request_context() or not replica_configured():
+        return
+    seconds = current_app.config.get("REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS)
+    cookie_session[STICKY_KEY] = time.time() + seconds
+    _use_replica.set(False)  # the rest of this request reads its own writes too
+
+
+@event.listens_for(RoutingSession, "after_soft_rollback")
+def _forget_write(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_WROTE_KEY, None)
@@ -0,0 +1,258 @@
+#! Opt-in profiling of RQ jobs (worker side)
+"""
+Profiles every Nth job the worker runs and writes one file per job to a
+rotating directory, named <utc time>-<task>-<job id>.<ext>:
+
+  JOB_PROFILE_EVERY=20          profile every 20th job (0/unset = off)
+  JOB_PROFILE_MODE=sample       stack sampler -> .folded (default), or cprofile -> .prof
+  JOB_PROFILE_TASKS=publish_post,publish_post_platform   only these tasks (default: all)
+  JOB_PROFILE_DIR=instance/profiles   JOB_PROFILE_KEEP=200 newest files kept
+  JOB_PROFILE_INTERVAL_MS=5     sampler period
+
+The pick is made in the worker process (MetricsWorker.execute_job) where a
+plain counter survives between jobs; the forked work horse inherits the flag
+on the job object. Disabled, the cost per job is one attribute check.
+
+The sampler reads the job thread's stack from a helper thread, so the job
+itself runs unmodified code; its output is already in collapsed-stack form
+(`root;frame;frame count`). `flask profile merge` sums the files of a
+directory (filtered by task / age) into one flamegraph-ready file:
+
+  flask profile merge --task publish_post_platform -o publish.folded
+  flamegraph.pl publish.folded > publish.svg     (or load it in speedscope)
+
+.prof files merge into one pstats dump instead (snakeviz, pstats).
+"""
+import cProfile
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+import click
+from flask.cli import AppGroup
+
+PROFILE_ATTR = "_poststride_profile"
+DEFAULT_DIR = "instance/profiles"
+DEFAULT_KEEP = 200
+DEFAULT_INTERVAL_MS = 5
+_SAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _task_name(job) -> str:
+    return (job.func_name or "unknown").rsplit(".", 1)[-1]
+
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(code) -> str:
+    """'function (path:first line)': one node per function, whatever line was running."""
+    filename = code.co_filename
+    if "site-packages" + os.sep in filename:
+        filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+    elif filename.startswith(_REPO_ROOT + os.sep):
+        filename = filename[len(_REPO_ROOT) + 1:]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+#! StackSampler ///////////////////////////////////////////////////////////////////////////
+class StackSampler:
+    """Counts collapsed stacks of one thread, sampled every `interval` seconds from a helper thread."""
+
+    def __init__(self, thread_id: int, interval: float, root: str):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="job-profiler", daemon=True)
+
+    def _run(self):
+        labels = {}  # code object -> label; formatting dominates the sampler's cost
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if self._stop.is_set():
+                break  # the job is over; this would only catch stop() itself
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                stack.append(self.root)
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+#! JobProfiler ///////////////////////////////////////////////////////////////////////////
+class JobProfiler:
+    def __init__(self, every: int = 0, *, mode: str = "sample", directory: str = DEFAULT_DIR,
+                 keep: int = DEFAULT_KEEP, tasks: Optional[Iterable[str]] = None,
+                 interval_ms: float = DEFAULT_INTERVAL_MS):
+        self.every = max(int(every or 0), 0)
+        self.mode = mode if mode in ("sample", "cprofile") else "sample"
+        self.directory = directory
+        self.keep = keep
+        self.tasks = set(tasks) if tasks else None
+        self.interval = max(float(interval_ms), 1.0) / 1000
+        self._seen = 0
+
+    @classmethod
+    def from_env(cls, environ=os.environ) -> "JobProfiler":
+        tasks = [t.strip() for t in environ.get("JOB_PROFILE_TASKS", "").split(",") if t.strip()]
+        return cls(int(environ.get("JOB_PROFILE_EVERY", "0") or 0),
+                   mode=environ.get("JOB_PROFILE_MODE", "sample"),
+                   directory=environ.get("JOB_PROFILE_DIR", DEFAULT_DIR),
+                   keep=int(environ.get("JOB_PROFILE_KEEP", DEFAULT_KEEP)),
+                   tasks=tasks,
+                   interval_ms=float(environ.get("JOB_PROFILE_INTERVAL_MS", DEFAULT_INTERVAL_MS)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.every > 0
+
+    def pick(self, job) -> None:
+        """Worker process, before forking the horse: flag every Nth (matching) job."""
+        if not self.every:
+            return
+        if self.tasks is not None and _task_name(job) not in self.tasks:
+            return
+        self._seen += 1
+        if self._seen % self.every == 0:
+            setattr(job, PROFILE_ATTR, True)
+
+    def profile(self, job):
+        """Work horse: context manager around the job; a no-op unless pick() flagged it."""
+        if not getattr(job, PROFILE_ATTR, False):
+            return nullcontext()
+        return self._profile(job)
+
+    @contextmanager
+    def _profile(self, job):
+        task = _task_name(job)
+        started = datetime.utcnow()
+        if self.mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self._write(started, task, job.id, "prof", lambda path: profiler.dump_stats(path))
+            return
+
+        sampler = StackSampler(threading.get_ident(), self.interval, root=task)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+
+            def write(path):
+                with open(path, "w") as fh:
+                    for stack, count in sampler.stacks.items():
+                        fh.write(f"{stack} {count}\n")
+            self._write(started, task, job.id, "folded", write)
+
+    def _write(self, started: datetime, task: str, job_id: str, ext: str, writer) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"{started.strftime('%Y%m%dT%H%M%S')}-{_SAFE.sub('_', task)}-{_SAFE.sub('_', job_id)}.{ext}"
+            tmp = os.path.join(self.directory, f".{name}.tmp")
+            writer(tmp)
+            os.replace(tmp, os.path.join(self.directory, name))  # merge never sees a half-written file
+            self._rotate()
+        except Exception:
+            pass  # profiling must never fail a job
+
+    def _rotate(self) -> None:
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith((".folded", ".prof")))
+        for name in files[:-self.keep] if self.keep > 0 else ():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+#! merge ///////////////////////////////////////////////////////////////////////////
+def _profile_files(directory: str, ext: str, task: Optional[str], since: Optional[datetime]):
+    if not os.path.isdir(directory):
+        return []
+    out = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith("." + ext):
+            continue
+        stamp, _, rest = name.partition("-")
+        if task and not rest.startswith(_SAFE.sub("_", task) + "-"):
+            continue
+        if since is not None:
+            try:
+                if datetime.strptime(stamp, "%Y%m%dT%H%M%S") < since:
+                    continue
+            except ValueError:
+                continue
+        out.append(os.path.join(directory, name))
+    return out
+
+
+def merge_folded(paths: Iterable[str]) -> Counter:
+    stacks: Counter = Counter()
+    for path in paths:
+        with open(path) as fh:
+            for line in fh:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+profile_commands = AppGroup('profile')
+
+
+@profile_commands.command('merge')
+@click.option('--dir', 'directory', default=lambda: os.environ.get("JOB_PROFILE_DIR", DEFAULT_DIR),
+              show_default=DEFAULT_DIR)
+@click.option('--task', default=None, help='Only profiles of this task (e.g. publish_post_platform).')
+@click.option('--hours', default=None, type=float, help='Only profiles from the last N hours.')
+@click.option('--format', 'fmt', type=click.Choice(['folded', 'prof']), default='folded', show_default=True)
+@click.option('-o', '--output', default=None, help='Output file (default: stdout for folded, merged.prof for prof).')
+def merge_command(directory, task, hours, fmt, output):
+    """Merge job profiles into one collapsed-stack file (or one pstats dump)."""
+    since = datetime.utcnow() - timedelta(hours=hours) if hours else None
+    paths = _profile_files(directory, fmt, task, since)
+    if not paths:
+        raise click.ClickException(f"no .{fmt} profiles in {directory}")
+
+    if fmt == "prof":
+        import pstats
+        stats = pstats.Stats(*paths)
+        output = output or "merged.prof"
+        stats.dump_stats(output)
+        click.echo(f"merged {len(paths)} profiles into {output}", err=True)
+        stats.sort_stats("cumulative").print_stats(25)
+        return
+
+    stacks = merge_folded(paths)
+    lines = "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+    if output:
+        with open(output, "w") as fh:
+            fh.write(lines)
+        click.echo(f"merged {len(paths)} profiles ({sum(stacks.values())} samples) into {output}", err=True)
+    else:
+        click.echo(lines, nl=False)
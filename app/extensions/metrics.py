@@ -0,0 +1,237 @@
+#! Prometheus metrics shared by the web app and the RQ workers
+"""
+Metric objects live at module level and are recorded wherever the event
+happens:
+  - HTTP:      init_http_metrics(app) times every request per endpoint
+  - tasks:     MetricsWorker (worker.py) times every job in the work horse
+  - scheduler: mark_scheduled_job_status observes the fire lag
+               (scheduled_for -> started_at)
+  - statuses:  a commit hook counts status transitions of posts,
+               post_platforms and scheduled_jobs
+  - publish:   publish_post_platform counts outcomes per platform
+  - db pool:   the engine's pool times every connection checkout
+               (app/extensions/db_pool.py)
+Queue and registry sizes are read from Redis at scrape time (QueueCollector),
+so they are never stale and need no multiprocess bookkeeping.
+
+Multiprocess: with PROMETHEUS_MULTIPROC_DIR set in the environment before the
+process starts (gunicorn workers, RQ work horses), every process writes its
+samples to that directory and build_registry() aggregates them per scrape.
+Workers need it for task metrics (jobs run in forked work horses). Give web
+and workers separate directories and wipe them when the deployment restarts.
+"""
+import os
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, multiprocess, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from rq import Worker
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import queue as queue_ext
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TASK_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800)
+LAG_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 900, 3600)
+POOL_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "poststride_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "endpoint", "status"], buckets=HTTP_BUCKETS)
+TASK_SECONDS = Histogram(
+    "poststride_task_duration_seconds", "RQ job run time by task",
+    ["task", "outcome"], buckets=TASK_BUCKETS)
+SCHEDULER_FIRE_LAG_SECONDS = Histogram(
+    "poststride_scheduler_fire_lag_seconds", "Delay between scheduled_for and the worker starting the job",
+    ["job_type"], buckets=LAG_BUCKETS)
+STATUS_TRANSITIONS = Counter(
+    "poststride_status_transitions_total", "Committed status changes",
+    ["entity", "status"])
+PUBLISH_RESULTS = Counter(
+    "poststride_publish_results_total", "Per-platform publish attempts by outcome",
+    ["platform", "outcome"])
+DB_POOL_WAIT_SECONDS = Histogram(
+    "poststride_db_pool_wait_seconds", "Time to check a connection out of the pool (or connect, in pgbouncer mode)",
+    ["role"], buckets=POOL_BUCKETS)
+DB_POOL_TIMEOUTS = Counter(
+    "poststride_db_pool_timeouts_total", "Checkouts that gave up after pool_timeout",
+    ["role"])
+
+_SKIP_ENDPOINTS = {"metrics.metrics"}
+
+
+#! build_registry ///////////////////////////////////////////////////////////////////////////
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def build_registry(*, include_queue: bool = False):
+    """Registry to expose: this process's metrics, or every process's in multiprocess mode."""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = CollectorRegistry()
+        registry.register(_DefaultRegistryCollector())
+    if include_queue:
+        registry.register(QueueCollector())
+    return registry
+
+
+class _DefaultRegistryCollector:
+    """Re-exports the global registry so the queue collector can be added per scrape."""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+#! QueueCollector ///////////////////////////////////////////////////////////////////////////
+class QueueCollector:
+    """Queue depth and RQ registry sizes, read with one pipelined Redis round trip per scrape."""
+
+    def collect(self):
+        from rq import Queue
+        from rq.registry import DeferredJobRegistry, FailedJobRegistry, ScheduledJobRegistry, StartedJobRegistry
+
+        connection = queue_ext.get_redis()
+        queue = Queue(queue_ext.QUEUE_NAME, connection=connection)
+        registries = {
+            "started": StartedJobRegistry(queue=queue),
+            "failed": FailedJobRegistry(queue=queue),
+            "deferred": DeferredJobRegistry(queue=queue),
+            "scheduled": ScheduledJobRegistry(queue=queue),
+        }
+        pipe = connection.pipeline(transaction=False)
+        pipe.llen(queue.key)
+        for registry in registries.values():
+            pipe.zcard(registry.key)
+        pipe.zcard("rq:scheduler:scheduled_jobs")  # rq-scheduler's future jobs
+        try:
+            depth, *sizes, scheduler_jobs = pipe.execute()
+        except Exception:
+            return
+
+        gauge = GaugeMetricFamily("poststride_queue_depth", "Jobs waiting in the RQ queue", labels=["queue"])
+        gauge.add_metric([queue.name], depth)
+        yield gauge
+        gauge = GaugeMetricFamily("poststride_queue_registry_size", "Jobs per RQ registry",
+                                  labels=["queue", "registry"])
+        for name, size in zip(registries, sizes):
+            gauge.add_metric([queue.name, name], size)
+        yield gauge
+        yield GaugeMetricFamily("poststride_scheduler_pending_jobs", "Jobs waiting in rq-scheduler",
+                                value=scheduler_jobs)
+
+
+#! HTTP ///////////////////////////////////////////////////////////////////////////
+def init_http_metrics(app) -> None:
+    """Time every request; teardown also sees requests that ended in an unhandled exception."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _observe(exc):
+        started = g.pop("_metrics_started", None)
+        endpoint = request.endpoint or "unmatched"
+        if started is None or endpoint in _SKIP_ENDPOINTS:
+            return
+        status = 500 if exc is not None else g.pop("_metrics_status", 500)
+        HTTP_REQUEST_SECONDS.labels(request.method, endpoint, str(status)).observe(time.perf_counter() - started)
+
+
+#! Tasks ///////////////////////////////////////////////////////////////////////////
+def observe_task(task: str, outcome: str, seconds: float) -> None:
+    TASK_SECONDS.labels(task, outcome).observe(seconds)
+
+
+def observe_fire_lag(job_type: str, scheduled_for, started_at) -> None:
+    if scheduled_for and started_at:
+        SCHEDULER_FIRE_LAG_SECONDS.labels(job_type or "unknown").observe(
+            max((started_at - scheduled_for).total_seconds(), 0.0))
+
+
+def count_publish_result(platform: str, outcome: str) -> None:
+    PUBLISH_RESULTS.labels(platform or "unknown", outcome).inc()
+
+
+class MetricsWorker(Worker):
+    """
+    rq Worker that times each job inside the work horse (task = function name),
+    profiles its SQL (app/extensions/sql_profiler.py), runs it as a span of
+    the trace in its meta (app/extensions/tracing.py) and, when JOB_PROFILE_EVERY
+    is set, profiles every Nth job (app/extensions/job_profiler.py). The horse
+    closes its database connections when the job ends (app/extensions/db_pool.py).
+    """
+
+    def __init__(self, *args, **kwargs):
+        from app.extensions.job_profiler import JobProfiler
+
+        super().__init__(*args, **kwargs)
+        self.job_profiler = JobProfiler.from_env()
+
+    def execute_job(self, job, queue):
+        self.job_profiler.pick(job)  # worker process: the counter outlives the forked horses
+        return super().execute_job(job, queue)
+
+    def perform_job(self, job, queue) -> bool:
+        from app.extensions.sql_profiler import profile_queries, report
+        from app.extensions.tracing import job_span
+
+        task = (job.func_name or "unknown").rsplit(".", 1)[-1]
+        started = time.perf_counter()
+        ok = False
+        with job_span(job), profile_queries() as stats, self.job_profiler.profile(job):
+            try:
+                ok = super().perform_job(job, queue)
+                return ok
+            finally:
+                elapsed = time.perf_counter() - started
+                observe_task(task, "success" if ok else "failure", elapsed)
+                report(f"job {task} {job.id}", stats, elapsed * 1000)
+                if self._is_horse:
+                    from app.extensions.db_pool import dispose_engines
+                    dispose_engines()  # close the horse's connections before os._exit drops them
+
+
+def start_worker_metrics_server(port: int) -> None:
+    """Expose the worker's metrics (all work horses in multiprocess mode) on :port/metrics."""
+    start_http_server(port, registry=build_registry())
+
+
+#! Status transitions ///////////////////////////////////////////////////////////////////////////
+_TRANSITIONS_KEY = "metrics_status_transitions"
+_ENTITIES = {"Post": "post", "PostPlatform": "post_platform", "ScheduledJob": "scheduled_job"}
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_status_transitions(session, flush_context, instances):
+    from sqlalchemy import inspect
+
+    for obj in list(session.new) + list(session.dirty):
+        entity = _ENTITIES.get(type(obj).__name__)
+        if entity is None:
+            continue
+        history = inspect(obj).attrs.status.history
+        if history.added and history.added[0] is not None and history.added[0] not in (history.deleted or ()):
+            session.info.setdefault(_TRANSITIONS_KEY, []).append((entity, history.added[0]))
+
+
+@event.listens_for(Session, "after_commit")
+def _count_status_transitions(session):
+    for entity, status in session.info.pop(_TRANSITIONS_KEY, ()):
+        STATUS_TRANSITIONS.labels(entity, status).inc()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_status_transitions(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_TRANSITIONS_KEY, None)
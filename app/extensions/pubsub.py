@@ -0,0 +1,108 @@
+#! one Redis pub/sub subscriber per process, fanned out to in-process handlers
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.extensions import queue as queue_ext
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, dict], None]
+
+
+#! publish ///////////////////////////////////////////////////////////////////////////
+def publish(channel: str, payload: dict) -> bool:
+    """
+    Best-effort PUBLISH of a JSON payload. Never raises: losing a live-update
+    message must not fail the write that produced it.
+    """
+    try:
+        queue_ext.get_redis().publish(channel, json.dumps(payload, default=str))
+        return True
+    except Exception:
+        logger.warning("[pubsub] publish to %s failed", channel, exc_info=True)
+        return False
+
+
+#! PubSubBroker ///////////////////////////////////////////////////////////////////////////
+class PubSubBroker:
+    """
+    Holds a single Redis PSUBSCRIBE connection for the whole process and dispatches
+    each message to the handlers registered for its pattern. Thousands of SSE clients
+    (or cache invalidation listeners) then cost one Redis connection + one thread
+    (a greenlet under gevent) instead of one connection each.
+    """
+
+    def __init__(self, poll_timeout: float = 1.0):
+        self._poll_timeout = poll_timeout
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._subscribed: set = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, pattern: str, handler: Handler) -> None:
+        """Register handler(channel, payload) for a glob pattern and make sure the listener runs."""
+        with self._lock:
+            self._handlers.setdefault(pattern, []).append(handler)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pubsub-broker", daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, pattern: str, handler: Handler) -> None:
+        with self._lock:
+            handlers = self._handlers.get(pattern, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def _dispatch(self, message) -> None:
+        pattern = message.get("pattern")
+        channel = message.get("channel")
+        if isinstance(pattern, bytes):
+            pattern = pattern.decode()
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        try:
+            payload = json.loads(message.get("data"))
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            handlers = list(self._handlers.get(pattern, []))
+        for handler in handlers:
+            try:
+                handler(channel, payload)
+            except Exception:
+                logger.exception("[pubsub] handler for %s failed", pattern)
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = queue_ext.get_redis().pubsub(ignore_subscribe_messages=True)
+                self._subscribed = set()
+                while True:
+                    # (re)subscribe from this thread only; redis-py pubsub is not thread-safe
+                    with self._lock:
+                        pending = [p for p in self._handlers if p not in self._subscribed]
+                    if pending:
+                        pubsub.psubscribe(*pending)
+                        self._subscribed.update(pending)
+                    message = pubsub.get_message(timeout=self._poll_timeout)
+                    if message and message.get("type") == "pmessage":
+                        self._dispatch(message)
+                    backoff = 1.0
+            except Exception:
+                logger.warning("[pubsub] listener lost Redis, retrying in %.0fs", backoff, exc_info=True)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+broker = PubSubBroker()
@@ -5,6 +5,7 @@ from rq import Queue
 
 
 #! redis_conn & task_queue ///////////////////////////////////////////////////////////////////////////
+QUEUE_NAME = "poststride-tasks"
 redis_conn: Optional[Redis] = None
 task_queue: Optional[Queue] = None
 
@@ -12,10 +13,16 @@ task_queue: Optional[Queue] = None
 def init_redis(redis_url: str) -> None:
     global redis_conn, task_queue
     redis_conn = Redis.from_url(redis_url) # Create a Redis client connection (used by RQ Queue to store and fetch jobs)
-    task_queue = Queue("poststride-tasks", connection=redis_conn) # this is the RQ queue//////////////////////
+    task_queue = Queue(QUEUE_NAME, connection=redis_conn) # this is the RQ queue//////////////////////
 
 #! get_queue ///////////////////////////////////////////////////////////////////////////
 def get_queue() -> Queue:
     if task_queue is None:
         raise RuntimeError("RQ queue not initialized. Call init_redis() in app factory.")
-    return task_queue
\ No newline at end of file
+    return task_queue
+
+#! get_redis ///////////////////////////////////////////////////////////////////////////
+def get_redis() -> Redis:
+    if redis_conn is None:
+        raise RuntimeError("Redis not initialized. Call init_redis() in app factory.")
+    return redis_conn
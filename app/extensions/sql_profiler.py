@@ -0,0 +1,146 @@
+#! Per-request / per-job SQL profiling on SQLAlchemy engine events
+"""
+Every statement executed while a QueryStats collector is active is counted and
+timed, grouped by SQL text. SQLAlchemy sends parameters separately, so a lazy
+load repeated per row shows up as one statement with a high count (N+1).
+
+  - requests: init_sql_profiler(app) adds
+        Server-Timing: db;dur=12.4;desc="7 queries", db-repeat;desc="max 1x"
+    and logs a sampled warning for slow requests and for N+1 patterns
+  - RQ jobs:  MetricsWorker wraps each job in profile_queries() and logs the same way
+  - tests:    with query_budget(5): client.get('/api/posts')
+                  raises AssertionError listing the statements when exceeded
+
+Collectors nest (a query_budget around a test request also sees the request's
+queries) and are tracked with a ContextVar, so threads (health sampler,
+pub/sub listener) are never counted.
+"""
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_MS = 500
+N_PLUS_ONE_THRESHOLD = 5     # same statement this many times in one request/job
+LOG_SAMPLE_RATE = 0.1        # share of slow / N+1 requests that get logged
+
+_active: ContextVar[Tuple["QueryStats", ...]] = ContextVar("sql_profiler_active", default=())
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def add(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        """[(statement, times)] executed at least `threshold` times, most repeated first."""
+        return [(stmt, n) for stmt, n in self.statements.most_common() if n >= threshold]
+
+    @property
+    def max_repeat(self) -> int:
+        return self.statements.most_common(1)[0][1] if self.statements else 0
+
+    def summary(self, limit: int = 3) -> str:
+        top = "; ".join(f"{n}x {' '.join(stmt.split())[:120]}" for stmt, n in self.statements.most_common(limit))
+        return f"{self.count} queries in {self.seconds * 1000:.1f}ms; top: {top}"
+
+
+#! engine events ///////////////////////////////////////////////////////////////////////////
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        conn.info.setdefault("sql_profiler_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = _active.get()
+    started = conn.info.get("sql_profiler_started")
+    if not collectors or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    for stats in collectors:
+        stats.add(statement, elapsed)
+
+
+@contextmanager
+def profile_queries():
+    """Collect the statements run inside the block (nested collectors all see them)."""
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """Test helper: fail when the block runs more than max_queries statements."""
+    with profile_queries() as stats:
+        yield stats
+    if stats.count > max_queries:
+        raise AssertionError(f"query budget exceeded: {stats.count} > {max_queries}\n" +
+                             "\n".join(f"{n}x {stmt}" for stmt, n in stats.statements.most_common()))
+
+
+def report(label: str, stats: QueryStats, elapsed_ms: float, *, slow_ms: float = SLOW_REQUEST_MS,
+           sample_rate: float = LOG_SAMPLE_RATE) -> None:
+    """Sampled warning for a slow request/job or one with repeated statements."""
+    repeated = stats.repeated()
+    if (elapsed_ms < slow_ms and not repeated) or random.random() >= sample_rate:
+        return
+    if repeated:
+        stmt, times = repeated[0]
+        logger.warning("[sql] possible N+1 in %s: %dx %s (%s)", label, times, " ".join(stmt.split())[:200],
+                       stats.summary())
+    else:
+        logger.warning("[sql] slow %s: %.0fms, %s", label, elapsed_ms, stats.summary())
+
+
+#! Flask wiring ///////////////////////////////////////////////////////////////////////////
+def init_sql_profiler(app) -> None:
+    from flask import g, request
+
+    slow_ms = app.config.get("SQL_SLOW_REQUEST_MS", SLOW_REQUEST_MS)
+    sample_rate = app.config.get("SQL_PROFILE_SAMPLE_RATE", LOG_SAMPLE_RATE)
+
+    @app.before_request
+    def _start_sql_profile():
+        g._sql_profile = profile_queries()
+        g._sql_stats = g._sql_profile.__enter__()
+        g._sql_started = time.perf_counter()
+
+    @app.after_request
+    def _server_timing(response):
+        stats = g.get("_sql_stats")
+        if stats is not None:
+            elapsed_ms = (time.perf_counter() - g._sql_started) * 1000
+            response.headers.add("Server-Timing", f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"')
+            response.headers.add("Server-Timing", f'db-repeat;desc="max {stats.max_repeat}x"')
+            response.headers.add("Server-Timing", f"app;dur={elapsed_ms:.1f}")
+        return response
+
+    @app.teardown_request
+    def _finish_sql_profile(exc):
+        profile = g.pop("_sql_profile", None)
+        if profile is None:
+            return
+        profile.__exit__(None, None, None)
+        elapsed_ms = (time.perf_counter() - g.pop("_sql_started")) * 1000
+        report(f"{request.method} {request.path}", g.pop("_sql_stats"), elapsed_ms,
+               slow_ms=slow_ms, sample_rate=sample_rate)
@@ -0,0 +1,327 @@
+#! End-to-end tracing: API request -> RQ job -> platform publish
+"""
+Trace context is W3C `traceparent` (00-<trace_id>-<span_id>-<flags>) and
+follows the work across processes:
+  - API:       init_tracing(app) opens a span per request (continuing an incoming
+               traceparent header) and returns X-Trace-Id
+  - scheduler: the traceparent is stored in job.meta next to scheduled_job_id and
+               the trace id in scheduled_jobs.trace_id
+  - worker:    MetricsWorker runs each job inside job_span(job), a child of the
+               traceparent in its meta; child jobs get the job span's traceparent
+  - spans:     SQL statements (engine events), Redis writes (enqueue / pipeline)
+               and the outbound platform publish call
+
+Ids are always generated, so trace ids land in job meta and the database even
+with export off. TRACING_EXPORTER picks where finished spans go:
+  none     (default) nothing is exported
+  console  one JSON line per span on stderr
+  file     JSON lines appended to TRACING_FILE (offline use, grep by trace_id)
+  otlp     OpenTelemetry SDK + OTLP/HTTP exporter (OTEL_EXPORTER_OTLP_ENDPOINT,
+           OTEL_SERVICE_NAME); needs opentelemetry-sdk and
+           opentelemetry-exporter-otlp-proto-http installed
+"""
+import json
+import logging
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_META_KEY = "traceparent"
+TRACE_HEADER = "traceparent"
+TRACE_ID_HEADER = "X-Trace-Id"
+_SKIP_PREFIXES = ("/api/health", "/metrics", "/static")
+
+
+class SpanContext(NamedTuple):
+    trace_id: str      # 32 hex chars
+    span_id: str       # 16 hex chars
+    sampled: bool = True
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+_current: ContextVar[Optional[SpanContext]] = ContextVar("tracing_current", default=None)
+
+_export = None          # callable(dict) for the console / file exporters
+_otel_tracer = None     # opentelemetry Tracer when TRACING_EXPORTER=otlp
+_otel_provider = None
+
+
+def _new_id(bits: int) -> str:
+    return format(random.getrandbits(bits) or 1, f"0{bits // 4}x")
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """SpanContext from a traceparent string, or None when it is missing/invalid."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return SpanContext(parts[1], parts[2], bool(flags & 1))
+
+
+def trace_id_of(traceparent: Optional[str]) -> Optional[str]:
+    ctx = parse_traceparent(traceparent)
+    return ctx.trace_id if ctx else None
+
+
+def current_context() -> Optional[SpanContext]:
+    return _current.get()
+
+
+def outgoing_traceparent() -> str:
+    """traceparent to hand to a job: the current span, or a new root when there is none (CLI, shell)."""
+    ctx = _current.get()
+    if ctx is None:
+        ctx = SpanContext(_new_id(128), _new_id(64))
+    return ctx.traceparent
+
+
+def export_enabled() -> bool:
+    return _export is not None or _otel_tracer is not None
+
+
+#! ActiveSpan ///////////////////////////////////////////////////////////////////////////
+class ActiveSpan:
+    """One span in flight; end() exports it. Attributes can be added until then."""
+
+    __slots__ = ("name", "context", "parent_id", "attributes", "start", "_otel")
+
+    def __init__(self, name: str, parent: Optional[SpanContext], attributes: Dict[str, Any]):
+        self.name = name
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start = time.time()
+        self._otel = None
+        if _otel_tracer is not None:
+            self._otel = _otel_tracer.start_span(name, context=_otel_parent(parent), attributes=attributes)
+            sc = self._otel.get_span_context()
+            self.context = SpanContext(format(sc.trace_id, "032x"), format(sc.span_id, "016x"), sc.trace_flags.sampled)
+        else:
+            self.context = SpanContext(parent.trace_id if parent else _new_id(128), _new_id(64),
+                                       parent.sampled if parent else True)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if self._otel is not None:
+            self._otel.set_attribute(key, value)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self._otel is not None:
+            if error is not None:
+                from opentelemetry.trace import Status, StatusCode
+                self._otel.record_exception(error)
+                self._otel.set_status(Status(StatusCode.ERROR, str(error)))
+            self._otel.end()
+        elif _export is not None and self.context.sampled:
+            end = time.time()
+            record = {
+                "trace_id": self.context.trace_id,
+                "span_id": self.context.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start": self.start,
+                "duration_ms": round((end - self.start) * 1000, 3),
+                "attributes": self.attributes,
+                "pid": os.getpid(),
+            }
+            if error is not None:
+                record["error"] = f"{type(error).__name__}: {error}"
+            try:
+                _export(record)
+            except Exception:
+                logger.debug("[tracing] export failed", exc_info=True)
+
+
+def start_span(name: str, parent: Optional[SpanContext] = None, **attributes) -> ActiveSpan:
+    """Leaf span under `parent` (default: the current span); does not become current."""
+    return ActiveSpan(name, parent or _current.get(), attributes)
+
+
+@contextmanager
+def span(name: str, *, parent: Optional[SpanContext] = None, **attributes):
+    """Span that is the current context inside the block (children and outgoing jobs nest under it)."""
+    active = start_span(name, parent, **attributes)
+    token = _current.set(active.context)
+    error = None
+    try:
+        yield active
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current.reset(token)
+        active.end(error)
+
+
+@contextmanager
+def job_span(job):
+    """Worker side: run a job as a child of the traceparent stored in its meta."""
+    meta = job.meta or {}
+    parent = parse_traceparent(meta.get(TRACEPARENT_META_KEY))
+    task = (job.func_name or "unknown").rsplit(".", 1)[-1]
+    attributes = {"rq.job_id": job.id, "rq.task": task}
+    for key in ("post_id", "scheduled_job_id", "platform_id", "post_platform_id"):
+        if meta.get(key) is not None:
+            attributes[f"poststride.{key}"] = meta[key]
+    try:
+        with span(f"rq.job {task}", parent=parent, **attributes) as active:
+            yield active
+    finally:
+        flush()
+
+
+def flush() -> None:
+    """Push buffered OTLP spans; work horses leave via os._exit, which skips atexit."""
+    if _otel_provider is not None:
+        try:
+            _otel_provider.force_flush(timeout_millis=2000)
+        except Exception:
+            logger.debug("[tracing] flush failed", exc_info=True)
+
+
+#! exporters ///////////////////////////////////////////////////////////////////////////
+def _console_exporter(record: Dict[str, Any]) -> None:
+    sys.stderr.write(json.dumps(record, default=str) + "\n")
+
+
+def _file_exporter(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # O_APPEND: one write per line stays whole across threads and forked work horses, no lock needed
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def export(record: Dict[str, Any]) -> None:
+        os.write(fd, (json.dumps(record, default=str) + "\n").encode("utf-8"))
+    return export
+
+
+def _otel_parent(parent: Optional[SpanContext]):
+    if parent is None:
+        return None
+    from opentelemetry import trace
+    from opentelemetry.trace import NonRecordingSpan, SpanContext as OtelSpanContext, TraceFlags
+    return trace.set_span_in_context(NonRecordingSpan(OtelSpanContext(
+        trace_id=int(parent.trace_id, 16), span_id=int(parent.span_id, 16), is_remote=True,
+        trace_flags=TraceFlags(TraceFlags.SAMPLED if parent.sampled else TraceFlags.DEFAULT))))
+
+
+def _init_otlp(service_name: str) -> bool:
+    global _otel_tracer, _otel_provider
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("[tracing] TRACING_EXPORTER=otlp but opentelemetry-sdk / "
+                       "opentelemetry-exporter-otlp-proto-http are not installed; spans are not exported")
+        return False
+    _otel_provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    _otel_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))  # endpoint from OTEL_EXPORTER_OTLP_*
+    _otel_tracer = _otel_provider.get_tracer("poststride")
+    return True
+
+
+def configure(exporter: str, *, file_path: str = "instance/traces.jsonl", service_name: str = "poststride") -> None:
+    """Select the exporter (idempotent per process; the web app and worker.py both go through init_tracing)."""
+    global _export
+    exporter = (exporter or "none").lower()
+    if exporter == "console":
+        _export = _console_exporter
+    elif exporter == "file":
+        _export = _file_exporter(file_path)
+    elif exporter == "otlp":
+        _init_otlp(service_name)
+    elif exporter != "none":
+        logger.warning("[tracing] unknown TRACING_EXPORTER=%r; spans are not exported", exporter)
+
+
+#! SQL + Redis spans ///////////////////////////////////////////////////////////////////////////
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and export_enabled():
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        conn.info.setdefault("tracing_spans", []).append(
+            start_span(f"db {operation}", **{"db.system": conn.dialect.name, "db.statement": statement[:500]}))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("tracing_spans")
+    if spans:
+        spans.pop().end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("tracing_spans") if conn is not None else None
+    if spans:
+        spans.pop().end(exception_context.original_exception)
+
+
+def redis_span(operation: str, *, parent: Optional[SpanContext] = None, **attributes):
+    """Span around a Redis write (rq-scheduler enqueue, pipeline, queue push)."""
+    return span(f"redis {operation}", parent=parent,
+                **{"db.system": "redis", "db.operation": operation, **attributes})
+
+
+#! Flask wiring ///////////////////////////////////////////////////////////////////////////
+def init_tracing(app) -> None:
+    from flask import g, request
+
+    configure(app.config.get("TRACING_EXPORTER", "none"),
+              file_path=app.config.get("TRACING_FILE", "instance/traces.jsonl"),
+              service_name=app.config.get("OTEL_SERVICE_NAME", "poststride"))
+
+    @app.before_request
+    def _start_request_span():
+        if request.path.startswith(_SKIP_PREFIXES):
+            return
+        g._trace_span = span(f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+                             parent=parse_traceparent(request.headers.get(TRACE_HEADER)),
+                             **{"http.method": request.method, "http.target": request.path})
+        g._trace_active = g._trace_span.__enter__()
+
+    @app.after_request
+    def _trace_id_header(response):
+        active = g.get("_trace_active")
+        if active is not None:
+            active.set_attribute("http.status_code", response.status_code)
+            response.headers[TRACE_ID_HEADER] = active.context.trace_id
+        return response
+
+    @app.teardown_request
+    def _finish_request_span(exc):
+        cm = g.pop("_trace_span", None)
+        g.pop("_trace_active", None)
+        if cm is None:
+            return
+        if exc is not None:
+            try:
+                cm.__exit__(type(exc), exc, exc.__traceback__)
+            except BaseException:
+                pass
+        else:
+            cm.__exit__(None, None, None)
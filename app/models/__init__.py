@@ -8,3 +8,6 @@ from .media import Media
 from .post_media import PostMedia
 from .db import environment, SCHEMA
 from .scheduled_job import ScheduledJob
+from .sync_change import SyncChange
+from .import_job import ImportJob
+from .scheduler_lag_rollup import SchedulerLagRollup
@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from app.extensions.db_routing import RoutingSession
 
 #! //////////////////////////////////////////////
 import os
@@ -6,7 +7,7 @@ environment = os.getenv("FLASK_ENV")
 SCHEMA = os.environ.get("SCHEMA")
 #! //////////////////////////////////////////////
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})  # @read_only views read from the replica bind
 
 # helper function for adding prefix to foreign key column references in production
 def add_prefix_for_prod(attr):
@@ -0,0 +1,64 @@
+from .db import db, environment, SCHEMA, add_prefix_for_prod
+from datetime import datetime
+from app.utils.timezone_helpers import format_utc_with_z
+
+
+class ImportJob(db.Model):
+    """
+    One uploaded CSV/XLSX campaign file and the progress of the RQ job importing it
+    (see app/services/imports.py).
+    """
+    __tablename__ = 'import_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey(add_prefix_for_prod('users.id')), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)  # original upload name
+    file_format = db.Column(db.String(8), nullable=False)  # csv|xlsx
+    storage_path = db.Column(db.String(512), nullable=False)
+    error_report_path = db.Column(db.String(512))
+    status = db.Column(db.String(32), nullable=False)  # queued|running|finished|failed
+    rq_job_id = db.Column(db.String(128))
+    total_rows = db.Column(db.Integer)  # known once the worker has counted the file
+    processed_rows = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    error_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_row = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # committed with each chunk; retries resume after it
+    error_message = db.Column(db.Text)  # fatal error (unreadable file, ...)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Schema and Indexes
+    schema_args = {'schema': SCHEMA} if environment == "production" else {}
+    __table_args__ = (
+        db.Index('idx_import_jobs_user_created', 'user_id', 'created_at'),
+        schema_args,  # dict must be the last element
+    )
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at or not self.processed_rows:
+            return None
+        elapsed = ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+        return round(self.processed_rows / elapsed, 1) if elapsed > 0 else None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'file_format': self.file_format,
+            'status': self.status,
+            'total_rows': self.total_rows,
+            'processed_rows': self.processed_rows,
+            'created_count': self.created_count,
+            'error_count': self.error_count,
+            'progress': round(self.processed_rows / self.total_rows, 4) if self.total_rows else None,
+            'rows_per_second': self.rows_per_second,
+            'has_error_report': bool(self.error_report_path and self.error_count),
+            'error_message': self.error_message,
+            'started_at': format_utc_with_z(self.started_at),
+            'finished_at': format_utc_with_z(self.finished_at),
+            'created_at': format_utc_with_z(self.created_at),
+            'updated_at': format_utc_with_z(self.updated_at)
+        }
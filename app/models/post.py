@@ -1,5 +1,8 @@
 from .db import db, environment, SCHEMA, add_prefix_for_prod
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
 from app.utils.timezone_helpers import format_utc_with_z
 
 
@@ -13,6 +16,7 @@ class Post(db.Model):
     status = db.Column(db.String(50), nullable=False)  # draft|scheduled|publishing|published|partially_published|failed|canceled
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # bumped on any post/platform/media change (ETag)
 
     # Relationships
     user = db.relationship('User', back_populates='posts')
@@ -44,3 +48,41 @@ class Post(db.Model):
             'created_at': format_utc_with_z(self.created_at),
             'updated_at': format_utc_with_z(self.updated_at)
         }
+
+
+#! Post version bump ///////////////////////////////////////////////////////////////////////////
+@event.listens_for(Session, "before_flush")
+def bump_post_versions(session, flush_context, instances):
+    """
+    Increment posts.version when a post or one of its post_platforms / post_media
+    rows is inserted, updated or deleted in this flush. The version feeds the ETag
+    of the post resources, so conditional GETs only need the posts row.
+    """
+    from .post_platform import PostPlatform
+    from .post_media import PostMedia
+
+    touched = set()
+    for obj in session.dirty:
+        if isinstance(obj, Post) and session.is_modified(obj, include_collections=False):
+            touched.add(obj.id)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (PostPlatform, PostMedia)) and obj.post_id is not None:
+            touched.add(obj.post_id)
+    touched.discard(None)
+    if not touched:
+        return
+
+    not_loaded = []
+    for post_id in touched:
+        post = session.identity_map.get(identity_key(Post, post_id))
+        if post is None:
+            not_loaded.append(post_id)
+        elif post not in session.deleted:
+            post.version = Post.version + 1  # server-side increment, safe under concurrent writers
+
+    if not_loaded:
+        session.execute(
+            Post.__table__.update()
+            .where(Post.__table__.c.id.in_(not_loaded))
+            .values(version=Post.__table__.c.version + 1)
+        )
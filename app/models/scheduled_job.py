@@ -28,6 +28,7 @@ class ScheduledJob(db.Model):
     error_message = db.Column(db.Text, nullable=True)
     traceback = db.Column(db.Text, nullable=True)
     created_by_user_id = db.Column(db.Integer, nullable=True)
+    trace_id = db.Column(db.String(32), nullable=True)  # W3C trace id shared by the request and its jobs
     created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
     
@@ -40,6 +41,7 @@ class ScheduledJob(db.Model):
     schema_args = {'schema': SCHEMA} if environment == "production" else {}
     __table_args__ = (
         db.Index('idx_scheduled_jobs_status_when', 'status', 'scheduled_for'),
+        db.Index('idx_scheduled_jobs_scheduled_for', 'scheduled_for'),  # SLO rollup range scans
         schema_args,  # dict must be the last element
     )
     
@@ -62,6 +64,7 @@ class ScheduledJob(db.Model):
             'error_message': self.error_message,
             'traceback': self.traceback,
             'created_by_user_id': self.created_by_user_id,
+            'trace_id': self.trace_id,
             'created_at': format_utc_with_z(self.created_at),
             'updated_at': format_utc_with_z(self.updated_at),
         }
@@ -0,0 +1,39 @@
+from .db import db, environment, SCHEMA
+from datetime import datetime
+
+
+class SchedulerLagRollup(db.Model):
+    """
+    Pre-aggregated scheduler lag per 5-minute bucket of scheduled_for, platform
+    and queue (see app/services/scheduler_slo.py). Lags are kept as histogram
+    counts over fixed edges so buckets merge into any window without
+    rescanning scheduled_jobs.
+      fire lag:     started_at  - scheduled_for
+      delivery lag: finished_at - scheduled_for (what the SLO is measured on)
+    """
+    __tablename__ = 'scheduler_lag_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    platform_id = db.Column(db.Integer, nullable=False, default=0)  # 0 = whole-post (orchestrator) jobs
+    queue_name = db.Column(db.String(64), nullable=False)
+    fired = db.Column(db.Integer, nullable=False, default=0)  # jobs with started_at
+    delivered = db.Column(db.Integer, nullable=False, default=0)  # finished, not failed
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    missed = db.Column(db.Integer, nullable=False, default=0)  # still not finished past the SLO
+    breaches = db.Column(db.Integer, nullable=False, default=0)  # late + failed + missed
+    fire_lag_sum = db.Column(db.Float, nullable=False, default=0.0)
+    fire_lag_max = db.Column(db.Float, nullable=False, default=0.0)
+    fire_lag_hist = db.Column(db.JSON, nullable=False)
+    delivery_lag_sum = db.Column(db.Float, nullable=False, default=0.0)
+    delivery_lag_max = db.Column(db.Float, nullable=False, default=0.0)
+    delivery_lag_hist = db.Column(db.JSON, nullable=False)
+    slo_seconds = db.Column(db.Integer, nullable=False)  # threshold the breaches were counted against
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Schema and Indexes
+    schema_args = {'schema': SCHEMA} if environment == "production" else {}
+    __table_args__ = (
+        db.UniqueConstraint('bucket_start', 'platform_id', 'queue_name', name='uq_scheduler_lag_rollups_bucket'),
+        schema_args,  # dict must be the last element
+    )
@@ -0,0 +1,123 @@
+from .db import db, environment, SCHEMA
+from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+
+class SyncChange(db.Model):
+    """
+    Change log behind GET /api/sync. `id` is the monotonically increasing change
+    sequence (the client cursor). The log is compacting: recording a change deletes
+    the previous row for the same entity, so it holds at most one row per entity,
+    and old tombstones are purged by `flask sync compact` (leaving an op='purge'
+    marker per user so stale cursors know to resync from scratch).
+    """
+    __tablename__ = 'sync_changes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    entity = db.Column(db.String(32), nullable=False)  # post|post_platform|post_media|media|*
+    entity_key = db.Column(db.String(64), nullable=False)  # row id, "post_id:media_id" for post_media
+    op = db.Column(db.String(8), nullable=False)  # upsert|delete|purge
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Schema and Indexes
+    # sqlite_autoincrement: never reuse a deleted max id, or a cursor could skip a change
+    schema_args = {'schema': SCHEMA} if environment == "production" else {}
+    __table_args__ = (
+        db.Index('idx_sync_changes_user_seq', 'user_id', 'id'),
+        db.Index('idx_sync_changes_entity', 'entity', 'entity_key'),
+        {'sqlite_autoincrement': True, **schema_args},  # dict must be the last element
+    )
+
+    def to_dict(self):
+        return {
+            'seq': self.id,
+            'entity': self.entity,
+            'key': self.entity_key,
+            'op': self.op,
+            'changed_at': self.changed_at.isoformat() + 'Z' if self.changed_at else None
+        }
+
+
+#! record_sync_changes ///////////////////////////////////////////////////////////////////////////
+def record_sync_changes(connection, changes):
+    """
+    Append changes to the log: iterable of (user_id, entity, entity_key, op).
+    Drops earlier rows of the same entities first, then inserts in one executemany.
+    """
+    changes = list({(entity, key): (user_id, entity, key, op) for user_id, entity, key, op in changes}.values())
+    if not changes:
+        return
+    table = SyncChange.__table__
+    keys_by_entity = {}
+    for _, entity, key, _ in changes:
+        keys_by_entity.setdefault(entity, []).append(key)
+    for entity, keys in keys_by_entity.items():
+        connection.execute(table.delete().where(table.c.entity == entity, table.c.entity_key.in_(keys)))
+    now = datetime.utcnow()
+    connection.execute(table.insert(), [
+        {'user_id': user_id, 'entity': entity, 'entity_key': key, 'op': op, 'changed_at': now}
+        for user_id, entity, key, op in changes
+    ])
+
+
+#! Sync change listener ///////////////////////////////////////////////////////////////////////////
+@event.listens_for(Session, "after_flush")
+def log_sync_changes(session, flush_context):
+    """
+    Record inserts/updates/deletes of posts, post_platforms, post_media and media
+    flushed through the ORM. Core INSERT/UPDATEs bypass this; callers record those
+    with record_sync_changes (see app/services/media_order.py).
+    """
+    from .post import Post
+    from .post_platform import PostPlatform
+    from .post_media import PostMedia
+    from .media import Media
+
+    tracked = (Post, PostPlatform, PostMedia, Media)
+    touched = []
+    for obj in session.new:
+        if isinstance(obj, tracked):
+            touched.append((obj, 'upsert'))
+    for obj in session.dirty:
+        if isinstance(obj, tracked) and session.is_modified(obj, include_collections=False):
+            touched.append((obj, 'upsert'))
+    for obj in session.deleted:
+        if isinstance(obj, tracked):
+            touched.append((obj, 'delete'))
+    if not touched:
+        return
+
+    # Resolve owners: posts/media carry user_id; children go through their post
+    post_owner = {}
+    for obj, _ in touched:
+        if isinstance(obj, Post):
+            post_owner[obj.id] = obj.user_id
+    missing = set()
+    for obj, _ in touched:
+        if isinstance(obj, (PostPlatform, PostMedia)) and obj.post_id not in post_owner:
+            post = session.identity_map.get(identity_key(Post, obj.post_id))
+            if post is not None:
+                post_owner[obj.post_id] = post.user_id
+            else:
+                missing.add(obj.post_id)
+    connection = session.connection()
+    if missing:
+        posts = Post.__table__
+        rows = connection.execute(select(posts.c.id, posts.c.user_id).where(posts.c.id.in_(missing)))
+        post_owner.update({row.id: row.user_id for row in rows})
+
+    changes = []
+    for obj, op in touched:
+        if isinstance(obj, Post):
+            changes.append((obj.user_id, 'post', str(obj.id), op))
+        elif isinstance(obj, Media):
+            changes.append((obj.user_id, 'media', str(obj.id), op))
+        elif isinstance(obj, PostPlatform):
+            if obj.post_id in post_owner:
+                changes.append((post_owner[obj.post_id], 'post_platform', str(obj.id), op))
+        elif obj.post_id in post_owner:
+            changes.append((post_owner[obj.post_id], 'post_media', f'{obj.post_id}:{obj.media_id}', op))
+    record_sync_changes(connection, changes)
@@ -14,6 +14,7 @@ class User(db.Model, UserMixin):
     email = db.Column(db.String(255), nullable=False, unique=True)
     hashed_password = db.Column(db.String(255), nullable=False)
     timezone = db.Column(db.String(64), nullable=False, server_default='UTC')  # IANA timezone name
+    session_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # bump to end every session
 
     # Relationships
     user_platforms = db.relationship('UserPlatform', back_populates='user', cascade='all, delete-orphan')
@@ -27,10 +28,17 @@ class User(db.Model, UserMixin):
     @password.setter
     def password(self, password):
         self.hashed_password = generate_password_hash(password)
+        if self.id is not None:
+            # changing the password signs out every existing session
+            self.session_version = (self.session_version or 1) + 1
 
     def check_password(self, password):
         return check_password_hash(self.password, password)
 
+    def get_id(self):
+        # Stored in the session cookie; a session_version bump makes old cookies stop loading
+        return f'{self.id}:{self.session_version or 1}'
+
     def to_dict(self):
         return {
             'id': self.id,
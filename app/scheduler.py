@@ -14,10 +14,12 @@ from rq import Retry
 from rq.job import Job
 from rq.registry import ScheduledJobRegistry
 from rq_scheduler import Scheduler
+from rq_scheduler.utils import to_unix
 
 
 
-from app.extensions.queue import get_queue, redis_conn
+from app.extensions.queue import get_queue, get_redis
+from app.extensions import tracing
 
 # JOB_FUNC_PATH = "app.tasks.publish_post"
 #! _to_utc_naive ///////////////////////////////////////////////////////////////////////////
@@ -50,7 +52,7 @@ This function is used to return a scheduler.
 '''
 def _get_scheduler() -> Scheduler:
     # tie scheduler to the same queue/connection
-    return Scheduler(queue=get_queue(), connection=redis_conn)
+    return Scheduler(queue=get_queue(), connection=get_redis())
 
 #! schedule_post_at ///////////////////////////////////////////////////////////////////////////
 '''
@@ -88,6 +90,7 @@ def schedule_post_at(
     when_utc = _to_utc_naive(when)
     scheduler = _get_scheduler()
     queue_name = get_queue().name
+    traceparent = tracing.outgoing_traceparent()
 
     # 1) DB row
     sj = ScheduledJob(
@@ -99,6 +102,7 @@ def schedule_post_at(
         scheduled_for=when_utc,
         max_retries=max_retries,
         created_by_user_id=created_by_user_id,
+        trace_id=tracing.trace_id_of(traceparent),
     )
     db.session.add(sj)
     db.session.commit()  # ensure sj.id is available
@@ -112,17 +116,20 @@ def schedule_post_at(
         **(meta or {}),
         "post_id": post_id,
         "scheduled_job_id": sj.id,
+        tracing.TRACEPARENT_META_KEY: traceparent,
     }
 
     # 3) Enqueue via rq-scheduler (returns an RQ Job)
-    job = scheduler.enqueue_at(
-        when_utc,
-        publish_post,   # callable
-        post_id,
-        job_id=job_id,  # rq-scheduler's id
-        meta=meta_payload,
-        # retry=_retry_policy() if max_retries else None,  # enable when ready
-    )
+    with tracing.redis_span("rq-scheduler.enqueue_at", parent=tracing.parse_traceparent(traceparent),
+                            **{"rq.job_id": job_id}):
+        job = scheduler.enqueue_at(
+            when_utc,
+            publish_post,   # callable
+            post_id,
+            job_id=job_id,  # rq-scheduler's id
+            meta=meta_payload,
+            # retry=_retry_policy() if max_retries else None,  # enable when ready
+        )
 
     # 4) Persist rq_job_id to DB
     sj.rq_job_id = job.id
@@ -132,6 +139,84 @@ def schedule_post_at(
     return job
 
 
+#! schedule_posts_at_batch ///////////////////////////////////////////////////////////////////////////
+'''
+Batch version of schedule_post_at for bulk creation: one INSERT for all scheduled_jobs
+rows and one Redis round trip (pipeline) for all rq-scheduler jobs.
+'''
+def schedule_posts_at_batch(
+    entries: List[Dict[str, Any]],
+    *,
+    created_by_user_id: Optional[int] = None,
+    job_type: str = "publish",
+) -> List[Any]:
+    """
+    entries: [{"post_id": 1, "platform_id": 2, "when": datetime}, ...]
+    Returns the ScheduledJob rows (rq_job_id / enqueued_at filled in), in entry order.
+
+    Same job shape as schedule_post_at (publish_post(post_id), meta with post_id,
+    platform_id, scheduled_job_id and traceparent; the whole batch shares one trace). Caller owns the transaction: rows are flushed,
+    Redis is written (MULTI/EXEC, all or nothing), then the caller commits. If the
+    pipeline fails the exception propagates and the caller should roll back. If the
+    caller's commit fails after the pipeline ran, it must roll back and pass the
+    rows' rq_job_ids to discard_batch_jobs, or live jobs point at missing rows.
+    """
+    from app.models import db
+    from app.models.scheduled_job import ScheduledJob
+    from app.tasks import publish_post
+
+    if not entries:
+        return []
+
+    scheduler = _get_scheduler()
+    queue_name = get_queue().name
+    traceparent = tracing.outgoing_traceparent()
+    trace_id = tracing.trace_id_of(traceparent)
+
+    # 1) DB rows, one batched INSERT
+    rows = []
+    for entry in entries:
+        rows.append(ScheduledJob(
+            post_id=entry["post_id"],
+            platform_id=entry.get("platform_id"),
+            job_type=job_type,
+            queue_name=queue_name,
+            status="scheduled",
+            scheduled_for=_to_utc_naive(entry["when"]),
+            max_retries=0,
+            created_by_user_id=created_by_user_id,
+            trace_id=trace_id,
+        ))
+    db.session.add_all(rows)
+    db.session.flush()  # ids for job meta
+
+    # 2) Build jobs without saving, then save + add to the schedule in one pipeline
+    pipe = scheduler.connection.pipeline()
+    for sj in rows:
+        ts = int(sj.scheduled_for.timestamp())
+        job = scheduler._create_job(
+            publish_post,
+            args=(sj.post_id,),
+            id=f"{job_type}-{sj.post_id}-{sj.platform_id or 'all'}-{sj.id}-{ts}",
+            meta={"post_id": sj.post_id, "scheduled_job_id": sj.id, tracing.TRACEPARENT_META_KEY: traceparent,
+                  **({"platform_id": sj.platform_id} if sj.platform_id is not None else {})},
+            commit=False,
+        )
+        job.save(pipeline=pipe)
+        pipe.zadd(scheduler.scheduled_jobs_key, {job.id: to_unix(sj.scheduled_for)})  # same score as enqueue_at
+        sj.rq_job_id = job.id
+
+    with tracing.redis_span("rq-scheduler.pipeline", parent=tracing.parse_traceparent(traceparent),
+                            **{"rq.jobs": len(rows)}):
+        pipe.execute()
+
+    # 3) Persist rq_job_id + enqueued_at (flushed with the caller's commit)
+    now = datetime.utcnow()
+    for sj in rows:
+        sj.enqueued_at = now
+    return rows
+
+
 #! list_scheduled_job_ids ///////////////////////////////////////////////////////////////////////////
 '''
 This function is used to list scheduled job ids.
@@ -148,7 +233,7 @@ This function is used to fetch a job by id.
 '''
 def fetch_job(job_id: str) -> Optional[Job]:
     try:
-        return Job.fetch(job_id, connection=redis_conn)
+        return Job.fetch(job_id, connection=get_redis())
     except Exception:
         return None
 
@@ -365,6 +450,7 @@ def reschedule(scheduled_job_id: int, new_when: datetime, *, created_by_user_id:
 
     when_utc = _to_utc_naive(new_when)
     queue_name = get_queue().name
+    traceparent = tracing.outgoing_traceparent()
 
     # create new row
     new_sj = ScheduledJob(
@@ -376,6 +462,7 @@ def reschedule(scheduled_job_id: int, new_when: datetime, *, created_by_user_id:
         scheduled_for=when_utc,
         max_retries=old.max_retries,
         created_by_user_id=created_by_user_id,
+        trace_id=tracing.trace_id_of(traceparent),
     )
     db.session.add(new_sj)
     db.session.commit()
@@ -385,15 +472,18 @@ def reschedule(scheduled_job_id: int, new_when: datetime, *, created_by_user_id:
     ts = int(when_utc.timestamp())
     job_id = f"{new_sj.job_type}-{new_sj.post_id}-{new_sj.platform_id or 'all'}-{new_sj.id}-{ts}"
 
-    job = scheduler.enqueue_at(
-        when_utc,
-        publish_post,                 # def publish_post(post_id: int)
-        new_sj.post_id,               # ONLY positional arg
-        job_id=job_id,                # <- sanitized
-        meta={"post_id": new_sj.post_id, "scheduled_job_id": new_sj.id,
-              **({"platform_id": new_sj.platform_id} if new_sj.platform_id is not None else {})},
-        # retry=_retry_policy() if new_sj.max_retries else None,
-    )
+    with tracing.redis_span("rq-scheduler.enqueue_at", parent=tracing.parse_traceparent(traceparent),
+                            **{"rq.job_id": job_id}):
+        job = scheduler.enqueue_at(
+            when_utc,
+            publish_post,                 # def publish_post(post_id: int)
+            new_sj.post_id,               # ONLY positional arg
+            job_id=job_id,                # <- sanitized
+            meta={"post_id": new_sj.post_id, "scheduled_job_id": new_sj.id,
+                  tracing.TRACEPARENT_META_KEY: traceparent,
+                  **({"platform_id": new_sj.platform_id} if new_sj.platform_id is not None else {})},
+            # retry=_retry_policy() if new_sj.max_retries else None,
+        )
 
     new_sj.rq_job_id = job.id
     new_sj.enqueued_at = datetime.utcnow()
@@ -453,12 +543,30 @@ I DO NOT USE THIS FUNCTION. I WILL DELETE THIS FUNCTION IF I DO NOT USE IT.
 def cancel_recurring(job_id: str) -> bool:
     scheduler = _get_scheduler()
     try:
-        job = scheduler.job_class.fetch(job_id, connection=redis_conn)
+        job = scheduler.job_class.fetch(job_id, connection=scheduler.connection)
         scheduler.cancel(job)
         return True
     except Exception:
         return False
 
+#! discard_batch_jobs ///////////////////////////////////////////////////////////////////////////
+'''
+Undo schedule_posts_at_batch in Redis when the caller's commit failed: one pipeline
+removes the jobs from rq-scheduler's zset, from the queue (if one already fired) and
+deletes their hashes. No DB updates (the rows were rolled back).
+'''
+def discard_batch_jobs(rq_job_ids: List[str]) -> None:
+    if not rq_job_ids:
+        return
+    scheduler = _get_scheduler()
+    queue = get_queue()
+    pipe = scheduler.connection.pipeline()
+    pipe.zrem(scheduler.scheduled_jobs_key, *rq_job_ids)
+    for job_id in rq_job_ids:
+        pipe.lrem(queue.key, 0, job_id)
+        pipe.delete(Job.key_for(job_id), Job.dependents_key_for(job_id))
+    pipe.execute()
+
 # ---- low-level helper (kept separate) ----
 def cancel_rq_only(rq_job_id: str) -> bool:
     """
@@ -500,12 +608,13 @@ def mark_scheduled_job_status(
 ) -> None:
     """
     Update scheduled_jobs.status and standard timestamps.
-    Allowed statuses: 'scheduled','queued','started','finished','failed','canceled'
-    Safe to call multiple times.
+    Allowed statuses: 'scheduled','queued','started'/'pending','finished'/'published','failed','canceled'
+    Safe to call multiple times; started_at is stamped once and feeds the fire-lag histogram.
     """
     # Local imports avoid circulars
     from app.models import db
     from app.models.scheduled_job import ScheduledJob
+    from app.extensions.metrics import observe_fire_lag
 
     sj = ScheduledJob.query.get(scheduled_job_id)
     if not sj:
@@ -514,9 +623,12 @@ def mark_scheduled_job_status(
     now = datetime.utcnow()
     sj.status = status
 
-    if status == "started":
-        sj.started_at = now
-    elif status in ("finished", "failed"):
+    if status in ("started", "pending"):
+        # publish_post reports "pending" when the worker picks the job up
+        if sj.started_at is None:
+            sj.started_at = now
+            observe_fire_lag(sj.job_type, sj.scheduled_for, now)
+    elif status in ("finished", "published", "failed"):
         sj.finished_at = now
     elif status == "canceled":
         sj.canceled_at = now
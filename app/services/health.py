@@ -0,0 +1,163 @@
+# app/services/health.py
+"""
+Background health sampler behind GET /api/health/ready.
+
+Each check runs on its own interval in a small thread pool, bounded by a timeout,
+and its last result is kept in memory. The endpoint only reads that snapshot,
+so probes cost nothing and a hanging Redis or database cannot stall them:
+a check still running past its timeout is reported as "timeout", and a result
+older than its stale_after is reported as "stale".
+
+The sampler starts with the first probe in each process (and restarts after a
+fork); that first probe waits for one round, bounded by the check timeouts.
+"""
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from redis import Redis
+from rq import Queue
+from sqlalchemy import text
+
+from app.extensions.queue import QUEUE_NAME
+
+TICK_SECONDS = 0.5
+DISK_MIN_FREE_BYTES = 500 * 1024 * 1024
+REQUIRED_ENV = ("SECRET_KEY", "DATABASE_URL", "REDIS_URL")
+
+
+class Check:
+    """One sampled dependency. fn() returns extra fields for the snapshot or raises."""
+
+    def __init__(self, name: str, fn: Callable[[], dict], *, interval: float, timeout: float, critical: bool):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.timeout = timeout
+        self.critical = critical
+        self.stale_after = interval * 3 + timeout
+        self.next_run = 0.0
+        self.future = None
+        self.started = 0.0
+        self.result: Optional[dict] = None
+
+
+#! HealthSampler ///////////////////////////////////////////////////////////////////////////
+class HealthSampler:
+
+    def __init__(self):
+        self._checks: List[Check] = []
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._app = None
+        self._redis: Optional[Redis] = None
+
+    # ---- checks ------------------------------------------------------------
+    def _check_database(self) -> dict:
+        from app.models import db
+
+        with self._app.app_context():
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        return {}
+
+    def _check_redis(self) -> dict:
+        self._redis.ping()
+        return {}
+
+    def _check_queue(self) -> dict:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.llen(Queue(QUEUE_NAME, connection=self._redis).key)
+        pipe.zcard("rq:scheduler:scheduled_jobs")
+        backlog, scheduled = pipe.execute()
+        return {"queue": QUEUE_NAME, "backlog": backlog, "scheduled": scheduled}
+
+    @staticmethod
+    def _check_disk() -> dict:
+        free = shutil.disk_usage("/").free
+        return {"status": "healthy" if free >= DISK_MIN_FREE_BYTES else "unhealthy", "free_bytes": free}
+
+    def _build_checks(self) -> List[Check]:
+        return [
+            Check("database", self._check_database, interval=5, timeout=2, critical=True),
+            Check("redis", self._check_redis, interval=5, timeout=1, critical=False),  # optional service
+            Check("queue", self._check_queue, interval=10, timeout=1, critical=False),  # a stat, not a gate
+            Check("disk", self._check_disk, interval=30, timeout=2, critical=True),
+        ]
+
+    # ---- lifecycle ---------------------------------------------------------
+    def ensure_started(self, app) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._app = app
+            self._redis = Redis.from_url(app.config["REDIS_URL"], socket_connect_timeout=0.5, socket_timeout=0.5)
+            self._checks = self._build_checks()
+            self._executor = ThreadPoolExecutor(max_workers=len(self._checks), thread_name_prefix="health-check")
+            self._submit_due(time.monotonic())
+            wait([check.future for check in self._checks], timeout=max(check.timeout for check in self._checks))
+            threading.Thread(target=self._run, name="health-sampler", daemon=True).start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._submit_due(time.monotonic())
+            except RuntimeError:
+                return  # executor shut down: interpreter exiting
+            time.sleep(TICK_SECONDS)
+
+    def _submit_due(self, now: float) -> None:
+        for check in self._checks:
+            if (check.future is None or check.future.done()) and now >= check.next_run:
+                check.started = now
+                check.next_run = now + check.interval
+                check.future = self._executor.submit(self._sample, check)
+
+    def _sample(self, check: Check) -> None:
+        started = time.monotonic()
+        try:
+            result = {"status": "healthy", **check.fn()}
+        except Exception as e:
+            result = {"status": "unhealthy", "error": str(e)[:200]}
+        finished = time.monotonic()
+        result["latency_ms"] = round((finished - started) * 1000, 1)
+        result["checked_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        result["_at"] = finished
+        check.result = result
+
+    # ---- read side ---------------------------------------------------------
+    def snapshot(self) -> Dict[str, object]:
+        """{"status": healthy|unhealthy, "checks": {...}} from memory; never blocks on a dependency."""
+        now = time.monotonic()
+        checks, overall = {}, "healthy"
+        for check in self._checks:
+            entry = {k: v for k, v in (check.result or {"status": "unknown"}).items() if k != "_at"}
+            if check.result:
+                entry["age_sec"] = round(now - check.result["_at"], 1)
+                if entry["age_sec"] > check.stale_after:
+                    entry["status"] = "stale"
+            if check.future is not None and not check.future.done() and now - check.started > check.timeout:
+                entry["status"] = "timeout"
+                entry["running_sec"] = round(now - check.started, 1)
+            if check.critical and entry["status"] != "healthy":
+                overall = "unhealthy"
+            checks[check.name] = entry
+
+        missing = [name for name in REQUIRED_ENV if not os.environ.get(name)]
+        if missing:
+            checks["environment"] = {"status": "unhealthy", "missing": len(missing)}
+            overall = "unhealthy"
+        else:
+            checks["environment"] = {"status": "healthy"}
+        return {"status": overall, "checks": checks}
+
+
+health_sampler = HealthSampler()
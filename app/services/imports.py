@@ -0,0 +1,314 @@
+# app/services/imports.py
+"""
+CSV/XLSX campaign import (POST /api/imports).
+
+The web request only stores the upload and enqueues `app.tasks.process_import`.
+The worker streams the file (csv.reader / openpyxl read-only mode), turns
+each row into a bulk-create item and feeds IMPORT_CHUNK_SIZE rows at a time to
+app.services.posts_bulk.bulk_create_posts, so memory stays bounded by the chunk
+and every chunk is its own transaction. Rejected rows are appended to a CSV
+error report as they happen; progress and rows/sec are persisted on the
+import_jobs row after every chunk. The stored upload is deleted once the
+import finishes; the error report is kept for download.
+
+Retries resume: each chunk's posts, counters and import_jobs.last_row (its
+last spreadsheet row) commit together, so a retried job (failed, or still
+'running' after its work horse was killed) skips the rows up to last_row and
+keeps counting from there.
+
+Expected columns (header row, case-insensitive):
+  caption, scheduled_time, status, platforms, platform_caption, media
+`platforms` holds platform ids or names and `media` holds media ids, separated
+by ';' or '|' (e.g. "Instagram;LinkedIn", "12|13").
+"""
+import csv
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app
+
+from app.models import db, ImportJob, User
+from app.services.platform_cache import platform_cache
+from app.services.posts_bulk import bulk_create_posts, BulkSchedulingError
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+IMPORT_CHUNK_SIZE = 500
+IMPORT_JOB_TIMEOUT = 60 * 60  # seconds; 5k rows take well under a minute
+MAX_IMPORT_BYTES = 20 * 1024 * 1024
+
+_LIST_SEPARATOR = re.compile(r'[;|]')
+
+
+#! storage ///////////////////////////////////////////////////////////////////////////
+def _storage_dir() -> str:
+    """
+    IMPORT_STORAGE_DIR, default <instance>/imports. Web and worker must share it
+    (same host or a mounted volume).
+    """
+    path = current_app.config.get('IMPORT_STORAGE_DIR') or os.path.join(current_app.instance_path, 'imports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def store_upload(file_storage, file_format: str) -> str:
+    """Stream an uploaded werkzeug FileStorage to disk; returns the stored path."""
+    path = os.path.join(_storage_dir(), f'{uuid.uuid4().hex}.{file_format}')
+    file_storage.save(path)
+    return path
+
+
+def _remove_upload(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        current_app.logger.warning(f'[imports] could not remove upload {path}', exc_info=True)
+
+
+def detect_format(filename: str) -> Optional[str]:
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    return extension if extension in IMPORT_FORMATS else None
+
+
+#! reading ///////////////////////////////////////////////////////////////////////////
+def _load_workbook(path: str):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError('XLSX imports need openpyxl installed (pip install openpyxl); upload a CSV instead')
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def iter_rows(path: str, file_format: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Yield (row_number, {column: text}) one row at a time. row_number is the
+    spreadsheet line (header is line 1).
+    """
+    if file_format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            reader = csv.reader(handle)
+            header = [name.strip().lower() for name in next(reader, [])]
+            for row_number, values in enumerate(reader, start=2):
+                if any(value.strip() for value in values):
+                    yield row_number, dict(zip(header, (value.strip() for value in values)))
+        return
+
+    workbook = _load_workbook(path)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_cell_text(name).lower() for name in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            texts = [_cell_text(value) for value in values]
+            if any(texts):
+                yield row_number, dict(zip(header, texts))
+    finally:
+        workbook.close()
+
+
+def count_rows(path: str, file_format: str) -> int:
+    """Data rows in the file (for the progress bar); one cheap streaming pass, skipping blank rows like iter_rows."""
+    if file_format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            reader = csv.reader(handle)
+            next(reader, None)  # header
+            return sum(1 for values in reader if any(value.strip() for value in values))
+    workbook = _load_workbook(path)
+    try:
+        # not max_row: read-only sheets report their stored dimensions, formatted-only rows included
+        rows = workbook.active.iter_rows(values_only=True)
+        next(rows, None)  # header
+        return sum(1 for values in rows if any(_cell_text(value) for value in values))
+    finally:
+        workbook.close()
+
+
+#! row → bulk item ///////////////////////////////////////////////////////////////////////////
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in _LIST_SEPARATOR.split(value or '') if part.strip()]
+
+
+def row_to_item(row: Dict[str, str], platforms_by_name: Dict[str, int]) -> Tuple[dict, List[str]]:
+    """Map a spreadsheet row onto the POST /api/posts/bulk item shape."""
+    errors = []
+    platforms = []
+    for token in _split(row.get('platforms')):
+        platform_id = int(token) if token.isdigit() else platforms_by_name.get(token.lower())
+        if platform_id is None:
+            errors.append(f'Unknown platform "{token}"')
+            continue
+        entry = {'platform_id': platform_id}
+        if row.get('platform_caption'):
+            entry['platform_caption'] = row['platform_caption']
+        platforms.append(entry)
+
+    media = []
+    for token in _split(row.get('media')):
+        if not token.isdigit():
+            errors.append(f'Invalid media id "{token}"')
+            continue
+        media.append(int(token))
+
+    item = {
+        'caption': row.get('caption'),
+        'scheduled_time': row.get('scheduled_time') or None,
+        'status': row.get('status') or None,
+        'platforms': platforms,
+        'media': media,
+    }
+    return item, errors
+
+
+#! error report ///////////////////////////////////////////////////////////////////////////
+class _ErrorReport:
+    """Append-only CSV of rejected rows: row, errors, then the original columns (continued on resume)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._handle = None
+        self._writer = None
+        self._columns: List[str] = []
+
+    def write(self, row_number: int, row: Dict[str, str], errors: List[str]) -> None:
+        if self._writer is None:
+            if os.path.exists(self.path) and os.path.getsize(self.path):
+                with open(self.path, newline='', encoding='utf-8') as handle:
+                    self._columns = next(csv.reader(handle), [])[2:]  # header of the earlier attempt
+            self._handle = open(self.path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._handle)
+            if not self._columns:
+                self._columns = list(row.keys())
+                self._writer.writerow(['row', 'errors', *self._columns])
+        self._writer.writerow([row_number, '; '.join(errors), *(row.get(column, '') for column in self._columns)])
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+
+
+#! run_import ///////////////////////////////////////////////////////////////////////////
+def _import_chunk(import_job: ImportJob, user: User, chunk, report: _ErrorReport) -> None:
+    """
+    Create one chunk of rows and commit its progress (last_row, counters) in the
+    same transaction. Rejections reach the report only after that commit, so a
+    retried chunk is not reported twice.
+    """
+    items, item_rows, rejections = [], [], []
+    for row_number, row, item, errors in chunk:
+        if errors:
+            rejections.append((row_number, row, errors))
+        else:
+            items.append(item)
+            item_rows.append((row_number, row))
+
+    def advance(created: int, failed: int) -> None:
+        import_job.processed_rows += len(chunk)
+        import_job.created_count += created
+        import_job.error_count += failed
+        import_job.last_row = chunk[-1][0]
+
+    rejected = len(rejections)
+    if not items:
+        advance(0, rejected)
+        db.session.commit()
+    else:
+        try:
+            result = bulk_create_posts(user, items, before_commit=lambda created, failed: advance(created, rejected + failed))
+        except BulkSchedulingError as e:  # rolled back: nothing of this chunk was created
+            rejections += [(row_number, row, [f'Scheduler unavailable: {e}']) for row_number, row in item_rows]
+            advance(0, len(rejections))
+            db.session.commit()
+        else:
+            if not result['created']:  # every item invalid: bulk_create_posts returned without committing
+                advance(0, rejected + result['failed'])
+                db.session.commit()
+            rejections += [(row_number, row, item_result['errors'])
+                           for (row_number, row), item_result in zip(item_rows, result['results']) if not item_result['ok']]
+
+    for row_number, row, errors in sorted(rejections, key=lambda rejection: rejection[0]):
+        report.write(row_number, row, errors)
+
+
+def run_import(import_job_id: int) -> dict:
+    """
+    Worker entry point (app.tasks.process_import). Safe to retry: finished jobs
+    are skipped, and a failed or interrupted job resumes after its last committed
+    row without creating those posts again.
+    """
+    import_job = ImportJob.query.get(import_job_id)
+    if not import_job or import_job.status == 'finished':
+        return {'ok': False, 'import_job_id': import_job_id, 'skipped': True}
+    user = User.query.get(import_job.user_id)
+
+    resume_after = import_job.last_row or 0
+    if not resume_after:
+        import_job.started_at = datetime.utcnow()
+        import_job.processed_rows = import_job.created_count = import_job.error_count = 0
+    import_job.status = 'running'
+    import_job.error_message = None
+    import_job.error_report_path = os.path.join(_storage_dir(), f'import-{import_job.id}-errors.csv')
+    db.session.commit()
+
+    if not resume_after and os.path.exists(import_job.error_report_path):
+        os.remove(import_job.error_report_path)  # rows of an attempt that committed nothing
+    report = _ErrorReport(import_job.error_report_path)
+    started = time.monotonic()
+    processed_before = import_job.processed_rows
+    try:
+        if import_job.total_rows is None:
+            import_job.total_rows = count_rows(import_job.storage_path, import_job.file_format)
+            db.session.commit()
+        platforms_by_name = {platform.name.strip().lower(): platform.id for platform in platform_cache.all()}
+
+        chunk = []
+        rows = iter_rows(import_job.storage_path, import_job.file_format)
+        while True:
+            entry = next(rows, None)
+            if entry is not None and entry[0] <= resume_after:
+                continue  # committed by an earlier attempt
+            if entry is not None:
+                row_number, row = entry
+                chunk.append((row_number, row, *row_to_item(row, platforms_by_name)))
+            if len(chunk) >= IMPORT_CHUNK_SIZE or (entry is None and chunk):
+                _import_chunk(import_job, user, chunk, report)
+                chunk = []
+            if entry is None:
+                break
+
+        import_job.status = 'finished'
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception(f'[imports] import {import_job_id} failed')
+        import_job.status = 'failed'
+        import_job.error_message = str(e)
+    finally:
+        report.close()
+
+    import_job.finished_at = datetime.utcnow()
+    db.session.commit()
+    if import_job.status == 'finished':
+        _remove_upload(import_job.storage_path)  # failed imports keep it for the retry
+
+    elapsed = time.monotonic() - started
+    rate = (import_job.processed_rows - processed_before) / elapsed if elapsed > 0 else 0.0
+    resumed = f' (resumed after row {resume_after})' if resume_after else ''
+    current_app.logger.info(
+        f'[imports] import {import_job.id} {import_job.status}{resumed}: {import_job.processed_rows} rows '
+        f'({import_job.created_count} created, {import_job.error_count} rejected) in {elapsed:.2f}s = {rate:.0f} rows/sec'
+    )
+    return {'ok': import_job.status == 'finished', 'import_job_id': import_job.id,
+            'rows': import_job.processed_rows, 'rows_per_second': round(rate, 1)}
@@ -0,0 +1,193 @@
+# app/services/media_order.py
+"""
+Ordering engine for post_media.
+
+post_media.sort_order holds gapped sort keys (multiples of SORT_KEY_STEP) and the API
+speaks in positions (0-based index in the carousel): sort_order in requests and
+responses is always the position, the stored key is only exposed as sort_key. A change is planned in Python:
+  1. build the final order of media ids
+  2. keep the longest run of rows whose keys are already increasing in that order
+     (longest increasing subsequence), so a single move touches one row
+  3. give every other row a key inside the gap between its kept neighbours
+     (the whole post is renumbered only when a gap is exhausted)
+and applied with at most one UPDATE ... CASE plus one multi-row INSERT.
+Rows with a NULL sort_order (legacy) sort last and get a key on the next change.
+"""
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case
+
+from app.models import db, Post, PostMedia
+from app.models.sync_change import record_sync_changes
+
+SORT_KEY_STEP = 1024
+
+
+#! ordering helpers ///////////////////////////////////////////////////////////////////////////
+def order_key(post_media: PostMedia):
+    """Python-side ORDER BY sort_order NULLS LAST, added_at."""
+    return (post_media.sort_order is None, post_media.sort_order or 0, post_media.added_at or datetime.min)
+
+
+def in_display_order(rows: Iterable[PostMedia]) -> List[Tuple[int, PostMedia]]:
+    """
+    (position, row) pairs per post in display order: the position is what responses
+    call sort_order, the stored key goes out as sort_key.
+    """
+    positions: Dict[int, int] = {}
+    ordered = []
+    for row in sorted(rows, key=lambda pm: (pm.post_id,) + order_key(pm)):
+        position = positions.get(row.post_id, 0)
+        positions[row.post_id] = position + 1
+        ordered.append((position, row))
+    return ordered
+
+
+def load_ordered(post_id: int, *, for_update: bool = False) -> List[PostMedia]:
+    """All post_media rows of a post in display order (row-locked when for_update, PostgreSQL)."""
+    query = PostMedia.query.filter(PostMedia.post_id == post_id)
+    if for_update:
+        query = query.with_for_update()
+    return sorted(query.all(), key=order_key)
+
+
+def initial_keys(count: int) -> List[int]:
+    """Keys for a freshly built carousel of `count` items."""
+    return [index * SORT_KEY_STEP for index in range(count)]
+
+
+def _clamp(position: Optional[int], length: int) -> int:
+    if position is None or position > length:
+        return length
+    return max(position, 0)
+
+
+def _kept_indexes(keys: Sequence[Optional[int]]) -> set:
+    """Indexes of the longest strictly increasing subsequence of the non-NULL keys."""
+    tails: List[int] = []      # smallest tail key of an increasing run of each length
+    tail_index: List[int] = []
+    parent: Dict[int, Optional[int]] = {}
+    for index, key in enumerate(keys):
+        if key is None:
+            continue
+        length = bisect_left(tails, key)
+        parent[index] = tail_index[length - 1] if length else None
+        if length == len(tails):
+            tails.append(key)
+            tail_index.append(index)
+        else:
+            tails[length] = key
+            tail_index[length] = index
+    kept, index = set(), tail_index[-1] if tail_index else None
+    while index is not None:
+        kept.add(index)
+        index = parent[index]
+    return kept
+
+
+def plan_keys(keys: Sequence[Optional[int]]) -> List[int]:
+    """
+    New keys for a list already in its final order, where keys[i] is the current
+    key of item i (None for new or NULL rows). Keeps as many keys as possible.
+    """
+    kept = _kept_indexes(keys)
+    planned: List[Optional[int]] = [keys[i] if i in kept else None for i in range(len(keys))]
+
+    index = 0
+    while index < len(planned):
+        if planned[index] is not None:
+            index += 1
+            continue
+        run_end = index
+        while run_end < len(planned) and planned[run_end] is None:
+            run_end += 1
+        run = run_end - index
+        low = planned[index - 1] if index > 0 else None
+        high = planned[run_end] if run_end < len(planned) else None
+        if low is None and high is None:
+            low, high = -SORT_KEY_STEP, run * SORT_KEY_STEP
+        elif low is None:
+            low = high - (run + 1) * SORT_KEY_STEP
+        elif high is None:
+            high = low + (run + 1) * SORT_KEY_STEP
+        gap = (high - low) // (run + 1)
+        if gap < 1:
+            return initial_keys(len(keys))  # gap exhausted: renumber the post
+        for offset in range(run):
+            planned[index + offset] = low + gap * (offset + 1)
+        index = run_end
+    return planned
+
+
+#! apply ///////////////////////////////////////////////////////////////////////////
+def _apply(post_id: int, user_id: int, final_ids: List[int], previous_ids: List[int],
+           current: Dict[int, Optional[int]], new_ids: Sequence[int] = ()) -> Dict[str, object]:
+    """
+    Write the keys for final_ids: one UPDATE ... CASE for changed existing rows, one
+    INSERT for new_ids. Bumps the post version and logs sync changes (Core statements
+    bypass the ORM listeners).
+    Returns {"order": final media ids, "previous": media ids before, "keys": {media_id: key},
+    "written": rows updated or inserted}.
+    """
+    planned = plan_keys([current.get(media_id) for media_id in final_ids])
+    keys = dict(zip(final_ids, planned))
+    new_ids = set(new_ids)
+    changed = {media_id: key for media_id, key in keys.items()
+               if media_id not in new_ids and current.get(media_id) != key}
+
+    table = PostMedia.__table__
+    if changed:
+        db.session.execute(
+            table.update()
+            .where(table.c.post_id == post_id, table.c.media_id.in_(list(changed)))
+            .values(sort_order=case(changed, value=table.c.media_id))
+        )
+    if new_ids:
+        now = datetime.utcnow()
+        db.session.execute(table.insert().values([
+            {'post_id': post_id, 'media_id': media_id, 'sort_order': keys[media_id], 'added_at': now}
+            for media_id in final_ids if media_id in new_ids
+        ]))
+
+    touched = list(changed) + [media_id for media_id in final_ids if media_id in new_ids]
+    if touched:
+        posts = Post.__table__
+        db.session.execute(posts.update().where(posts.c.id == post_id).values(version=posts.c.version + 1))
+        record_sync_changes(db.session.connection(),
+                            [(user_id, 'post_media', f'{post_id}:{media_id}', 'upsert') for media_id in touched])
+    db.session.expire_all()  # ORM copies of these rows are stale now
+    return {'order': final_ids, 'previous': previous_ids, 'keys': keys, 'written': len(touched)}
+
+
+#! attach ///////////////////////////////////////////////////////////////////////////
+def attach_media(post_id: int, user_id: int, attachments: Sequence[Tuple[int, Optional[int]]]) -> Dict[str, object]:
+    """
+    Insert (media_id, position) pairs in request order; position None appends.
+    Caller has checked ownership and that none of the media is attached yet.
+    """
+    rows = load_ordered(post_id, for_update=True)
+    previous_ids = [row.media_id for row in rows]
+    current = {row.media_id: row.sort_order for row in rows}
+    final_ids = list(previous_ids)
+    for media_id, position in attachments:
+        final_ids.insert(_clamp(position, len(final_ids)), media_id)
+    return _apply(post_id, user_id, final_ids, previous_ids, current, [media_id for media_id, _ in attachments])
+
+
+#! move ///////////////////////////////////////////////////////////////////////////
+def reorder_media(post_id: int, user_id: int, moves: Sequence[Tuple[int, Optional[int]]]) -> Dict[str, object]:
+    """
+    Move attached media to new positions: (media_id, position) pairs, position None
+    moves to the end. Unlisted media keep their relative order around them.
+    """
+    rows = load_ordered(post_id, for_update=True)
+    previous_ids = [row.media_id for row in rows]
+    current = {row.media_id: row.sort_order for row in rows}
+    moved = {media_id for media_id, _ in moves}
+    final_ids = [media_id for media_id in previous_ids if media_id not in moved]
+    # ascending target position so every insert lands exactly on its index
+    for media_id, position in sorted(moves, key=lambda move: (move[1] is None, move[1] or 0)):
+        final_ids.insert(_clamp(position, len(final_ids)), media_id)
+    return _apply(post_id, user_id, final_ids, previous_ids, current)
@@ -0,0 +1,120 @@
+# app/services/platform_attach.py
+"""
+Set-based attach of social platforms to one or many posts.
+
+Whatever the number of posts and platforms, attach_platforms issues:
+  - one query for post ownership (+ captions used as the default platform_caption)
+  - no query for the platform ids (app.services.platform_cache)
+  - one query for existing (post_id, platform_id) pairs (served by idx_post_platform_unique)
+  - one INSERT for the new rows (psycopg2 batches the flush into INSERT ... VALUES ... RETURNING)
+Nothing is added to the session when validation fails; the caller commits.
+"""
+from typing import Any, Dict, Iterable, List
+
+from app.models import db, Post, PostPlatform
+from app.services.platform_cache import platform_cache
+
+MAX_ATTACH_ROWS = 10000
+
+
+class AttachError(Exception):
+    """Invalid attach request; `details` holds one message per problem."""
+
+    def __init__(self, details: List[str], status_code: int = 400):
+        super().__init__('; '.join(details))
+        self.details = details
+        self.status_code = status_code
+
+
+#! _normalize_platforms ///////////////////////////////////////////////////////////////////////////
+def _normalize_platforms(platforms_data) -> List[Dict[str, Any]]:
+    if not isinstance(platforms_data, list):
+        raise AttachError(['Platforms must be an array'])
+
+    errors, platforms, seen = [], [], set()
+    for platform_data in platforms_data:
+        platform_data = platform_data if isinstance(platform_data, dict) else {'platform_id': platform_data}
+        platform_id = platform_data.get('platform_id')
+        if not platform_id:
+            errors.append('platform_id is required for each platform')
+            continue
+        try:
+            platform_id = int(platform_id)
+        except (TypeError, ValueError):
+            errors.append('platform_id must be a valid integer')
+            continue
+        if platform_id in seen:
+            errors.append(f'Platform {platform_id} listed more than once')
+            continue
+        seen.add(platform_id)
+        platforms.append({**platform_data, 'platform_id': platform_id})
+    if errors:
+        raise AttachError(errors)
+    return platforms
+
+
+#! attach_platforms ///////////////////////////////////////////////////////////////////////////
+def attach_platforms(user_id: int, post_ids: Iterable[int], platforms_data, *, skip_existing: bool) -> Dict[str, Any]:
+    """
+    Attach the same platform set to every post in post_ids.
+
+    platforms_data: [{"platform_id": 1, "platform_caption": "...", "media_urls": [...]}, 2, ...]
+    (platform_caption defaults to each post's caption).
+
+    Returns {"created": [PostPlatform, ...], "skipped": [{"post_id", "platform_id"}, ...]}.
+    Raises AttachError when a post is not found / not owned, a platform does not
+    exist, or (unless skip_existing) a post is already connected to a platform.
+    skip_existing has no default: each route states its own API default.
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    platforms = _normalize_platforms(platforms_data)
+    if not post_ids or not platforms:
+        return {'created': [], 'skipped': []}
+    if len(post_ids) * len(platforms) > MAX_ATTACH_ROWS:
+        raise AttachError([f'At most {MAX_ATTACH_ROWS} post/platform pairs per request'])
+
+    # Ownership: one query
+    captions = dict(
+        db.session.query(Post.id, Post.caption).filter(Post.id.in_(post_ids), Post.user_id == user_id)
+    )
+    missing_posts = [post_id for post_id in post_ids if post_id not in captions]
+    if missing_posts:
+        raise AttachError([f'Post {post_id} not found' for post_id in missing_posts], status_code=404)
+
+    # Platform ids: resolved from the in-process platform cache
+    platform_ids = [p['platform_id'] for p in platforms]
+    names = {platform_id: platform.name for platform_id, platform in platform_cache.get_many(platform_ids).items()}
+    unknown = [f'Platform with id {platform_id} not found' for platform_id in platform_ids if platform_id not in names]
+    if unknown:
+        raise AttachError(unknown)
+
+    # Existing pairs: one query on the unique (post_id, platform_id) index
+    existing = set(
+        db.session.query(PostPlatform.post_id, PostPlatform.platform_id)
+        .filter(PostPlatform.post_id.in_(post_ids), PostPlatform.platform_id.in_(platform_ids))
+    )
+    if existing and not skip_existing:
+        raise AttachError([
+            f'Post {post_id} already connected to platform {names[platform_id]}' if len(post_ids) > 1
+            else f'Post already connected to platform {names[platform_id]}'
+            for post_id, platform_id in sorted(existing)
+        ])
+
+    created, skipped = [], []
+    for post_id in post_ids:
+        for platform in platforms:
+            if (post_id, platform['platform_id']) in existing:
+                skipped.append({'post_id': post_id, 'platform_id': platform['platform_id']})
+                continue
+            created.append(PostPlatform(
+                post_id=post_id,
+                platform_id=platform['platform_id'],
+                platform_caption=platform.get('platform_caption', captions[post_id]),
+                media_urls=platform.get('media_urls'),
+                status='pending'
+            ))
+
+    # One flush for all rows; the version / sync-log listeners see them like any ORM insert
+    db.session.add_all(created)
+    db.session.flush()
+    return {'created': created, 'skipped': skipped}
@@ -0,0 +1,183 @@
+# app/services/platform_cache.py
+"""
+In-process cache of the social_platforms reference table.
+
+Every process keeps an immutable snapshot of all platform rows and swaps it
+wholesale on reload, so readers never lock. The snapshot is dropped when:
+  - a commit touched a SocialPlatform row: the writer INCRs
+    poststride:platforms:version and PUBLISHes it; every process listening through
+    app.extensions.pubsub.broker marks its snapshot stale
+  - it is older than PLATFORM_CACHE_TTL seconds (fallback if a message was lost)
+  - a lookup misses (a platform created elsewhere a moment ago), at most once per
+    MISS_RELOAD_SECONDS
+There is deliberately no lock: RQ forks a work-horse per job, and a lock held by
+the listener thread at fork time would deadlock the child.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import queue as queue_ext
+from app.extensions.pubsub import broker, publish
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "poststride:platforms:version"
+CHANNEL = "poststride:platforms:invalidate"
+PLATFORM_CACHE_TTL = 300
+MISS_RELOAD_SECONDS = 1.0
+
+_DIRTY_KEY = "platforms_dirty"
+
+
+class CachedPlatform(NamedTuple):
+    id: int
+    name: str
+    api_base_url: Optional[str]
+    created_at: Optional[datetime]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'api_base_url': self.api_base_url,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class _Snapshot(NamedTuple):
+    version: Optional[int]
+    loaded_at: float
+    by_id: Dict[int, CachedPlatform]
+    by_name: Dict[str, CachedPlatform]  # lower-cased name
+
+
+#! PlatformCache ///////////////////////////////////////////////////////////////////////////
+class PlatformCache:
+
+    def __init__(self, ttl: float = PLATFORM_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshot: Optional[_Snapshot] = None
+        self._last_miss_reload = 0.0
+        self._subscribed = False
+
+    # ---- reads -------------------------------------------------------------
+    def _current(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > self.ttl:
+            snapshot = self.reload()
+        return snapshot
+
+    def all(self) -> List[CachedPlatform]:
+        return list(self._current().by_id.values())
+
+    def get(self, platform_id: int) -> Optional[CachedPlatform]:
+        platform = self._current().by_id.get(platform_id)
+        if platform is None and self._may_reload_on_miss():
+            platform = self.reload().by_id.get(platform_id)
+        return platform
+
+    def get_many(self, platform_ids: Iterable[int]) -> Dict[int, CachedPlatform]:
+        """{id: platform} for the ids that exist."""
+        platform_ids = set(platform_ids)
+        by_id = self._current().by_id
+        if not platform_ids <= by_id.keys() and self._may_reload_on_miss():
+            by_id = self.reload().by_id
+        return {platform_id: by_id[platform_id] for platform_id in platform_ids if platform_id in by_id}
+
+    def by_name(self, name: str) -> Optional[CachedPlatform]:
+        key = (name or '').strip().lower()
+        platform = self._current().by_name.get(key)
+        if platform is None and self._may_reload_on_miss():
+            platform = self.reload().by_name.get(key)
+        return platform
+
+    def name(self, platform_id: int) -> Optional[str]:
+        platform = self.get(platform_id)
+        return platform.name if platform else None
+
+    # ---- loading / invalidation -------------------------------------------
+    def _may_reload_on_miss(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_miss_reload < MISS_RELOAD_SECONDS:
+            return False
+        self._last_miss_reload = now
+        return True
+
+    def reload(self) -> _Snapshot:
+        """Read the whole table (one query) and swap the snapshot in."""
+        from app.models import db, SocialPlatform
+
+        self._ensure_subscribed()
+        version = self._remote_version()  # read before the rows: a bump in between just reloads again
+        rows = [CachedPlatform(row.id, row.name, row.api_base_url, row.created_at) for row in
+                db.session.query(SocialPlatform.id, SocialPlatform.name,
+                                 SocialPlatform.api_base_url, SocialPlatform.created_at)]
+        snapshot = _Snapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            by_id={row.id: row for row in rows},
+            by_name={row.name.strip().lower(): row for row in rows},
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    def invalidate_local(self) -> None:
+        self._snapshot = None
+
+    def invalidate(self) -> None:
+        """Drop this process's snapshot and tell every other process to drop theirs."""
+        self.invalidate_local()
+        try:
+            version = queue_ext.get_redis().incr(VERSION_KEY)
+        except Exception:
+            logger.warning("[platform_cache] version bump failed; other processes refresh within %ss", self.ttl)
+            return
+        publish(CHANNEL, {"version": version})
+
+    def _remote_version(self) -> Optional[int]:
+        try:
+            value = queue_ext.get_redis().get(VERSION_KEY)
+            return int(value) if value is not None else 0
+        except Exception:
+            return None
+
+    def _on_message(self, channel: str, payload: dict) -> None:
+        snapshot = self._snapshot
+        if snapshot is not None and payload.get("version") != snapshot.version:
+            self._snapshot = None
+
+    def _ensure_subscribed(self) -> None:
+        if not self._subscribed:
+            self._subscribed = True
+            broker.subscribe(CHANNEL, self._on_message)
+
+
+platform_cache = PlatformCache()
+
+
+#! Invalidate on commit ///////////////////////////////////////////////////////////////////////////
+@event.listens_for(Session, "after_flush")
+def _note_platform_writes(session, flush_context):
+    from app.models import SocialPlatform
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, SocialPlatform):
+            session.info[_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        platform_cache.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_platform_writes(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_DIRTY_KEY, None)
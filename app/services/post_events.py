@@ -0,0 +1,132 @@
+# app/services/post_events.py
+"""
+Live publish-status events for the SSE stream (GET /api/posts/stream).
+
+Writers call queue_post_event / queue_post_platform_event while they change rows.
+Events ride on the SQLAlchemy session and are only PUBLISHed to Redis after the
+commit succeeds (dropped on rollback), on channel poststride:post-events:<user_id>.
+Each web process keeps one subscriber (app.extensions.pubsub.broker) and fans the
+messages out to the open streams of that user.
+"""
+import json
+import queue
+import threading
+from typing import Dict, Iterator, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions.pubsub import broker, publish
+from app.utils.timezone_helpers import format_utc_with_z
+
+CHANNEL_PREFIX = "poststride:post-events:"
+HEARTBEAT_SECONDS = 15
+LISTENER_QUEUE_SIZE = 100  # per open stream; a client this far behind starts losing events
+
+_PENDING_KEY = "pending_post_events"
+
+
+# =============================================================================
+# Publishing side
+# =============================================================================
+
+def _queue(session, user_id: int, payload: dict) -> None:
+    session.info.setdefault(_PENDING_KEY, []).append((user_id, payload))
+
+
+def queue_post_event(session, post) -> None:
+    """Announce the aggregate status of a post once the current transaction commits."""
+    _queue(session, post.user_id, {
+        "type": "post",
+        "post_id": post.id,
+        "status": post.status,
+    })
+
+
+def queue_post_platform_event(session, post_platform, user_id: int) -> None:
+    """Announce a per-platform status change once the current transaction commits."""
+    _queue(session, user_id, {
+        "type": "post_platform",
+        "post_id": post_platform.post_id,
+        "platform_id": post_platform.platform_id,
+        "post_platform_id": post_platform.id,
+        "status": post_platform.status,
+        "platform_post_id": post_platform.platform_post_id,
+        "published_at": format_utc_with_z(post_platform.published_at),
+    })
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session):
+    for user_id, payload in session.info.pop(_PENDING_KEY, []):
+        publish(f"{CHANNEL_PREFIX}{user_id}", payload)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_events(session, previous_transaction):
+    if previous_transaction.parent is None:  # outermost rollback only, not a savepoint
+        session.info.pop(_PENDING_KEY, None)
+
+
+# =============================================================================
+# Subscribing side
+# =============================================================================
+
+_listeners: Dict[int, Set[queue.Queue]] = {}
+_listeners_lock = threading.Lock()
+_subscribed = False
+
+
+def _fan_out(channel: str, payload: dict) -> None:
+    try:
+        user_id = int(channel[len(CHANNEL_PREFIX):])
+    except ValueError:
+        return
+    with _listeners_lock:
+        targets = list(_listeners.get(user_id, ()))
+    for q in targets:
+        try:
+            q.put_nowait(payload)
+        except queue.Full:
+            pass  # slow client; it resyncs with a normal GET on reconnect
+
+
+def _register(user_id: int) -> queue.Queue:
+    global _subscribed
+    q = queue.Queue(maxsize=LISTENER_QUEUE_SIZE)
+    with _listeners_lock:
+        _listeners.setdefault(user_id, set()).add(q)
+        subscribe = not _subscribed
+        _subscribed = True
+    if subscribe:
+        broker.subscribe(f"{CHANNEL_PREFIX}*", _fan_out)
+    return q
+
+
+def _unregister(user_id: int, q: queue.Queue) -> None:
+    with _listeners_lock:
+        user_queues = _listeners.get(user_id)
+        if user_queues is not None:
+            user_queues.discard(q)
+            if not user_queues:
+                del _listeners[user_id]
+
+
+def stream_post_events(user_id: int, heartbeat: int = HEARTBEAT_SECONDS) -> Iterator[str]:
+    """
+    SSE frames for one user's post / post_platform status changes.
+    Sends a comment line every `heartbeat` seconds so proxies keep the connection open
+    and dead clients are noticed on the next write.
+    """
+    q = _register(user_id)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                payload = q.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {payload.get('type', 'message')}\ndata: {json.dumps(payload)}\n\n"
+    finally:
+        _unregister(user_id, q)
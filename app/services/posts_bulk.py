@@ -0,0 +1,217 @@
+# app/services/posts_bulk.py
+"""
+Bulk post creation (POST /api/posts/bulk).
+
+Validation is set-based: every item is checked in Python first, then all referenced
+platform ids are resolved from app.services.platform_cache and all media ids (with
+ownership) in one IN query. Valid items are written in one transaction:
+  - posts via one ORM flush (batched INSERT ... RETURNING id on PostgreSQL)
+  - post_platforms and post_media via Core executemany
+  - scheduled posts handed to app.scheduler.schedule_posts_at_batch
+    (one scheduled_jobs INSERT + one Redis pipeline)
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.models import db, Post, PostPlatform, PostMedia, Media
+from app.models.sync_change import record_sync_changes
+from app.services.media_order import initial_keys
+from app.services.platform_cache import platform_cache
+from app.utils.timezone_helpers import parse_iso_to_utc
+
+MAX_BULK_POSTS = 5000
+VALID_STATUSES = ('draft', 'scheduled', 'publishing', 'published', 'partially_published', 'failed', 'canceled')
+
+
+class BulkSchedulingError(Exception):
+    """The scheduler backend (Redis) rejected the batch; nothing was committed."""
+
+
+#! _as_int ///////////////////////////////////////////////////////////////////////////
+def _as_int(value) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+#! _normalize_item ///////////////////////////////////////////////////////////////////////////
+def _normalize_item(item, user_tz: str, now: datetime) -> Tuple[Optional[dict], List[str]]:
+    """Shape checks that need no database access. Returns (normalized item, errors)."""
+    if not isinstance(item, dict):
+        return None, ['Each post must be an object']
+
+    errors = []
+    caption = item.get('caption')
+    if not caption:
+        errors.append('Caption is required')
+
+    scheduled_time = item.get('scheduled_time')
+    if scheduled_time:
+        try:
+            scheduled_time = parse_iso_to_utc(scheduled_time, user_tz)
+        except (ValueError, TypeError):
+            errors.append('Invalid scheduled_time format. Use ISO format.')
+            scheduled_time = None
+
+    status = item.get('status') or ('scheduled' if scheduled_time else 'draft')
+    if status not in VALID_STATUSES:
+        errors.append(f'Invalid status. Must be one of: {", ".join(VALID_STATUSES)}')
+    if status == 'scheduled':
+        if not item.get('scheduled_time'):
+            errors.append('scheduled_time is required for scheduled posts')
+        elif scheduled_time and scheduled_time <= now:
+            errors.append('Scheduled time must be in the future')
+
+    platforms = []
+    for entry in item.get('platforms') or []:
+        entry = entry if isinstance(entry, dict) else {'platform_id': entry}
+        platform_id = _as_int(entry.get('platform_id'))
+        if platform_id is None:
+            errors.append('platform_id must be a valid integer')
+            continue
+        if any(p['platform_id'] == platform_id for p in platforms):
+            errors.append(f'Platform {platform_id} listed more than once')
+            continue
+        platforms.append({
+            'platform_id': platform_id,
+            'platform_caption': entry.get('platform_caption', caption),
+            'media_urls': entry.get('media_urls'),
+        })
+    if status == 'scheduled' and not platforms:
+        errors.append('No platforms attached to this post')
+
+    media = []
+    for position, entry in enumerate(item.get('media') or []):
+        entry = entry if isinstance(entry, dict) else {'media_id': entry}
+        media_id = _as_int(entry.get('media_id'))
+        sort_order = entry.get('sort_order', position)
+        if media_id is None or (sort_order is not None and _as_int(sort_order) is None):
+            errors.append('media_id and sort_order must be valid integers')
+            continue
+        if any(m['media_id'] == media_id for m in media):
+            errors.append(f'Media {media_id} listed more than once')
+            continue
+        media.append({'media_id': media_id, 'sort_order': _as_int(sort_order)})
+    # sort_order is a position; store gapped keys like the media ordering engine
+    media.sort(key=lambda m: (m['sort_order'] is None, m['sort_order'] or 0))
+    for entry, key in zip(media, initial_keys(len(media))):
+        entry['sort_order'] = key
+
+    return {
+        'caption': caption,
+        'scheduled_time': scheduled_time,
+        'status': status,
+        'platforms': platforms,
+        'media': media,
+    }, errors
+
+
+#! bulk_create_posts ///////////////////////////////////////////////////////////////////////////
+def bulk_create_posts(user, items: List[Any], *, all_or_nothing: bool = False,
+                      before_commit: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Create many posts with their platforms and media in one transaction.
+
+    Returns {"created": n, "failed": m, "results": [...]} where results[i] is
+    {"index": i, "ok": True, "post_id": ..., "scheduled_jobs": k} or
+    {"index": i, "ok": False, "errors": [...]}. With all_or_nothing=True any
+    invalid item means nothing is written.
+    Raises BulkSchedulingError (after rolling back) if Redis rejects the schedule batch.
+    If the commit itself fails, the jobs already written to Redis are discarded.
+    before_commit(created, failed) runs inside the transaction right before the
+    commit, so callers can stage their own bookkeeping atomically with the posts.
+    """
+    from app.scheduler import schedule_posts_at_batch, discard_batch_jobs
+
+    now = datetime.utcnow()
+    normalized = [_normalize_item(item, user.timezone, now) for item in items]
+
+    # Set-based existence / ownership checks: one query each
+    platform_ids = {p['platform_id'] for item, _ in normalized if item for p in item['platforms']}
+    media_ids = {m['media_id'] for item, _ in normalized if item for m in item['media']}
+    known_platforms = set(platform_cache.get_many(platform_ids)) if platform_ids else set()
+    owned_media = set()
+    if media_ids:
+        owned_media = {row.id for row in db.session.query(Media.id).filter(Media.id.in_(media_ids), Media.user_id == user.id)}
+
+    results: List[Dict[str, Any]] = []
+    valid: List[Tuple[int, dict]] = []
+    for index, (item, errors) in enumerate(normalized):
+        if item:
+            errors += [f'Platform with id {p["platform_id"]} not found'
+                       for p in item['platforms'] if p['platform_id'] not in known_platforms]
+            errors += [f'Media {m["media_id"]} not found or not owned by user'
+                       for m in item['media'] if m['media_id'] not in owned_media]
+        if errors:
+            results.append({'index': index, 'ok': False, 'errors': errors})
+        else:
+            results.append(None)
+            valid.append((index, item))
+
+    failed = len(items) - len(valid)
+    if not valid or (all_or_nothing and failed):
+        for index, _ in valid:
+            results[index] = {'index': index, 'ok': False, 'errors': ['Not created: batch has invalid items']}
+        return {'created': 0, 'failed': len(items), 'results': results}
+
+    job_ids: List[str] = []
+    try:
+        # Posts: one flush (psycopg2 batches the INSERT ... RETURNING id)
+        posts = [Post(user_id=user.id, caption=item['caption'], scheduled_time=item['scheduled_time'],
+                      status=item['status'], created_at=now, updated_at=now)
+                 for _, item in valid]
+        db.session.add_all(posts)
+        db.session.flush()
+
+        # Children: Core executemany, no ORM object per row
+        platform_rows, media_rows = [], []
+        for post, (_, item) in zip(posts, valid):
+            platform_rows += [{**p, 'post_id': post.id, 'status': 'pending'} for p in item['platforms']]
+            media_rows += [{**m, 'post_id': post.id, 'added_at': now} for m in item['media']]
+        connection = db.session.connection()
+        if platform_rows:
+            connection.execute(PostPlatform.__table__.insert(), platform_rows)
+        if media_rows:
+            connection.execute(PostMedia.__table__.insert(), media_rows)
+
+        # Core inserts bypass the sync-log flush listener
+        post_ids = [post.id for post in posts]
+        pp_table = PostPlatform.__table__
+        new_pp_ids = connection.execute(select(pp_table.c.id).where(pp_table.c.post_id.in_(post_ids))).scalars().all() if platform_rows else []
+        record_sync_changes(connection, (
+            [(user.id, 'post_platform', str(pp_id), 'upsert') for pp_id in new_pp_ids] +
+            [(user.id, 'post_media', f'{row["post_id"]}:{row["media_id"]}', 'upsert') for row in media_rows]
+        ))
+
+        # Scheduling: one scheduled_jobs INSERT + one Redis pipeline for the whole batch
+        entries = [{'post_id': post.id, 'platform_id': p['platform_id'], 'when': item['scheduled_time']}
+                   for post, (_, item) in zip(posts, valid) if item['status'] == 'scheduled'
+                   for p in item['platforms']]
+        if entries:
+            try:
+                job_ids = [sj.rq_job_id for sj in schedule_posts_at_batch(entries, created_by_user_id=user.id)]
+            except Exception as e:
+                raise BulkSchedulingError(str(e)) from e
+
+        if before_commit is not None:
+            before_commit(len(posts), failed)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        if job_ids:
+            discard_batch_jobs(job_ids)  # Redis accepted the batch but the rows were rolled back
+        raise
+
+    jobs_per_post: Dict[int, int] = {}
+    for entry in entries:
+        jobs_per_post[entry['post_id']] = jobs_per_post.get(entry['post_id'], 0) + 1
+    for post_id, (index, _) in zip(post_ids, valid):  # post_ids: commit expired the ORM objects
+        results[index] = {'index': index, 'ok': True, 'post_id': post_id,
+                          'scheduled_jobs': jobs_per_post.get(post_id, 0)}
+
+    return {'created': len(posts), 'failed': failed, 'results': results}
@@ -7,6 +7,7 @@ from app.models.post_platform import PostPlatform
 from app.models.scheduled_job import ScheduledJob
 from app.scheduler import mark_scheduled_job_status  # if you already have it  # your function from the prompt
 from app.scheduler import cancel_scheduled
+from app.services.post_events import queue_post_event, queue_post_platform_event
 
 CANCEL_TARGET_STATES = {"pending", "queued", "scheduled"}  # safe to flip to canceled/skipped
 
@@ -22,9 +23,12 @@ def _mark_platforms_canceled(post_id: int, platform_ids: Optional[Iterable[int]]
     )
     if platform_ids:
         q = q.filter(PostPlatform.platform_id.in_(platform_ids))
+    post = Post.query.get(post_id)
     updated = 0
     for pp in q.all():
         pp.status = as_status
+        if post:
+            queue_post_platform_event(db.session, pp, post.user_id)
         updated += 1
     return updated
 
@@ -87,6 +91,7 @@ def _recompute_post_status(post_id: int) -> str:
             if all(s == "failed" for s in states):
                 post.status = "failed"
             # else keep existing
+    queue_post_event(db.session, post)
     return post.status
 
 # this function is used to cancel the entire post future
@@ -0,0 +1,161 @@
+# app/services/posts_duplicate.py
+"""
+Bulk clone of posts (POST /api/posts/bulk-duplicate), e.g. "clone these 200 posts
+to next month".
+
+  - one query loads the originals (ownership checked)
+  - new posts are inserted in one ORM flush (batched INSERT ... RETURNING on PostgreSQL)
+  - post_platforms and post_media are copied server-side with one INSERT ... SELECT
+    each, remapping post_id with CASE old_id WHEN ... THEN new_id
+  - clones that land in the future can be scheduled through
+    app.scheduler.schedule_posts_at_batch (one INSERT + one Redis pipeline)
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, literal, select
+
+from app.models import db, Post, PostPlatform, PostMedia
+from app.models.sync_change import record_sync_changes
+from app.services.posts_bulk import BulkSchedulingError
+from app.utils.timezone_helpers import format_utc_with_z
+
+MAX_DUPLICATE_POSTS = 500
+OFFSET_UNITS = ('weeks', 'days', 'hours', 'minutes')
+
+
+#! parse_offset ///////////////////////////////////////////////////////////////////////////
+def parse_offset(raw) -> Optional[timedelta]:
+    """{"days": 30, "hours": 2} -> timedelta. Raises ValueError on unknown units / non-numbers."""
+    if raw is None:
+        return None
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError(f'offset must be an object with any of: {", ".join(OFFSET_UNITS)}')
+    unknown = set(raw) - set(OFFSET_UNITS)
+    if unknown:
+        raise ValueError(f'Unknown offset unit(s): {", ".join(sorted(unknown))}')
+    try:
+        return timedelta(**{unit: float(value) for unit, value in raw.items()})
+    except (TypeError, ValueError):
+        raise ValueError('offset values must be numbers')
+
+
+#! bulk_duplicate_posts ///////////////////////////////////////////////////////////////////////////
+def bulk_duplicate_posts(user, post_ids: List[int], *, offset: Optional[timedelta] = None,
+                         schedule: bool = False) -> Dict[str, Any]:
+    """
+    Clone posts with their platforms (status reset to pending, platform ids cleared)
+    and media links.
+
+    Clones keep the original scheduled_time shifted by `offset` (None when the
+    original had none). With schedule=True a clone whose time is in the future and
+    that has platforms is created as 'scheduled' and enqueued; everything else
+    is created as a draft.
+
+    Returns {"created": n, "results": [...]} in request order.
+    Raises BulkSchedulingError (after rolling back) if Redis rejects the schedule batch.
+    If the commit itself fails, the jobs already written to Redis are discarded.
+    """
+    from app.scheduler import schedule_posts_at_batch, discard_batch_jobs
+
+    post_ids = list(dict.fromkeys(post_ids))
+    now = datetime.utcnow()
+
+    originals = {
+        row.id: row for row in
+        db.session.query(Post.id, Post.caption, Post.scheduled_time)
+        .filter(Post.id.in_(post_ids), Post.user_id == user.id)
+    }
+    sources = [originals[post_id] for post_id in post_ids if post_id in originals]
+    results: Dict[int, Dict[str, Any]] = {
+        post_id: {'source_post_id': post_id, 'ok': False, 'error': 'Post not found'}
+        for post_id in post_ids if post_id not in originals
+    }
+    if not sources:
+        return {'created': 0, 'results': [results[post_id] for post_id in post_ids]}
+
+    pp_table, pm_table = PostPlatform.__table__, PostMedia.__table__
+
+    # Platforms of the originals, to decide scheduling before anything is written
+    source_platforms: Dict[int, List[int]] = {}
+    for row in db.session.execute(
+        select(pp_table.c.post_id, pp_table.c.platform_id).where(pp_table.c.post_id.in_([s.id for s in sources]))
+    ):
+        source_platforms.setdefault(row.post_id, []).append(row.platform_id)
+
+    job_ids: List[str] = []
+    try:
+        # Posts: one flush
+        clones, plans = [], []
+        for source in sources:
+            when = source.scheduled_time + offset if source.scheduled_time and offset else source.scheduled_time
+            warning = None
+            if schedule:
+                if not when or when <= now:
+                    warning = 'not scheduled: scheduled_time is missing or in the past'
+                elif not source_platforms.get(source.id):
+                    warning = 'not scheduled: no platforms attached'
+            status = 'scheduled' if schedule and not warning else 'draft'
+            clones.append(Post(user_id=user.id, caption=source.caption, scheduled_time=when, status=status,
+                               created_at=now, updated_at=now))
+            plans.append((source.id, status, when, warning))
+        db.session.add_all(clones)
+        db.session.flush()
+        new_id = {source.id: clone.id for source, clone in zip(sources, clones)}
+
+        # Children: INSERT ... SELECT, rows never leave the database
+        db.session.execute(pp_table.insert().from_select(
+            ['post_id', 'platform_id', 'platform_caption', 'media_urls', 'status'],
+            select(case(new_id, value=pp_table.c.post_id), pp_table.c.platform_id, pp_table.c.platform_caption, pp_table.c.media_urls,
+                   literal('pending')).where(pp_table.c.post_id.in_(list(new_id)))
+        ))
+        db.session.execute(pm_table.insert().from_select(
+            ['post_id', 'media_id', 'sort_order', 'added_at'],
+            select(case(new_id, value=pm_table.c.post_id), pm_table.c.media_id, pm_table.c.sort_order,
+                   literal(now)).where(pm_table.c.post_id.in_(list(new_id)))
+        ))
+
+        # Core inserts bypass the sync-log listener: read back the new keys once
+        clone_ids = list(new_id.values())
+        new_platforms = db.session.execute(
+            select(pp_table.c.id).where(pp_table.c.post_id.in_(clone_ids))
+        ).scalars().all()
+        new_media = db.session.execute(
+            select(pm_table.c.post_id, pm_table.c.media_id).where(pm_table.c.post_id.in_(clone_ids))
+        ).all()
+        record_sync_changes(db.session.connection(), (
+            [(user.id, 'post_platform', str(pp_id), 'upsert') for pp_id in new_platforms] +
+            [(user.id, 'post_media', f'{row.post_id}:{row.media_id}', 'upsert') for row in new_media]
+        ))
+
+        # Scheduling: one job per platform of every clone created as 'scheduled'
+        entries = [{'post_id': new_id[source_id], 'platform_id': platform_id, 'when': when}
+                   for source_id, status, when, _ in plans if status == 'scheduled'
+                   for platform_id in source_platforms[source_id]]
+        if entries:
+            try:
+                job_ids = [sj.rq_job_id for sj in schedule_posts_at_batch(entries, created_by_user_id=user.id)]
+            except Exception as e:
+                raise BulkSchedulingError(str(e)) from e
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        if job_ids:
+            discard_batch_jobs(job_ids)  # Redis accepted the batch but the rows were rolled back
+        raise
+
+    for source_id, status, when, warning in plans:
+        result = {
+            'source_post_id': source_id,
+            'ok': True,
+            'post_id': new_id[source_id],
+            'status': status,
+            'scheduled_time': format_utc_with_z(when),
+            'scheduled_jobs': len(source_platforms[source_id]) if status == 'scheduled' else 0,
+        }
+        if warning:
+            result['warning'] = warning
+        results[source_id] = result
+
+    return {'created': len(plans), 'results': [results[post_id] for post_id in post_ids]}
@@ -0,0 +1,298 @@
+# app/services/publish_forecast.py
+"""
+Forecast of upcoming publish volume, for sizing workers ahead of the
+:00 / :30 spikes.
+
+Counters: Redis keeps, per UTC day, a hash `poststride:forecast:<YYYYMMDD>`
+of "<minute of day>:<platform_id>" -> number of scheduled_jobs rows in
+status 'scheduled' due in that minute (platform 0 = whole-post jobs). A
+commit hook applies +1/-1 whenever a row enters or leaves that state or is
+moved, so forecast() reads at most 8 hashes and never scans scheduled_jobs.
+Day hashes expire a day after their date. `flask forecast rebuild` resets
+the future counters from the table (after a Redis flush, or periodically to
+absorb writes that bypassed the ORM).
+
+Latency: publish_post_platform records its run time per platform into
+daily hashes `poststride:publish_latency:<YYYYMMDD>` (sum / count, kept 8
+days). Whole-post jobs use the mean over all platforms.
+
+Workers needed for a minute = ceil(sum(fires x mean latency) / drain
+seconds): every job due in that minute finishes within the scheduler SLO
+(SCHEDULER_SLO_SECONDS) when it starts on time.
+"""
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE
+
+from app.extensions import queue as queue_ext
+from app.models.scheduled_job import ScheduledJob
+from app.services.platform_cache import platform_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTER_PREFIX = "poststride:forecast:"
+LATENCY_PREFIX = "poststride:publish_latency:"
+LATENCY_DAYS = 7
+DEFAULT_PUBLISH_SECONDS = 2.0  # until a platform has measurements
+DEFAULT_DRAIN_SECONDS = 60
+MAX_HORIZON = timedelta(days=7)
+_DELTAS_KEY = "forecast_deltas"
+_TRACKED = ("status", "scheduled_for", "platform_id")
+
+
+def _day_key(prefix: str, dt: datetime) -> str:
+    return prefix + dt.strftime("%Y%m%d")
+
+
+def _expire_at(dt: datetime, days: int = 1) -> int:
+    """Unix time one `days` after the end of dt's UTC day."""
+    end_of_day = datetime(dt.year, dt.month, dt.day) + timedelta(days=1 + days)
+    return int((end_of_day - datetime(1970, 1, 1)).total_seconds())
+
+
+def _field(dt: datetime, platform_id: Optional[int]) -> str:
+    return f"{dt.hour * 60 + dt.minute}:{platform_id or 0}"
+
+
+#! counter maintenance ///////////////////////////////////////////////////////////////////////////
+def _slot(status, scheduled_for, platform_id) -> Optional[Tuple[datetime, int]]:
+    if status != "scheduled" or scheduled_for is None:
+        return None
+    return scheduled_for.replace(second=0, microsecond=0), platform_id or 0
+
+
+def _committed_value(obj, key):
+    committed = inspect(obj).committed_state  # original values of the attributes changed since load
+    if key in committed:
+        value = committed[key]
+        return None if value is NO_VALUE else value
+    return getattr(obj, key)
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_forecast_deltas(session, flush_context, instances):
+    deltas = []
+    for obj in session.new:
+        if isinstance(obj, ScheduledJob):
+            deltas.append((None, _slot(obj.status, obj.scheduled_for, obj.platform_id)))
+    for obj in session.dirty:
+        if isinstance(obj, ScheduledJob):
+            state = inspect(obj)
+            if not any(state.attrs[key].history.has_changes() for key in _TRACKED):
+                continue
+            old = _slot(*(_committed_value(obj, key) for key in _TRACKED))
+            deltas.append((old, _slot(obj.status, obj.scheduled_for, obj.platform_id)))
+    for obj in session.deleted:
+        if isinstance(obj, ScheduledJob):
+            deltas.append((_slot(*(_committed_value(obj, key) for key in _TRACKED)), None))
+    deltas = [(old, new) for old, new in deltas if old != new]
+    if deltas:
+        session.info.setdefault(_DELTAS_KEY, []).extend(deltas)
+
+
+# Old values must be loaded when these change, or before_flush cannot tell what to decrement
+for _key in _TRACKED:
+    event.listen(getattr(ScheduledJob, _key), "set", lambda *args: None, active_history=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_forecast_deltas(session):
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    changes: Dict[Tuple[datetime, int], int] = {}
+    for old, new in deltas:
+        if old is not None:
+            changes[old] = changes.get(old, 0) - 1
+        if new is not None:
+            changes[new] = changes.get(new, 0) + 1
+    try:
+        pipe = queue_ext.get_redis().pipeline(transaction=False)
+        for (minute, platform_id), n in changes.items():
+            if n:
+                key = _day_key(COUNTER_PREFIX, minute)
+                pipe.hincrby(key, _field(minute, platform_id), n)
+                pipe.expireat(key, _expire_at(minute))
+        pipe.execute()
+    except Exception:
+        logger.warning("[forecast] counter update failed; run `flask forecast rebuild`", exc_info=True)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_forecast_deltas(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_DELTAS_KEY, None)
+
+
+def rebuild(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Reset the counters of today and the next MAX_HORIZON from scheduled_jobs (one indexed range read)."""
+    from app.models import db
+
+    now = now or datetime.utcnow()
+    today = datetime(now.year, now.month, now.day)
+    end = today + MAX_HORIZON + timedelta(days=1)
+    sj = ScheduledJob.__table__.c
+    rows = db.session.execute(
+        db.select(sj.scheduled_for, sj.platform_id)
+        .where(sj.status == "scheduled", sj.scheduled_for >= today, sj.scheduled_for < end)
+    ).all()
+
+    counts: Dict[str, Dict[str, int]] = {}
+    for row in rows:
+        minute = row.scheduled_for.replace(second=0, microsecond=0)
+        fields = counts.setdefault(_day_key(COUNTER_PREFIX, minute), {})
+        field = _field(minute, row.platform_id)
+        fields[field] = fields.get(field, 0) + 1
+
+    pipe = queue_ext.get_redis().pipeline()  # MULTI: readers never see a half-rebuilt day
+    day = today
+    while day < end:
+        key = _day_key(COUNTER_PREFIX, day)
+        pipe.delete(key)
+        if key in counts:
+            pipe.hset(key, mapping=counts[key])
+            pipe.expireat(key, _expire_at(day))
+        day += timedelta(days=1)
+    pipe.execute()
+    return {"jobs": len(rows), "days": len(counts)}
+
+
+#! latency ///////////////////////////////////////////////////////////////////////////
+def record_publish_latency(platform_id: Optional[int], seconds: float) -> None:
+    """Called by publish_post_platform; never raises."""
+    now = datetime.utcnow()
+    key = _day_key(LATENCY_PREFIX, now)
+    try:
+        pipe = queue_ext.get_redis().pipeline(transaction=False)
+        pipe.hincrbyfloat(key, f"{platform_id or 0}:sum", seconds)
+        pipe.hincrby(key, f"{platform_id or 0}:count", 1)
+        pipe.expireat(key, _expire_at(now, days=LATENCY_DAYS))
+        pipe.execute()
+    except Exception:
+        logger.debug("[forecast] latency not recorded", exc_info=True)
+
+
+def publish_latencies(now: Optional[datetime] = None) -> Dict[int, Dict[str, float]]:
+    """{platform_id: {"mean_seconds", "samples"}} over the last LATENCY_DAYS days."""
+    now = now or datetime.utcnow()
+    pipe = queue_ext.get_redis().pipeline(transaction=False)
+    for i in range(LATENCY_DAYS):
+        pipe.hgetall(_day_key(LATENCY_PREFIX, now - timedelta(days=i)))
+    sums: Dict[int, List[float]] = {}
+    for day in pipe.execute():
+        for field, value in day.items():
+            platform, _, kind = _text(field).partition(":")
+            acc = sums.setdefault(int(platform), [0.0, 0])
+            acc[0 if kind == "sum" else 1] += float(value)
+    return {pid: {"mean_seconds": round(total / count, 3), "samples": int(count)}
+            for pid, (total, count) in sums.items() if count}
+
+
+#! forecast ///////////////////////////////////////////////////////////////////////////
+def _read_counts(start: datetime, end: datetime) -> Iterable[Tuple[datetime, int, int]]:
+    """(minute, platform_id, fires) for minutes in [start, end), from the day hashes (one pipeline)."""
+    days = []
+    day = datetime(start.year, start.month, start.day)
+    while day < end:
+        days.append(day)
+        day += timedelta(days=1)
+    pipe = queue_ext.get_redis().pipeline(transaction=False)
+    for day in days:
+        pipe.hgetall(_day_key(COUNTER_PREFIX, day))
+    for day, fields in zip(days, pipe.execute()):
+        for field, value in fields.items():
+            minute_of_day, _, platform = _text(field).partition(":")
+            minute = day + timedelta(minutes=int(minute_of_day))
+            n = int(value)
+            if n > 0 and start <= minute < end:
+                yield minute, int(platform), n
+
+
+def forecast(horizon: timedelta = timedelta(hours=24), resolution: timedelta = timedelta(minutes=1),
+             *, platform_id: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Upcoming fires per bucket and platform over the horizon, with the worker count per minute."""
+    now = (now or datetime.utcnow()).replace(second=0, microsecond=0)
+    horizon = min(horizon, MAX_HORIZON)
+    step = max(int(resolution.total_seconds()) // 60, 1)
+    drain = int(current_app.config.get("SCHEDULER_SLO_SECONDS", DEFAULT_DRAIN_SECONDS)) or DEFAULT_DRAIN_SECONDS
+
+    latencies = publish_latencies()
+    overall = (sum(v["mean_seconds"] * v["samples"] for v in latencies.values()) /
+               sum(v["samples"] for v in latencies.values())) if latencies else DEFAULT_PUBLISH_SECONDS
+
+    def latency(pid: int) -> float:
+        return latencies[pid]["mean_seconds"] if pid in latencies else overall
+
+    buckets: Dict[datetime, Dict[int, int]] = {}
+    per_minute_work: Dict[datetime, float] = {}
+    totals: Dict[int, int] = {}
+    for minute, pid, n in _read_counts(now, now + horizon):
+        if platform_id is not None and pid != platform_id:
+            continue
+        offset = int((minute - now).total_seconds() // 60) // step * step
+        bucket = buckets.setdefault(now + timedelta(minutes=offset), {})
+        bucket[pid] = bucket.get(pid, 0) + n
+        totals[pid] = totals.get(pid, 0) + n
+        per_minute_work[minute] = per_minute_work.get(minute, 0.0) + n * latency(pid)
+
+    def name(pid: int) -> str:
+        return (platform_cache.name(pid) or str(pid)) if pid else "all"
+
+    peak_minute, peak_work = max(per_minute_work.items(), key=lambda kv: kv[1], default=(None, 0.0))
+    return {
+        "from": now.isoformat() + "Z",
+        "horizon_seconds": int(horizon.total_seconds()),
+        "resolution_seconds": step * 60,
+        "drain_seconds": drain,
+        "total": sum(totals.values()),
+        "by_platform": {name(pid): n for pid, n in sorted(totals.items())},
+        "latency_seconds": {name(pid): v["mean_seconds"] for pid, v in sorted(latencies.items())},
+        "peak": {
+            "minute": peak_minute.isoformat() + "Z" if peak_minute else None,
+            "work_seconds": round(peak_work, 3),
+            "workers_required": math.ceil(peak_work / drain) if peak_work else 0,
+        },
+        # sparse: only buckets with fires
+        "buckets": [
+            {"start": start.isoformat() + "Z", "total": sum(counts.values()),
+             "platforms": {name(pid): n for pid, n in sorted(counts.items())}}
+            for start, counts in sorted(buckets.items())
+        ],
+    }
+
+
+#! CLI ///////////////////////////////////////////////////////////////////////////
+# `flask forecast show --horizon 7d --resolution 1h`, `flask forecast rebuild`
+forecast_commands = AppGroup('forecast')
+
+
+@forecast_commands.command('show')
+@click.option('--horizon', default='24h', show_default=True)
+@click.option('--resolution', default='1h', show_default=True)
+@with_appcontext
+def show_command(horizon, resolution):
+    from app.services.scheduler_slo import parse_window
+    result = forecast(parse_window(horizon), parse_window(resolution))
+    click.echo(f"{result['total']} publishes in the next {horizon}; by platform: {result['by_platform']}")
+    click.echo(f"peak minute {result['peak']['minute']}: {result['peak']['work_seconds']}s of work -> "
+               f"{result['peak']['workers_required']} workers to drain within {result['drain_seconds']}s")
+    for bucket in result["buckets"]:
+        click.echo(f"{bucket['start']}  {bucket['total']:>6}  {bucket['platforms']}")
+
+
+@forecast_commands.command('rebuild')
+@with_appcontext
+def rebuild_command():
+    click.echo(f"forecast counters rebuilt: {rebuild()}")
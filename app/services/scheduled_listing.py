@@ -0,0 +1,165 @@
+# app/services/scheduled_listing.py
+"""
+Admin listing of rq-scheduler's future jobs without loading them all.
+
+rq-scheduler keeps job ids in the sorted set `rq:scheduler:scheduled_jobs`
+scored by run time (unix seconds). Pages are read with ZRANGEBYSCORE over a
+score window; each job's summary comes from one pipelined HMGET of small hash
+fields (description, origin, created_at, meta), so the pickled call payload
+(`data`) is never loaded or unpickled. Filters on post / platform / queue are
+applied to those summaries while scanning forward, at most SCAN_LIMIT ids per
+request; the cursor then resumes where the scan stopped.
+
+Cursor: "<score>:<skip>" = continue at `score`, skipping the first `skip`
+ids with exactly that score (ties are common: bulk scheduling gives many
+jobs the same run time). A job removed between pages can shift the ties by
+one; fine for an admin view.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from rq.job import Job
+from rq.serializers import resolve_serializer
+from rq_scheduler import Scheduler
+
+from app.extensions.queue import get_redis
+
+SCHEDULED_JOBS_KEY = Scheduler.scheduled_jobs_key
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+SCAN_LIMIT = 5000  # ids examined per request when filters reject most of them
+MAX_BUCKETS = 500
+
+_SUMMARY_FIELDS = ("description", "origin", "created_at", "status", "meta")
+_serializer = resolve_serializer(None)
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """'<score>:<skip>' -> (score, skip); raises ValueError when malformed."""
+    if not cursor:
+        return None
+    score, _, skip = cursor.partition(":")
+    return float(score), int(skip or 0)
+
+
+def _format_cursor(score: float, skip: int) -> str:
+    return f"{score!r}:{skip}"
+
+
+def to_score(dt: Optional[datetime]) -> Optional[float]:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _decode(value) -> Optional[str]:
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else value
+
+
+def _summaries(connection, job_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """One pipeline: HMGET of the small fields per job (None for jobs whose hash expired)."""
+    pipe = connection.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hmget(Job.redis_job_namespace_prefix + job_id, *_SUMMARY_FIELDS)
+    out = []
+    for job_id, values in zip(job_ids, pipe.execute()):
+        description, origin, created_at, status, meta = values
+        if description is None and origin is None:
+            out.append(None)
+            continue
+        try:
+            meta = _serializer.loads(meta) if meta else {}
+        except Exception:
+            meta = {}
+        description = _decode(description) or ""
+        out.append({
+            "id": job_id,
+            "func": description.split("(", 1)[0],
+            "description": description,
+            "origin": _decode(origin),
+            "status": _decode(status),
+            "created_at": _decode(created_at),
+            "meta": meta,
+        })
+    return out
+
+
+def _matches(summary: Dict[str, Any], post_id, platform_id, queue) -> bool:
+    meta = summary["meta"]
+    if post_id is not None and meta.get("post_id") != post_id:
+        return False
+    if platform_id is not None and meta.get("platform_id") != platform_id:
+        return False
+    if queue and summary["origin"] != queue:
+        return False
+    return True
+
+
+#! list_scheduled ///////////////////////////////////////////////////////////////////////////
+def list_scheduled(*, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   cursor: Optional[str] = None, limit: int = DEFAULT_LIMIT,
+                   post_id: Optional[int] = None, platform_id: Optional[int] = None,
+                   queue: Optional[str] = None) -> Dict[str, Any]:
+    """One page of scheduled jobs in run-time order, plus the cursor of the next page (None at the end)."""
+    connection = get_redis()
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    max_score = to_score(end)
+    max_arg = f"({max_score!r}" if max_score is not None else "+inf"  # `end` is exclusive
+
+    position = parse_cursor(cursor)
+    if position is None:
+        score = to_score(start)
+        position = (score, 0) if score is not None else None
+    filtered = post_id is not None or platform_id is not None or bool(queue)
+    chunk = min(limit * 4, MAX_LIMIT) if filtered else limit
+
+    items: List[Dict[str, Any]] = []
+    scanned = 0
+    last: Optional[Tuple[float, int]] = position
+    done = False
+    while not done and len(items) < limit and scanned < SCAN_LIMIT:
+        rows = connection.zrangebyscore(SCHEDULED_JOBS_KEY, repr(last[0]) if last else "-inf", max_arg,
+                                        start=last[1] if last else 0, num=chunk, withscores=True)
+        summaries = _summaries(connection, [_decode(member) for member, _ in rows]) if rows else []
+        consumed = 0
+        for (_, score), summary in zip(rows, summaries):
+            consumed += 1
+            scanned += 1
+            last = (score, last[1] + 1) if last and score == last[0] else (score, 1)
+            if summary is None or not _matches(summary, post_id, platform_id, queue):
+                continue
+            summary["scheduled_for"] = datetime.utcfromtimestamp(score).isoformat() + "Z"
+            items.append(summary)
+            if len(items) >= limit:
+                break
+        done = len(rows) < chunk and consumed == len(rows)  # short chunk read to the end
+
+    next_cursor = None if done or last is None else _format_cursor(*last)
+    return {"scheduled_jobs": items, "next_cursor": next_cursor, "scanned": scanned}
+
+
+#! bucket_counts ///////////////////////////////////////////////////////////////////////////
+def bucket_counts(start: datetime, end: datetime, bucket_seconds: int) -> Dict[str, Any]:
+    """Scheduled jobs per [t, t + bucket) between start and end: one pipelined ZCOUNT per bucket."""
+    connection = get_redis()
+    lo, hi = to_score(start), to_score(end)
+    bucket_seconds = max(int(bucket_seconds), 1)
+    edges = []
+    t = lo
+    while t < hi and len(edges) < MAX_BUCKETS:
+        edges.append(t)
+        t += bucket_seconds
+    pipe = connection.pipeline(transaction=False)
+    for edge in edges:
+        pipe.zcount(SCHEDULED_JOBS_KEY, repr(edge), f"({min(edge + bucket_seconds, hi)!r}")
+    pipe.zcard(SCHEDULED_JOBS_KEY)
+    *counts, total = pipe.execute()
+    return {
+        "bucket_seconds": bucket_seconds,
+        "buckets": [{"start": datetime.utcfromtimestamp(edge).isoformat() + "Z", "count": count}
+                    for edge, count in zip(edges, counts)],
+        "truncated": t < hi,
+        "total_scheduled": total,
+    }
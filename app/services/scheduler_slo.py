@@ -0,0 +1,347 @@
+# app/services/scheduler_slo.py
+"""
+Scheduler SLO: "posts go out within SCHEDULER_SLO_SECONDS of scheduled time".
+
+rollup() aggregates scheduled_jobs into scheduler_lag_rollups, one row per
+5-minute bucket of scheduled_for x platform x queue. Only the recent tail
+(ROLLUP_LOOKBACK, where jobs can still start or finish) is recomputed; older
+buckets are final. A rollup that ran late (scheduler down, no reports) starts
+ROLLUP_LOOKBACK before the previous run instead, so no buckets are skipped.
+report() merges the rollup rows of a sliding window, so a 7-day report reads
+~2k small rows instead of scanning the jobs table, and estimates p50/p95/p99
+from the merged histograms.
+
+One rollup runs at a time (Redis lock ROLLUP_LOCK_KEY): a report or the
+recurring job that finds it held skips the refresh instead of replacing the
+same buckets concurrently (the second insert would hit
+uq_scheduler_lag_rollups_bucket).
+
+A job counts against the SLO when it finished later than the threshold,
+failed, or is still unfinished once the threshold has passed (missed).
+Canceled jobs and jobs not yet due are left out.
+
+  flask slo rollup [--hours 168]   backfill / refresh
+  flask slo report [--window 1h]   print the report
+  flask slo schedule               recurring rollup every 5 minutes (rq-scheduler)
+  GET /api/jobs/slo?window=1h&window=24h&platform_id=2&queue=poststride-tasks
+"""
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from redis.exceptions import WatchError
+from sqlalchemy import func
+
+from app.extensions import queue as queue_ext
+from app.models import db
+from app.models.scheduled_job import ScheduledJob
+from app.models.scheduler_lag_rollup import SchedulerLagRollup
+from app.services.platform_cache import platform_cache
+
+BUCKET_SECONDS = 300
+ROLLUP_LOOKBACK = timedelta(hours=2)  # buckets this recent are recomputed on every rollup
+ROLLUP_MAX_AGE = timedelta(minutes=1)  # report() refreshes the tail when the rollup is older
+ROLLUP_LOCK_KEY = "poststride:slo:rollup-lock"
+ROLLUP_LOCK_SECONDS = 600  # expiry if the holder dies; well above a 7-day backfill
+# seconds; one overflow bucket on top. Dense around typical SLOs so interpolated percentiles stay close
+LAG_EDGES = (0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 900, 1800, 3600)
+DEFAULT_WINDOWS = ("1h", "24h", "7d")
+SLO_SECONDS = 60
+SLO_TARGET = 0.99  # share of due jobs that must go out within SLO_SECONDS
+
+_WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_window(value: str) -> timedelta:
+    """'15m' / '1h' / '7d' -> timedelta; raises ValueError for anything else."""
+    value = (value or "").strip().lower()
+    if len(value) < 2 or value[-1] not in _WINDOW_UNITS or not value[:-1].isdigit() or int(value[:-1]) <= 0:
+        raise ValueError(f"invalid window {value!r}; use e.g. 15m, 1h, 7d")
+    return timedelta(**{_WINDOW_UNITS[value[-1]]: int(value[:-1])})
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _bucket(dt: datetime) -> datetime:
+    """Start of the BUCKET_SECONDS bucket holding a naive UTC datetime."""
+    seconds = int((dt - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % BUCKET_SECONDS)
+
+
+def _slot(seconds: float) -> int:
+    for i, edge in enumerate(LAG_EDGES):
+        if seconds <= edge:
+            return i
+    return len(LAG_EDGES)
+
+
+def _settings() -> Tuple[int, float]:
+    config = current_app.config
+    return (int(config.get("SCHEDULER_SLO_SECONDS", SLO_SECONDS)),
+            float(config.get("SCHEDULER_SLO_TARGET", SLO_TARGET)))
+
+
+#! rollup ///////////////////////////////////////////////////////////////////////////
+def _catch_up_since(now: datetime) -> datetime:
+    """
+    Start of a default rollup: the buckets the previous run left open are
+    recomputed too, however long ago it ran; capped at the widest report window
+    (also the first-run backfill).
+    """
+    oldest = now - parse_window(DEFAULT_WINDOWS[-1])
+    last = db.session.query(func.max(SchedulerLagRollup.computed_at)).scalar()
+    if last is None:
+        return oldest
+    return max(min(last, now) - ROLLUP_LOOKBACK, oldest)
+
+
+def rollup(since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Recompute the rollup rows for buckets in [since, until) (default: from
+    ROLLUP_LOOKBACK before the previous rollup, or before now if that is later,
+    up to now). Idempotent: the buckets' rows are replaced. Returns
+    {"skipped": True} without touching anything while another rollup holds the lock.
+    """
+    connection = queue_ext.get_redis()
+    token = uuid.uuid4().hex
+    if not connection.set(ROLLUP_LOCK_KEY, token, nx=True, ex=ROLLUP_LOCK_SECONDS):
+        return {"skipped": True}
+    try:
+        return _rollup(since, until)
+    finally:
+        _release_lock(connection, token)
+
+
+def _release_lock(connection, token: str) -> None:
+    """Delete the lock only if it is still ours (it may have expired and been taken)."""
+    with connection.pipeline() as pipe:
+        try:
+            pipe.watch(ROLLUP_LOCK_KEY)
+            if pipe.get(ROLLUP_LOCK_KEY) == token.encode():
+                pipe.multi()
+                pipe.delete(ROLLUP_LOCK_KEY)
+                pipe.execute()
+        except WatchError:
+            pass  # taken over between GET and DEL; not ours any more
+
+
+def _rollup(since: Optional[datetime], until: Optional[datetime]) -> Dict[str, Any]:
+    slo_seconds, _ = _settings()
+    now = datetime.utcnow()
+    start = _bucket(since or _catch_up_since(now))
+    end = until or now
+
+    sj = ScheduledJob.__table__.c
+    rows = db.session.execute(
+        db.select(sj.scheduled_for, sj.started_at, sj.finished_at, sj.status, sj.platform_id, sj.queue_name)
+        .where(sj.scheduled_for >= start, sj.scheduled_for < end, sj.status != "canceled")
+    ).all()
+
+    groups: Dict[Tuple[datetime, int, str], Dict[str, Any]] = {}
+    for row in rows:
+        finished = row.finished_at is not None
+        overdue = (now - row.scheduled_for).total_seconds() > slo_seconds
+        if row.started_at is None and not finished and not overdue:
+            continue  # not due yet / waiting for the worker, still inside the SLO
+        key = (_bucket(row.scheduled_for), row.platform_id or 0, row.queue_name)
+        g = groups.get(key)
+        if g is None:
+            g = groups[key] = {
+                "fired": 0, "delivered": 0, "failed": 0, "missed": 0, "breaches": 0,
+                "fire_lag_sum": 0.0, "fire_lag_max": 0.0, "fire_lag_hist": [0] * (len(LAG_EDGES) + 1),
+                "delivery_lag_sum": 0.0, "delivery_lag_max": 0.0, "delivery_lag_hist": [0] * (len(LAG_EDGES) + 1),
+            }
+        if row.started_at is not None:
+            lag = max((row.started_at - row.scheduled_for).total_seconds(), 0.0)
+            g["fired"] += 1
+            g["fire_lag_sum"] += lag
+            g["fire_lag_max"] = max(g["fire_lag_max"], lag)
+            g["fire_lag_hist"][_slot(lag)] += 1
+        if finished and row.status == "failed":
+            g["failed"] += 1
+            g["breaches"] += 1
+        elif finished:
+            lag = max((row.finished_at - row.scheduled_for).total_seconds(), 0.0)
+            g["delivered"] += 1
+            g["delivery_lag_sum"] += lag
+            g["delivery_lag_max"] = max(g["delivery_lag_max"], lag)
+            g["delivery_lag_hist"][_slot(lag)] += 1
+            if lag > slo_seconds:
+                g["breaches"] += 1
+        elif overdue:
+            g["missed"] += 1
+            g["breaches"] += 1
+
+    table = SchedulerLagRollup.__table__
+    db.session.execute(table.delete().where(table.c.bucket_start >= start, table.c.bucket_start < end))
+    if groups:
+        db.session.execute(table.insert(), [
+            {"bucket_start": bucket, "platform_id": platform_id, "queue_name": queue_name,
+             "slo_seconds": slo_seconds, "computed_at": now, **g}
+            for (bucket, platform_id, queue_name), g in groups.items()
+        ])
+    db.session.commit()
+    return {"from": start.isoformat() + "Z", "jobs": len(rows), "rows": len(groups)}
+
+
+def rollup_job():
+    """RQ entry point for the recurring rollup (see `flask slo schedule`)."""
+    return rollup()
+
+
+def _refresh_if_stale() -> None:
+    last = db.session.query(func.max(SchedulerLagRollup.computed_at)).scalar()
+    if last is None or datetime.utcnow() - last > ROLLUP_MAX_AGE:
+        rollup()  # picks up from the previous run; the first one backfills the widest window
+
+
+#! report ///////////////////////////////////////////////////////////////////////////
+def _percentile(hist: List[int], total: int, q: float, max_value: float) -> Optional[float]:
+    """Linear interpolation inside the histogram bucket holding the q-th value."""
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(hist):
+        if count and seen + count >= rank:
+            lower = LAG_EDGES[i - 1] if i > 0 else 0.0
+            upper = LAG_EDGES[i] if i < len(LAG_EDGES) else max_value
+            value = lower + (upper - lower) * ((rank - seen) / count)
+            return round(min(value, max_value), 3)
+        seen += count
+    return round(max_value, 3)
+
+
+def _summarize(rows: Iterable[SchedulerLagRollup], target: float) -> Dict[str, Any]:
+    fired = delivered = failed = missed = breaches = 0
+    fire_sum = delivery_sum = fire_max = delivery_max = 0.0
+    fire_hist = [0] * (len(LAG_EDGES) + 1)
+    delivery_hist = [0] * (len(LAG_EDGES) + 1)
+    for r in rows:
+        fired += r.fired
+        delivered += r.delivered
+        failed += r.failed
+        missed += r.missed
+        breaches += r.breaches
+        fire_sum += r.fire_lag_sum
+        delivery_sum += r.delivery_lag_sum
+        fire_max = max(fire_max, r.fire_lag_max)
+        delivery_max = max(delivery_max, r.delivery_lag_max)
+        for i, n in enumerate(r.fire_lag_hist or ()):
+            fire_hist[i] += n
+        for i, n in enumerate(r.delivery_lag_hist or ()):
+            delivery_hist[i] += n
+
+    evaluated = delivered + failed + missed
+    compliance = round(1 - breaches / evaluated, 5) if evaluated else None
+    return {
+        "jobs": evaluated,
+        "delivered": delivered,
+        "failed": failed,
+        "missed": missed,
+        "breaches": breaches,
+        "compliance": compliance,
+        "slo_breached": compliance is not None and compliance < target,
+        "fire_lag": {
+            "count": fired,
+            "mean": round(fire_sum / fired, 3) if fired else None,
+            "p50": _percentile(fire_hist, fired, 0.50, fire_max),
+            "p95": _percentile(fire_hist, fired, 0.95, fire_max),
+            "p99": _percentile(fire_hist, fired, 0.99, fire_max),
+            "max": round(fire_max, 3) if fired else None,
+        },
+        "delivery_lag": {
+            "count": delivered,
+            "mean": round(delivery_sum / delivered, 3) if delivered else None,
+            "p50": _percentile(delivery_hist, delivered, 0.50, delivery_max),
+            "p95": _percentile(delivery_hist, delivered, 0.95, delivery_max),
+            "p99": _percentile(delivery_hist, delivered, 0.99, delivery_max),
+            "max": round(delivery_max, 3) if delivered else None,
+        },
+    }
+
+
+def report(windows: Iterable[str] = DEFAULT_WINDOWS, *, platform_id: Optional[int] = None,
+           queue_name: Optional[str] = None, refresh: bool = True) -> Dict[str, Any]:
+    """SLO report per sliding window: overall plus a breakdown by platform and queue."""
+    slo_seconds, target = _settings()
+    parsed = [(w, parse_window(w)) for w in windows]
+    if refresh:
+        _refresh_if_stale()
+
+    now = datetime.utcnow()
+    oldest = _bucket(now - max(delta for _, delta in parsed))
+    q = SchedulerLagRollup.query.filter(SchedulerLagRollup.bucket_start >= oldest)
+    if platform_id is not None:
+        q = q.filter(SchedulerLagRollup.platform_id == platform_id)
+    if queue_name:
+        q = q.filter(SchedulerLagRollup.queue_name == queue_name)
+    rows = q.all()
+
+    out = []
+    for label, delta in parsed:
+        start = _bucket(now - delta)
+        in_window = [r for r in rows if r.bucket_start >= start]
+        by_group: Dict[Tuple[int, str], List[SchedulerLagRollup]] = {}
+        for r in in_window:
+            by_group.setdefault((r.platform_id, r.queue_name), []).append(r)
+        breakdown = []
+        for (pid, queue), group_rows in sorted(by_group.items()):
+            breakdown.append({
+                "platform_id": pid or None,
+                "platform": platform_cache.name(pid) if pid else "all",
+                "queue": queue,
+                **_summarize(group_rows, target),
+            })
+        out.append({
+            "window": label,
+            "from": start.isoformat() + "Z",
+            **_summarize(in_window, target),
+            "breakdown": breakdown,
+        })
+
+    return {
+        "slo": {"seconds": slo_seconds, "target": target},
+        "generated_at": now.isoformat() + "Z",
+        "windows": out,
+        "breached": [w["window"] for w in out if w["slo_breached"]],
+    }
+
+
+#! CLI ///////////////////////////////////////////////////////////////////////////
+# `flask slo rollup --hours 168`, `flask slo report --window 1h --window 24h`
+slo_commands = AppGroup('slo')
+
+
+@slo_commands.command('rollup')
+@click.option('--hours', default=None, type=int, help='Recompute this many hours back (default: from 2 hours before the previous rollup).')
+@with_appcontext
+def rollup_command(hours):
+    since = datetime.utcnow() - timedelta(hours=hours) if hours else None
+    click.echo(f"scheduler_lag_rollups: {rollup(since=since)}")
+
+
+@slo_commands.command('report')
+@click.option('--window', 'windows', multiple=True, default=DEFAULT_WINDOWS, show_default=True)
+@click.option('--platform-id', type=int, default=None)
+@click.option('--queue', default=None)
+@with_appcontext
+def report_command(windows, platform_id, queue):
+    result = report(windows, platform_id=platform_id, queue_name=queue)
+    click.echo(json.dumps(result, indent=2))
+    if result["breached"]:
+        raise SystemExit(1)  # usable as a cron / CI check
+
+
+@slo_commands.command('schedule')
+@with_appcontext
+def schedule_command():
+    from app.scheduler import ensure_recurring
+    job_id = ensure_recurring("app.services.scheduler_slo.rollup_job", job_id="recurring:scheduler-slo-rollup",
+                              every=timedelta(seconds=BUCKET_SECONDS))
+    click.echo(f"scheduled {job_id}")
@@ -0,0 +1,179 @@
+# app/services/sync.py
+"""
+Delta sync over the sync_changes log (see app/models/sync_change.py).
+
+changes_since(user_id, cursor) returns rows created/updated since the cursor plus
+tombstones for deleted ones, in a constant number of queries (one for the log,
+one IN query per entity type). compact() purges old tombstones and leaves a
+per-user purge marker; a cursor older than that marker gets reset=True and the
+client must reload its collections once.
+
+Commit ordering: ids are assigned at INSERT but become visible at COMMIT, so a
+transaction still holding id N can commit after id N+1 is already readable.
+Rows younger than SYNC_VISIBILITY_LAG_SECONDS (changed_at, default 30s) are
+served but never advance the cursor: the returned cursor stops right before
+the oldest of them, and the next sync serves them again (upserts and
+tombstones are idempotent). Write transactions must stay shorter than the lag.
+"""
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup, with_appcontext
+from flask import current_app
+from sqlalchemy import func
+
+from app.models import db, Post, PostPlatform, PostMedia, Media, SyncChange
+from app.services.media_order import in_display_order
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+TOMBSTONE_RETENTION_DAYS = 30
+VISIBILITY_LAG_SECONDS = 30
+
+# response key per entity
+COLLECTIONS = {
+    'post': 'posts',
+    'post_platform': 'post_platforms',
+    'post_media': 'post_media',
+    'media': 'media',
+}
+
+
+#! current_cursor ///////////////////////////////////////////////////////////////////////////
+def _settled_before() -> datetime:
+    lag = current_app.config.get('SYNC_VISIBILITY_LAG_SECONDS', VISIBILITY_LAG_SECONDS)
+    return datetime.utcnow() - timedelta(seconds=lag)
+
+
+def current_cursor(user_id: int) -> int:
+    """
+    Cursor for a client that has just loaded everything: the highest change sequence
+    of this user, held back to just before the oldest change still inside the visibility lag.
+    """
+    newest, oldest_unsettled = db.session.query(
+        func.coalesce(func.max(SyncChange.id), 0),
+        func.min(SyncChange.id).filter(SyncChange.changed_at > _settled_before()),
+    ).filter(SyncChange.user_id == user_id).one()
+    return oldest_unsettled - 1 if oldest_unsettled is not None else newest
+
+
+#! _purged_through ///////////////////////////////////////////////////////////////////////////
+def _purged_through(user_id: int) -> int:
+    marker = SyncChange.query.filter_by(user_id=user_id, op='purge').order_by(SyncChange.id.desc()).first()
+    return int(marker.entity_key) if marker else 0
+
+
+#! _load_rows ///////////////////////////////////////////////////////////////////////////
+def _load_rows(entity: str, keys):
+    """
+    Current rows for the upserted keys of one entity type, in one query. post_media
+    comes back whole per touched post: sort_order is the position, and moving or
+    detaching one item shifts its siblings.
+    """
+    if entity == 'post_media':
+        post_ids = {int(key.split(':')[0]) for key in keys}
+        rows = PostMedia.query.filter(PostMedia.post_id.in_(post_ids)).all()
+        return [dict(row.to_dict(), sort_order=position, sort_key=row.sort_order)
+                for position, row in in_display_order(rows)]
+    model = {'post': Post, 'post_platform': PostPlatform, 'media': Media}[entity]
+    ids = [int(key) for key in keys]
+    return [row.to_dict() for row in model.query.filter(model.id.in_(ids)).all()]
+
+
+#! changes_since ///////////////////////////////////////////////////////////////////////////
+def changes_since(user_id: int, cursor: int, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    Page of changes after `cursor` for one user:
+    {"cursor", "has_more", "reset", "changes": {posts: [...], ...}, "deleted": {posts: [keys], ...}}
+    Changes inside the visibility lag are included but stay after the returned cursor.
+    """
+    if cursor < _purged_through(user_id):
+        return {'cursor': current_cursor(user_id), 'has_more': False, 'reset': True,
+                'changes': {}, 'deleted': {}}
+
+    log = (
+        SyncChange.query
+        .filter(SyncChange.user_id == user_id, SyncChange.id > cursor, SyncChange.op != 'purge')
+        .order_by(SyncChange.id.asc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(log) > limit
+    log = log[:limit]
+
+    # The cursor only moves past changes older than the visibility lag
+    settled_before = _settled_before()
+    next_cursor = cursor
+    for change in log:
+        if change.changed_at > settled_before:
+            has_more = False  # the next page starts at this row again; let the client poll instead of looping
+            break
+        next_cursor = change.id
+
+    upserts, deletes = {}, {}
+    for change in log:
+        target = deletes if change.op == 'delete' else upserts
+        target.setdefault(change.entity, []).append(change.entity_key)
+
+    if 'post_media' in deletes:
+        upserts.setdefault('post_media', []).extend(deletes['post_media'])  # positions of the rest moved
+    changes = {COLLECTIONS[entity]: _load_rows(entity, keys) for entity, keys in upserts.items()}
+    deleted = {COLLECTIONS[entity]: keys for entity, keys in deletes.items()}
+    return {
+        'cursor': next_cursor,
+        'has_more': has_more,
+        'reset': False,
+        'changes': changes,
+        'deleted': deleted,
+    }
+
+
+#! compact ///////////////////////////////////////////////////////////////////////////
+def compact(retention_days: int = TOMBSTONE_RETENTION_DAYS) -> dict:
+    """
+    Drop tombstones older than the retention window and duplicate rows for the same
+    entity (only the newest is kept). Users who lost tombstones get a purge marker.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    table = SyncChange.__table__
+
+    # newest purged sequence per user
+    purged = (
+        db.session.query(SyncChange.user_id, func.max(SyncChange.id))
+        .filter(SyncChange.op == 'delete', SyncChange.changed_at < cutoff)
+        .group_by(SyncChange.user_id)
+        .all()
+    )
+    removed = db.session.execute(
+        table.delete().where(table.c.op == 'delete', table.c.changed_at < cutoff)
+    ).rowcount
+
+    # concurrent writers can leave two rows for one entity; keep the newest
+    newest = (
+        db.session.query(func.max(SyncChange.id))
+        .group_by(SyncChange.entity, SyncChange.entity_key)
+    )
+    deduped = db.session.execute(
+        table.delete().where(table.c.op != 'purge', table.c.id.notin_(newest.scalar_subquery()))
+    ).rowcount
+
+    for user_id, through in purged:
+        db.session.execute(table.delete().where(table.c.user_id == user_id, table.c.op == 'purge'))
+        db.session.execute(table.insert().values(
+            user_id=user_id, entity='*', entity_key=str(through), op='purge', changed_at=datetime.utcnow()
+        ))
+    db.session.commit()
+    return {'tombstones_removed': removed, 'duplicates_removed': deduped, 'users_marked': len(purged)}
+
+
+#! CLI ///////////////////////////////////////////////////////////////////////////
+# `flask sync compact --days 30`
+sync_commands = AppGroup('sync')
+
+
+@sync_commands.command('compact')
+@click.option('--days', default=TOMBSTONE_RETENTION_DAYS, show_default=True, help='Tombstone retention in days.')
+@with_appcontext
+def compact_command(days):
+    result = compact(retention_days=days)
+    click.echo(f"sync_changes compacted: {result}")
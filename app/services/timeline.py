@@ -0,0 +1,139 @@
+# app/services/timeline.py
+"""
+Per-post timeline: where the time went between "schedule" and "published".
+
+Built from what is already recorded, so it works without a tracing backend:
+  - posts.created_at, post_platforms.published_at
+  - scheduled_jobs: scheduled_for -> enqueued_at -> started_at -> finished_at / canceled_at
+  - RQ job hashes (still in Redis until their result TTL expires): enqueued_at,
+    started_at, ended_at for the scheduled job and the per-platform child jobs
+    it enqueued (job.meta["children"])
+Each scheduled job carries the trace_id of its trace, for lookup in the
+tracing backend (or `grep <trace_id> instance/traces.jsonl`).
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from rq.job import Job
+
+from app.extensions.queue import get_redis
+from app.models.post import Post
+from app.models.scheduled_job import ScheduledJob
+from app.services.platform_cache import platform_cache
+from app.utils.timezone_helpers import format_utc_with_z, to_utc_naive
+
+
+def _seconds(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round((end - start).total_seconds(), 3)
+
+
+def _naive(dt: Optional[datetime]) -> Optional[datetime]:
+    return to_utc_naive(dt) if dt is not None else None
+
+
+def _fetch_jobs(job_ids: List[str]) -> Dict[str, Job]:
+    """RQ jobs by id in one round trip; expired or unreadable jobs are left out."""
+    if not job_ids:
+        return {}
+    try:
+        jobs = Job.fetch_many(job_ids, connection=get_redis())
+    except Exception:
+        return {}
+    return {job.id: job for job in jobs if job is not None}
+
+
+def _rq_job_entry(job: Job, events: List[Dict[str, Any]], label: str) -> Dict[str, Any]:
+    enqueued_at, started_at, ended_at = _naive(job.enqueued_at), _naive(job.started_at), _naive(job.ended_at)
+    for at, name in ((enqueued_at, "enqueued"), (started_at, "started"), (ended_at, "ended")):
+        if at is not None:
+            events.append({"at": at, "event": f"{label}.{name}", "rq_job_id": job.id})
+    try:
+        status = job.get_status(refresh=False)
+    except Exception:
+        status = None
+    return {
+        "rq_job_id": job.id,
+        "task": (job.func_name or "").rsplit(".", 1)[-1],
+        "status": str(status.value if hasattr(status, "value") else status) if status else None,
+        "traceparent": (job.meta or {}).get("traceparent"),
+        "post_platform_id": (job.meta or {}).get("post_platform_id"),
+        "enqueued_at": format_utc_with_z(enqueued_at),
+        "started_at": format_utc_with_z(started_at),
+        "ended_at": format_utc_with_z(ended_at),
+        "queue_wait_seconds": _seconds(enqueued_at, started_at),
+        "run_seconds": _seconds(started_at, ended_at),
+    }
+
+
+def build_post_timeline(post: Post) -> Dict[str, Any]:
+    events: List[Dict[str, Any]] = []
+    if post.created_at:
+        events.append({"at": post.created_at, "event": "post.created"})
+
+    scheduled_jobs = (ScheduledJob.query
+                      .filter_by(post_id=post.id)
+                      .order_by(ScheduledJob.id)
+                      .all())
+    rq_jobs = _fetch_jobs([sj.rq_job_id for sj in scheduled_jobs if sj.rq_job_id])
+    child_ids = [child for job in rq_jobs.values() for child in (job.meta or {}).get("children", ())]
+    child_jobs = _fetch_jobs(child_ids)
+
+    jobs_out = []
+    for sj in scheduled_jobs:
+        for at, name in ((sj.enqueued_at, "enqueued"), (sj.scheduled_for, "due"),
+                         (sj.started_at, "started"), (sj.finished_at, "finished"), (sj.canceled_at, "canceled")):
+            if at is not None:
+                events.append({"at": at, "event": f"scheduled_job.{name}", "scheduled_job_id": sj.id})
+
+        rq_job = rq_jobs.get(sj.rq_job_id)
+        children = []
+        if rq_job is not None:
+            rq_entry = _rq_job_entry(rq_job, events, "rq_job")
+            for child_id in (rq_job.meta or {}).get("children", ()):
+                if child_id in child_jobs:
+                    children.append(_rq_job_entry(child_jobs[child_id], events, "rq_child_job"))
+        else:
+            rq_entry = None
+
+        jobs_out.append({
+            "scheduled_job_id": sj.id,
+            "platform_id": sj.platform_id,
+            "status": sj.status,
+            "trace_id": sj.trace_id,
+            "scheduled_for": format_utc_with_z(sj.scheduled_for),
+            # scheduled_for -> started_at: rq-scheduler poll interval + queue wait
+            "fire_lag_seconds": _seconds(sj.scheduled_for, sj.started_at),
+            "run_seconds": _seconds(sj.started_at, sj.finished_at),
+            "rq_job": rq_entry,
+            "child_jobs": children,
+        })
+
+    platforms = []
+    for pp in post.post_platforms:
+        platforms.append({
+            "post_platform_id": pp.id,
+            "platform_id": pp.platform_id,
+            "platform_name": platform_cache.name(pp.platform_id),
+            "status": pp.status,
+            "published_at": format_utc_with_z(pp.published_at),
+        })
+        if pp.published_at:
+            events.append({"at": pp.published_at, "event": "post_platform.published",
+                           "post_platform_id": pp.id})
+
+    events.sort(key=lambda e: e["at"])
+    first = events[0]["at"] if events else None
+    for e in events:
+        e["offset_seconds"] = _seconds(first, e["at"])
+        e["at"] = format_utc_with_z(e["at"])
+
+    return {
+        "post_id": post.id,
+        "status": post.status,
+        "trace_ids": sorted({sj.trace_id for sj in scheduled_jobs if sj.trace_id}),
+        "scheduled_jobs": jobs_out,
+        "platforms": platforms,
+        "events": events,
+    }
@@ -0,0 +1,229 @@
+# app/services/user_cache.py
+"""
+Short-TTL cache for the Flask-Login user loader.
+
+Sessions store "<user id>:<session_version>" (User.get_id). load_user resolves it
+from a per-process LRU, then (USER_CACHE_REDIS=1) a Redis hash
+poststride:user:<id> with one field per session version, and only then from the
+database. It returns a CachedUser: the identity fields every route reads
+(id, username, email, timezone) without an ORM row; any other attribute loads
+the User row on first use.
+
+A commit that changes or deletes a User (update_user / delete_user, password
+changes) drops the entry from the local LRU and Redis and publishes the user id
+so other processes drop theirs. Changing the password bumps session_version, so
+cookies carrying the old version stop loading. Cookies from before versioning
+("<user id>" only) were issued while every user was at version 1, so they load
+as version 1 (and die with the first password change); load_user rewrites them
+to "<user id>:<version>" on their next request.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import queue as queue_ext
+from app.extensions.pubsub import broker, publish
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 30
+USER_KEY = "poststride:user:{user_id}"
+CHANNEL = "poststride:users:invalidate"
+
+_FIELDS = ('id', 'username', 'email', 'timezone', 'session_version')
+LEGACY_SESSION_VERSION = 1  # users.session_version server_default when versioning shipped
+_DIRTY_KEY = "users_dirty"
+
+
+#! CachedUser ///////////////////////////////////////////////////////////////////////////
+class CachedUser(UserMixin):
+    """
+    What Flask-Login keeps as current_user. Built per request from cached fields;
+    the ORM row is loaded lazily (once) when something beyond them is needed.
+    """
+
+    def __init__(self, id, username, email, timezone, session_version):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.timezone = timezone
+        self.session_version = session_version
+        self._orm = None
+
+    def get_id(self):
+        return f'{self.id}:{self.session_version}'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'timezone': self.timezone
+        }
+
+    @property
+    def orm(self):
+        """The User row for this identity (relationships, check_password, writes)."""
+        if self._orm is None:
+            from app.models import User
+            self._orm = User.query.get(self.id)
+        return self._orm
+
+    def __getattr__(self, name):
+        # only reached for attributes not set above
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.orm, name)
+
+
+def parse_session_id(raw: str):
+    """"12:3" -> (12, 3); legacy "12" -> (12, None). Raises ValueError on garbage."""
+    user_id, _, version = str(raw).partition(':')
+    return int(user_id), (int(version) if version else None)
+
+
+#! UserCache ///////////////////////////////////////////////////////////////////////////
+class UserCache:
+
+    def __init__(self, max_size: int = USER_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # (id, version) -> (expires_at, fields)
+        self._lock = threading.Lock()
+        self._subscribed = False
+
+    @staticmethod
+    def _ttl() -> int:
+        return current_app.config.get('USER_CACHE_TTL', USER_CACHE_TTL)
+
+    @staticmethod
+    def _redis_enabled() -> bool:
+        return bool(current_app.config.get('USER_CACHE_REDIS'))
+
+    # ---- tiers ---------------------------------------------------------------
+    def _get_local(self, key) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _put_local(self, key, fields: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl(), fields)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_redis(self, user_id: int, version: int) -> Optional[dict]:
+        try:
+            raw = queue_ext.get_redis().hget(USER_KEY.format(user_id=user_id), str(version))
+        except Exception:
+            return None
+        return json.loads(raw) if raw else None
+
+    def _put_redis(self, fields: dict) -> None:
+        key = USER_KEY.format(user_id=fields['id'])
+        try:
+            pipe = queue_ext.get_redis().pipeline()
+            pipe.hset(key, str(fields['session_version']), json.dumps(fields))
+            pipe.expire(key, self._ttl())
+            pipe.execute()
+        except Exception:
+            logger.warning("[user_cache] Redis write failed for user %s", fields['id'])
+
+    @staticmethod
+    def _get_db(user_id: int) -> Optional[dict]:
+        from app.models import db, User
+
+        row = (db.session.query(User.id, User.username, User.email, User.timezone, User.session_version)
+               .filter(User.id == user_id).first())
+        return dict(zip(_FIELDS, row)) if row else None
+
+    # ---- public ----------------------------------------------------------------
+    def load(self, user_id: int, session_version: Optional[int]) -> Optional[CachedUser]:
+        """
+        The user for a session id, or None when the user is gone or the session's
+        version is outdated. session_version None (cookie from before versioning)
+        counts as LEGACY_SESSION_VERSION.
+        """
+        self._ensure_subscribed()
+        if session_version is None:
+            session_version = LEGACY_SESSION_VERSION
+        key = (user_id, session_version)
+        fields = self._get_local(key)
+        if fields is None and self._redis_enabled():
+            fields = self._get_redis(user_id, session_version)
+            if fields is not None:
+                self._put_local(key, fields)
+        if fields is None:
+            fields = self._get_db(user_id)
+            if fields is None:
+                return None
+            if fields['session_version'] != session_version:
+                return None
+            self._put_local((user_id, fields['session_version']), fields)
+            if self._redis_enabled():
+                self._put_redis(fields)
+        return CachedUser(**fields)
+
+    def invalidate_local(self, user_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget a user in this process, in Redis, and (via pub/sub) in every other process."""
+        self.invalidate_local(user_id)
+        try:
+            queue_ext.get_redis().delete(USER_KEY.format(user_id=user_id))
+        except Exception:
+            logger.warning("[user_cache] Redis delete failed for user %s; entries expire within the TTL", user_id)
+        publish(CHANNEL, {"user_id": user_id})
+
+    def _on_message(self, channel: str, payload: dict) -> None:
+        user_id = payload.get("user_id")
+        if isinstance(user_id, int):
+            self.invalidate_local(user_id)
+
+    def _ensure_subscribed(self) -> None:
+        if not self._subscribed:
+            self._subscribed = True
+            broker.subscribe(CHANNEL, self._on_message)
+
+
+user_cache = UserCache()
+
+
+#! Invalidate on commit ///////////////////////////////////////////////////////////////////////////
+@event.listens_for(Session, "after_flush")
+def _note_user_writes(session, flush_context):
+    from app.models import User
+
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            session.info.setdefault(_DIRTY_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop(_DIRTY_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_user_writes(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_DIRTY_KEY, None)
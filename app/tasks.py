@@ -1,11 +1,17 @@
 from datetime import datetime
 from flask import current_app
 # from app import app as flask_app          # <-- use the global app you already create
-from app.models import db, Post, PostPlatform, SocialPlatform
+from app.models import db, Post, PostPlatform
 from app.extensions.queue import get_queue  # your RQ queue getter
 from app.utils.timezone_helpers import to_utc_naive  # Ensure UTC consistency
 from rq import Retry, get_current_job
 from app.scheduler import mark_scheduled_job_status  
+from app.services.post_events import queue_post_event, queue_post_platform_event
+from app.services.platform_cache import platform_cache
+from app.extensions.metrics import count_publish_result
+from app.extensions import tracing
+from app.services.publish_forecast import record_publish_latency
+import time
 
 
 
@@ -175,6 +181,7 @@ def publish_post(post_id: int):
         # run inline for this platform (no extra enqueue)
         try:
             pp.status = "publishing"
+            queue_post_platform_event(db.session, pp, post.user_id)
             db.session.commit()
 
             publish_post_platform(pp.id)  # <-- synchronous publish for the targeted platform
@@ -201,6 +208,7 @@ def publish_post(post_id: int):
 
     q = get_queue()
     enqueued_any = False
+    children = []
     for pp in pps:
         # Skip anything already handled/underway
         if pp.status in ("queued", "publishing", "published", "skipped", "canceled"):
@@ -208,13 +216,22 @@ def publish_post(post_id: int):
             continue
 
         pp.status = "queued"
+        queue_post_platform_event(db.session, pp, post.user_id)
         db.session.commit()
 
-        # enqueue per-platform worker
-        q.enqueue(publish_post_platform, pp.id, retry=_retry_policy())
+        # enqueue per-platform worker (same trace; the timeline finds it through the parent's meta)
+        with tracing.redis_span("rq.enqueue", **{"poststride.post_platform_id": pp.id}):
+            child = q.enqueue(publish_post_platform, pp.id, retry=_retry_policy(),
+                              meta={"post_id": post.id, "post_platform_id": pp.id,
+                                    tracing.TRACEPARENT_META_KEY: tracing.outgoing_traceparent()})
+        children.append(child.id)
         enqueued_any = True
         current_app.logger.info(f"[tasks.publish_post] enqueued pp_id={pp.id}")
 
+    if job and children:
+        job.meta["children"] = children
+        job.save_meta()
+
     _recompute_parent_post_status(post.id)
 
     # Orchestrator has done its job. For the orchestrator's scheduled_job row:
@@ -237,6 +254,7 @@ def publish_post_platform(pp_id: int):
 
     For production → you'll replace the MOCK section with actual API calls to each platform.
     """
+    started = time.perf_counter()  # run time per platform feeds the publish forecast
     pp = PostPlatform.query.get(pp_id)
     if not pp:
         current_app.logger.warning(f"[tasks.publish_pp] post_platform {pp_id} not found")
@@ -258,11 +276,12 @@ def publish_post_platform(pp_id: int):
         db.session.commit()
         return
 
-    platform = SocialPlatform.query.get(pp.platform_id)
+    platform = platform_cache.get(pp.platform_id)
     platform_name = (platform.name if platform and platform.name else "").strip().lower()
 
     # Move to publishing
     pp.status = "publishing"
+    queue_post_platform_event(db.session, pp, post.user_id)
     db.session.commit()
 
     try:
@@ -282,15 +301,21 @@ def publish_post_platform(pp_id: int):
         # 2- Stores a fake platform_post_id (in real life, you’d save the ID returned by the platform API),
         # 3- Stamps published_at in UTC.
 
-        pp.platform_post_id = f"mock-{pp.id}"
+        # The outbound platform API call goes inside this span
+        with tracing.span("platform.publish", **{"poststride.platform": platform_name,
+                                                  "poststride.post_platform_id": pp.id}):
+            pp.platform_post_id = f"mock-{pp.id}"
         pp.published_at = datetime.utcnow()
         pp.status = "published"
+        queue_post_platform_event(db.session, pp, post.user_id)
         db.session.commit()
 
         # 5. Updates statuses to "published"
         #! Set the aggregate post status 
         # Marks the overall post as published once all per-platform rows were “handled”.
         _recompute_parent_post_status(post.id)
+        count_publish_result(platform_name, "published")
+        record_publish_latency(pp.platform_id, time.perf_counter() - started)
 
         current_app.logger.info(f"[tasks.publish_pp] published OK pp_id={pp_id}")
         return {"ok": True, "pp_id": pp_id, "status": pp.status}
@@ -298,10 +323,21 @@ def publish_post_platform(pp_id: int):
     except Exception as e:
         current_app.logger.exception(f"[tasks.publish_pp] publish failed pp_id={pp_id}: {e}")
         pp.status = "failed"
+        queue_post_platform_event(db.session, pp, post.user_id)
         db.session.commit()
         _recompute_parent_post_status(post.id)
+        count_publish_result(platform_name, "failed")
+        record_publish_latency(pp.platform_id, time.perf_counter() - started)
         return {"ok": False, "pp_id": pp_id, "error": str(e)}
 
+#! process_import ///////////////////////////////////////////////////////////////////////////
+def process_import(import_job_id: int):
+    """
+    Import an uploaded CSV/XLSX campaign file in chunks (see app/services/imports.py).
+    """
+    from app.services.imports import run_import
+    return run_import(import_job_id)
+
 # =============================================================================
 # Helpers
 # =============================================================================
@@ -342,6 +378,7 @@ def _recompute_parent_post_status(post_id: int):
         # leave as-is (draft/scheduled/etc.)
         pass
 
+    queue_post_event(db.session, post)
     db.session.commit()
 
 
@@ -0,0 +1,113 @@
+"""
+In-process request benchmark: `flask bench endpoint /api/health/live -n 5000`.
+
+Drives the app through its WSGI test client, so the numbers measure Flask +
+app code per request (no network, no server workers). Useful for before/after
+comparisons of hooks that run on every request.
+
+Startup benchmark: `flask bench startup --budget-ms worker=600` runs
+`python -X importtime` on create_app(profile) in fresh interpreters and
+exits 1 when a profile's import time is over its budget (for CI).
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+
+bench_commands = AppGroup('bench')
+
+
+@bench_commands.command('endpoint')
+@click.argument('path', default='/api/health/live')
+@click.option('-n', '--requests', 'total', default=5000, show_default=True, help='Timed requests.')
+@click.option('--warmup', default=200, show_default=True, help='Untimed requests first.')
+@with_appcontext
+def bench_endpoint(path, total, warmup):
+    """Requests/sec and latency for GET PATH."""
+    client = current_app.test_client()
+    for _ in range(warmup):
+        client.get(path).close()
+
+    latencies, set_cookies = [], 0
+    started = time.perf_counter()
+    for _ in range(total):
+        t0 = time.perf_counter()
+        response = client.get(path)
+        latencies.append(time.perf_counter() - t0)
+        set_cookies += len(response.headers.getlist('Set-Cookie'))
+        response.close()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    click.echo(f'GET {path}: {total} requests in {elapsed:.2f}s = {total / elapsed:.0f} req/s')
+    click.echo(f'latency mean {statistics.mean(latencies) * 1000:.3f}ms '
+               f'p50 {latencies[len(latencies) // 2] * 1000:.3f}ms '
+               f'p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.3f}ms; '
+               f'Set-Cookie headers/request {set_cookies / total:.2f}')
+
+
+#! startup ///////////////////////////////////////////////////////////////////////////
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STARTUP_SCRIPT = ("import time; t = time.perf_counter(); from app import create_app; "
+                   "create_app({profile!r}); print(time.perf_counter() - t)")
+
+
+def _import_times(stderr: str):
+    """Top-level imports from `-X importtime` output: [(module, cumulative µs)]."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|", 2)  # "import time: self | cumulative | <indent>module"
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            out.append((name.strip(), int(cumulative)))
+    return out
+
+
+def measure_startup(profile: str):
+    """(wall seconds, import seconds, top-level imports) of one fresh `create_app(profile)`."""
+    env = dict(os.environ)
+    env.pop("APP_PROFILE", None)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPT.format(profile=profile)],
+                            cwd=_REPO_ROOT, env=env, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise click.ClickException(f"create_app({profile!r}) failed:\n{result.stderr.strip().splitlines()[-1]}")
+    imports = _import_times(result.stderr)
+    return float(result.stdout.strip().splitlines()[-1]), sum(us for _, us in imports) / 1e6, imports
+
+
+@bench_commands.command('startup')
+@click.option('--profile', 'profiles', multiple=True, type=click.Choice(['worker', 'cli', 'web']),
+              help='Profiles to measure (default: all).')
+@click.option('--budget-ms', 'budgets', multiple=True, metavar='PROFILE=MS',
+              help='Import-time budget, e.g. worker=600; exits 1 when exceeded.')
+@click.option('--runs', default=3, show_default=True, help='Fresh interpreters per profile (best run counts).')
+@click.option('--top', default=8, show_default=True, help='Slowest top-level imports shown.')
+def bench_startup(profiles, budgets, runs, top):
+    """Import time of create_app(profile), measured with python -X importtime."""
+    limits = {}
+    for budget in budgets:
+        name, _, ms = budget.partition('=')
+        try:
+            limits[name] = float(ms)
+        except ValueError:
+            raise click.BadParameter(f'{budget!r} is not PROFILE=MS', param_hint='--budget-ms')
+
+    over = []
+    for profile in profiles or ('worker', 'cli', 'web'):
+        wall, imported, imports = min((measure_startup(profile) for _ in range(max(runs, 1))), key=lambda r: r[1])
+        budget = limits.get(profile)
+        verdict = '' if budget is None else (' OVER' if imported * 1000 > budget else ' ok') + f' (budget {budget:.0f}ms)'
+        click.echo(f'{profile}: imports {imported * 1000:.0f}ms, create_app {wall * 1000:.0f}ms{verdict}')
+        for module, us in sorted(imports, key=lambda kv: kv[1], reverse=True)[:top]:
+            click.echo(f'  {us / 1000:8.1f}ms  {module}')
+        if budget is not None and imported * 1000 > budget:
+            over.append(profile)
+    if over:
+        raise SystemExit(1)
@@ -0,0 +1,88 @@
+"""
+Response compression.
+
+`init_compression(app)` registers an after_request hook that gzip- or
+brotli-encodes buffered API responses (JSON, CSV, text) once they are bigger
+than COMPRESS_MIN_SIZE bytes and the client accepts it. Streamed responses
+(SSE, exports) and file responses are left alone; static files are compressed
+ahead of time instead (see app/utils/static_assets.py).
+
+Brotli is optional: without the `brotli` package only gzip is offered.
+"""
+
+import gzip
+from typing import Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESS_MIN_SIZE = 1024           # bytes; smaller bodies are not worth the CPU
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 4        # dynamic responses: fast; static assets use 11 at build time
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/csv',
+    'text/plain',
+    'text/html',
+}
+
+
+def available_encodings():
+    """Encodings this process can produce, most preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(encodings=None) -> Optional[str]:
+    """Best encoding from `encodings` allowed by the request's Accept-Encoding, or None."""
+    accept = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in encodings or available_encodings():
+        quality = accept.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_bytes(data: bytes, encoding: str, *, level: Optional[int] = None) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY if level is None else level)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def _add_vary(response) -> None:
+    if 'accept-encoding' not in {value.lower() for value in response.vary}:
+        response.vary.add('Accept-Encoding')
+
+
+def compress_response(response, min_size: int = COMPRESS_MIN_SIZE):
+    """after_request hook: encode a buffered response in place when worthwhile."""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    _add_vary(response)
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(compress_bytes(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # a strong ETag names one exact byte sequence; the encoded body is a different one
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app) -> None:
+    min_size = app.config.get('COMPRESS_MIN_SIZE', COMPRESS_MIN_SIZE)
+    app.after_request(lambda response: compress_response(response, min_size))
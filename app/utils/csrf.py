@@ -0,0 +1,52 @@
+"""
+CSRF cookie management.
+
+The React client reads the `csrf_token` cookie and echoes it on login/signup.
+The cookie used to be regenerated (session access + HMAC signing + Set-Cookie)
+on every response. Now it is issued once per session and rotated every
+CSRF_ROTATE_SECONDS, which stays well inside Flask-WTF's WTF_CSRF_TIME_LIMIT
+(default 3600s), so the token a browser holds is always accepted.
+Health probes and static files never touch the session or the cookie.
+"""
+
+import os
+import time
+
+from flask import request, session
+from flask_wtf.csrf import generate_csrf
+
+CSRF_COOKIE = 'csrf_token'
+CSRF_ROTATE_SECONDS = 30 * 60
+CSRF_SKIP_PREFIXES = ('/api/health', '/metrics')
+CSRF_SKIP_ENDPOINTS = {'static'}
+_ISSUED_AT_KEY = 'csrf_issued_at'
+
+
+def _skip_request() -> bool:
+    return request.endpoint in CSRF_SKIP_ENDPOINTS or request.path.startswith(CSRF_SKIP_PREFIXES)
+
+
+def csrf_cookie_due(now: float, rotate_seconds: int = CSRF_ROTATE_SECONDS) -> bool:
+    """True when this response should carry a fresh csrf_token cookie."""
+    if _skip_request():
+        return False
+    if CSRF_COOKIE not in request.cookies:
+        return True
+    issued_at = session.get(_ISSUED_AT_KEY)
+    return issued_at is None or now - issued_at >= rotate_seconds
+
+
+def inject_csrf_token(response):
+    """after_request hook: (re)issue the csrf_token cookie when it is missing or due for rotation."""
+    now = time.time()
+    if not csrf_cookie_due(now):
+        return response
+    session[_ISSUED_AT_KEY] = int(now)
+    production = os.environ.get('FLASK_ENV') == 'production'
+    response.set_cookie(
+        CSRF_COOKIE,
+        generate_csrf(),
+        secure=True if production else False,
+        samesite='Strict' if production else None,
+        httponly=True)
+    return response
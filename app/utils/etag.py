@@ -0,0 +1,53 @@
+"""
+ETag helpers for post resources.
+
+A post's ETag is derived from posts.updated_at and posts.version (bumped whenever the
+post or one of its post_platforms / post_media rows changes, see models/post.py).
+Checking If-None-Match therefore needs one indexed lookup on posts and never loads
+relationships.
+"""
+
+import hashlib
+from typing import Optional
+from flask import request, Response
+from app.models import db, Post
+
+
+def load_post_version(post_id: int, user_id: Optional[int] = None):
+    """
+    Fetch (id, version, updated_at) for a post in one primary-key lookup.
+    Pass user_id to scope the lookup to the owner. Returns None if not found.
+    """
+    query = db.session.query(Post.id, Post.version, Post.updated_at).filter(Post.id == post_id)
+    if user_id is not None:
+        query = query.filter(Post.user_id == user_id)
+    return query.first()
+
+
+def post_etag(version_row, *variant) -> str:
+    """
+    Build a strong ETag value from a load_post_version() row.
+    `variant` covers anything else the representation depends on (query string, user timezone).
+    """
+    updated = version_row.updated_at.isoformat() if version_row.updated_at else ''
+    parts = [str(version_row.id), str(version_row.version or 0), updated, *[str(v) for v in variant]]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def is_not_modified(etag: str) -> bool:
+    """
+    True if the request's If-None-Match already holds this ETag. Weak comparison
+    (RFC 7232): compressed responses carry the tag as W/"...".
+    """
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Empty 304 carrying the current ETag in the form the cached 200 had: weak when the
+    client's copy was the compressed one (W/"...", see app/utils/compression.py), strong
+    otherwise. A 304 has no body to size, so the matched validator tells which it was.
+    """
+    response = Response(status=304)
+    response.set_etag(etag, weak=not request.if_none_match.contains(etag))
+    return response
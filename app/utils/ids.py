@@ -0,0 +1,42 @@
+"""
+Strict parsing of id lists from request bodies and query strings.
+
+Batch endpoints take either a JSON array of integers or a "1,2,3" query-string
+value. The cap is checked on the raw entry count, before anything is parsed,
+and duplicates are dropped in one pass.
+"""
+
+from typing import List
+
+
+def parse_ids(raw_ids, limit: int, field: str = 'ids') -> List[int]:
+    """
+    Accept a JSON array of integers or a "1,2,3" string; return de-duplicated ints in request order.
+    Raises ValueError (message ready for the client) on more than `limit` entries, before parsing
+    any of them, and on anything that is not an integer id (bools, 1.9, "5" inside an array).
+    """
+    if isinstance(raw_ids, str):
+        raw_ids = [part.strip() for part in raw_ids.split(',') if part.strip()]
+        from_string = True
+    elif isinstance(raw_ids, list):
+        from_string = False
+    else:
+        raise ValueError(f'{field} must be an array of integers')
+    if len(raw_ids) > limit:
+        raise ValueError(f'At most {limit} {field} per request')
+
+    ids, seen = [], set()
+    for raw in raw_ids:
+        if from_string and raw.isdigit():
+            value = int(raw)
+        elif isinstance(raw, int) and not isinstance(raw, bool):
+            value = raw
+        elif isinstance(raw, float) and raw.is_integer():
+            value = int(raw)
+        else:
+            raise ValueError(f'{field} must be a comma-separated list of integers' if from_string
+                             else f'{field} must be an array of integers')
+        if value not in seen:
+            seen.add(value)
+            ids.append(value)
+    return ids
@@ -0,0 +1,107 @@
+"""
+Serving the React build (react-app/build).
+
+`flask static compress` (run after `npm run build`) writes <file>.gz and, with
+the `brotli` package installed, <file>.br next to every compressible asset.
+`send_static_asset` then serves the best pre-compressed variant straight from
+disk (send_file: sendfile / X-Sendfile when USE_X_SENDFILE is on), with:
+  - content-hashed files (static/js/main.3f2a1b4c.js): cached for a year, immutable
+  - everything else (index.html, manifest.json): no-cache, revalidated by ETag,
+    so a deploy is picked up on the next page load
+"""
+
+import mimetypes
+import os
+import re
+
+import click
+from flask import abort, current_app, send_file
+from flask.cli import AppGroup, with_appcontext
+from werkzeug.security import safe_join
+
+from app.utils.compression import brotli, compress_bytes, negotiate_encoding
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+PRECOMPRESS_MIN_SIZE = 1024
+PRECOMPRESS_EXTENSIONS = {'.js', '.css', '.html', '.json', '.svg', '.map', '.txt', '.ico'}
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# CRA output names: main.3f2a1b4c.js, 2.8e1b7f0d.chunk.css, logo.5d5d9eef.svg
+_HASHED_NAME = re.compile(r'\.[0-9a-f]{8,20}\.(?:chunk\.)?[a-z0-9]+$')
+
+
+def is_hashed_asset(filename: str) -> bool:
+    return bool(_HASHED_NAME.search(os.path.basename(filename)))
+
+
+#! send_static_asset ///////////////////////////////////////////////////////////////////////////
+def send_static_asset(filename: str):
+    """Serve a file from the static folder, using a .br/.gz sibling when the client accepts it."""
+    path = safe_join(current_app.static_folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    available = [encoding for encoding, suffix in ENCODING_SUFFIXES.items() if os.path.isfile(path + suffix)]
+    encoding = negotiate_encoding(available) if available else None
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    immutable = is_hashed_asset(filename)
+
+    # max_age None -> Cache-Control: no-cache (revalidate with the ETag every time)
+    response = send_file(path + ENCODING_SUFFIXES[encoding] if encoding else path, mimetype=mimetype,
+                         conditional=True, max_age=IMMUTABLE_MAX_AGE if immutable else None)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if available:
+        response.vary.add('Accept-Encoding')
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+#! flask static compress ///////////////////////////////////////////////////////////////////////////
+def precompress_directory(root: str) -> dict:
+    """Write .gz (and .br) siblings for compressible files; skips ones already up to date."""
+    stats = {'files': 0, 'written': 0, 'bytes_in': 0, 'bytes_out': 0}
+    encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.splitext(name)[1].lower() not in PRECOMPRESS_EXTENSIONS:
+                continue
+            if os.path.getsize(path) < PRECOMPRESS_MIN_SIZE:
+                continue
+            stats['files'] += 1
+            data = None
+            for encoding in encodings:
+                target = path + ENCODING_SUFFIXES[encoding]
+                if os.path.isfile(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                if data is None:
+                    with open(path, 'rb') as handle:
+                        data = handle.read()
+                # build time: spend CPU once for the smallest output
+                encoded = compress_bytes(data, encoding, level=11 if encoding == 'br' else 9)
+                if len(encoded) >= len(data):
+                    continue
+                with open(target, 'wb') as handle:
+                    handle.write(encoded)
+                stats['written'] += 1
+                stats['bytes_in'] += len(data)
+                stats['bytes_out'] += len(encoded)
+    return stats
+
+
+static_commands = AppGroup('static')
+
+
+@static_commands.command('compress')
+@click.option('--build-dir', default=None, help='Defaults to the app static folder (react-app/build).')
+@with_appcontext
+def compress_command(build_dir):
+    """Pre-compress the React build for send_static_asset."""
+    root = build_dir or current_app.static_folder
+    if not os.path.isdir(root):
+        raise click.ClickException(f'{root} does not exist; run `npm run build` in react-app first')
+    stats = precompress_directory(root)
+    click.echo(f"Compressed {stats['files']} files: wrote {stats['written']} variants, "
+               f"{stats['bytes_in']} -> {stats['bytes_out']} bytes")
@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+"""
+Web tier settings; gunicorn reads this file from the working directory, so the
+plain start command (`gunicorn app:app`) gets them too.
+
+GET /api/posts/stream (SSE) keeps a connection open per browser tab and blocks
+waiting for events, so workers are gevent: an idle stream costs a greenlet, not
+a whole sync worker. Override with GUNICORN_WORKER_CLASS / GUNICORN_WORKERS /
+GUNICORN_WORKER_CONNECTIONS; the bind address stays gunicorn's default ($PORT
+when set).
+"""
+import multiprocessing
+import os
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+workers = int(os.environ.get("GUNICORN_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 4)))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "2000"))
+# SSE responses stay open; the gevent worker only times out a blocked event loop
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+
+
+def child_exit(server, worker):
+    # drop the dead worker's files from PROMETHEUS_MULTIPROC_DIR (see app/extensions/metrics.py)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
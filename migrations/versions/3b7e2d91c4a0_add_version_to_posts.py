@@ -0,0 +1,26 @@
+"""add version to posts
+
+Revision ID: 3b7e2d91c4a0
+Revises: 8a48294ef0b3
+Create Date: 2026-10-19 09:12:44.104215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e2d91c4a0'
+down_revision = '8a48294ef0b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('version')
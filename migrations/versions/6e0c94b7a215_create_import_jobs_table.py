@@ -0,0 +1,45 @@
+"""create import_jobs table
+
+Revision ID: 6e0c94b7a215
+Revises: d41f8a6c2e93
+Create Date: 2026-10-19 11:42:08.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e0c94b7a215'
+down_revision = 'd41f8a6c2e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('file_format', sa.String(length=8), nullable=False),
+        sa.Column('storage_path', sa.String(length=512), nullable=False),
+        sa.Column('error_report_path', sa.String(length=512), nullable=True),
+        sa.Column('status', sa.String(length=32), nullable=False),
+        sa.Column('rq_job_id', sa.String(length=128), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('idx_import_jobs_user_created', 'import_jobs', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('idx_import_jobs_user_created', table_name='import_jobs')
+    op.drop_table('import_jobs')
@@ -0,0 +1,46 @@
+"""create scheduler_lag_rollups table
+
+Revision ID: c7e4a19d5b38
+Revises: b5d27e8a3f16
+Create Date: 2026-10-19 17:25:40.118372
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e4a19d5b38'
+down_revision = 'b5d27e8a3f16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scheduler_lag_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('platform_id', sa.Integer(), nullable=False),
+        sa.Column('queue_name', sa.String(length=64), nullable=False),
+        sa.Column('fired', sa.Integer(), nullable=False),
+        sa.Column('delivered', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.Column('missed', sa.Integer(), nullable=False),
+        sa.Column('breaches', sa.Integer(), nullable=False),
+        sa.Column('fire_lag_sum', sa.Float(), nullable=False),
+        sa.Column('fire_lag_max', sa.Float(), nullable=False),
+        sa.Column('fire_lag_hist', sa.JSON(), nullable=False),
+        sa.Column('delivery_lag_sum', sa.Float(), nullable=False),
+        sa.Column('delivery_lag_max', sa.Float(), nullable=False),
+        sa.Column('delivery_lag_hist', sa.JSON(), nullable=False),
+        sa.Column('slo_seconds', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('bucket_start', 'platform_id', 'queue_name', name='uq_scheduler_lag_rollups_bucket'),
+    )
+    op.create_index('idx_scheduled_jobs_scheduled_for', 'scheduled_jobs', ['scheduled_for'])
+
+
+def downgrade():
+    op.drop_index('idx_scheduled_jobs_scheduled_for', table_name='scheduled_jobs')
+    op.drop_table('scheduler_lag_rollups')
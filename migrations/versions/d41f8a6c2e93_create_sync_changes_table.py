@@ -0,0 +1,37 @@
+"""create sync_changes table
+
+Revision ID: d41f8a6c2e93
+Revises: 3b7e2d91c4a0
+Create Date: 2026-10-19 10:03:27.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f8a6c2e93'
+down_revision = '3b7e2d91c4a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'sync_changes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=32), nullable=False),
+        sa.Column('entity_key', sa.String(length=64), nullable=False),
+        sa.Column('op', sa.String(length=8), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sqlite_autoincrement=True,
+    )
+    op.create_index('idx_sync_changes_user_seq', 'sync_changes', ['user_id', 'id'])
+    op.create_index('idx_sync_changes_entity', 'sync_changes', ['entity', 'entity_key'])
+
+
+def downgrade():
+    op.drop_index('idx_sync_changes_entity', table_name='sync_changes')
+    op.drop_index('idx_sync_changes_user_seq', table_name='sync_changes')
+    op.drop_table('sync_changes')
@@ -3,18 +3,16 @@ import os, sys
 sys.path.append(os.path.dirname(__file__))
 
 # from rq import Worker, Connection
-from rq import Worker 
-from app import app as flask_app                
-from app.extensions.queue import redis_conn, task_queue
+from app import create_app
+from app.extensions.queue import get_queue, get_redis
+from app.extensions.metrics import MetricsWorker, start_worker_metrics_server
 
 
 
-# Push app context BEFORE importing tasks to avoid circular imports
+# "worker" profile: config, database, Redis and app.tasks only (no blueprints, CORS, CLI)
+flask_app = create_app("worker")
 flask_app.app_context().push()
 
-# Importing app.tasks will also import app/__init__.py and build the global app
-import app.tasks  # noqa: F401 - needed to register tasks with RQ
-
 
 
 if __name__ == "__main__":
@@ -22,5 +20,8 @@ if __name__ == "__main__":
         # this is the alternative to using rqscheduler.Scheduler() but it is a small set up for a single worker
         #  if you want to scale up you need use the rqscheduler.Scheduler()
         # Worker([task_queue]).work(with_scheduler=False) 
-        worker = Worker([task_queue], connection=redis_conn)  # pass connection=
+        # METRICS_PORT: serve /metrics for this worker (task histograms need PROMETHEUS_MULTIPROC_DIR)
+        if os.environ.get("METRICS_PORT"):
+            start_worker_metrics_server(int(os.environ["METRICS_PORT"]))
+        worker = MetricsWorker([get_queue()], connection=get_redis())  # pass connection=
         worker.work(with_scheduler=False)